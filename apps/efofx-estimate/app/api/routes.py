@@ -5,12 +5,19 @@ This module defines all API endpoints and route handlers
 for the estimation service.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
-from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query, WebSocket, WebSocketDisconnect, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from typing import List, Optional, Literal
+import json
 import logging
 
-from app.core.security import get_current_tenant, check_rate_limit
-from app.core.constants import API_MESSAGES, HTTP_STATUS
+from app.core.config import settings
+from app.core.security import (
+    get_current_tenant, get_websocket_tenant, require_admin_tenant, check_rate_limit, rate_limit
+)
+from app.core.constants import API_MESSAGES, ESTIMATION_CONFIG, HTTP_STATUS, RATE_LIMIT_COSTS
+from app.core.rate_limit import RateLimitResult
 from app.models.tenant import Tenant
 from app.models.estimation import EstimationRequest, EstimationResponse
 from app.models.chat import ChatRequest, ChatResponse
@@ -18,6 +25,11 @@ from app.models.feedback import FeedbackCreate, FeedbackSummary
 from app.services.estimation_service import EstimationService
 from app.services.chat_service import ChatService
 from app.services.feedback_service import FeedbackService
+from app.services.usage_service import QuotaExceededError
+from app.observability.profiling import profile_for
+from app.utils.async_utils import aclosing
+from app.utils.file_utils import FileTooLargeError
+from app.utils.pagination import InvalidCursorError
 
 logger = logging.getLogger(__name__)
 
@@ -39,7 +51,9 @@ def get_feedback_service() -> FeedbackService:
 
 
 # Estimation endpoints
-@api_router.post("/estimate/start", response_model=EstimationResponse)
+@api_router.post(
+    "/estimate/start", response_model=EstimationResponse, dependencies=[Depends(rate_limit("ESTIMATE_START"))]
+)
 async def start_estimation(
     request: EstimationRequest,
     tenant: Tenant = Depends(get_current_tenant),
@@ -47,9 +61,13 @@ async def start_estimation(
 ):
     """Start a new estimation session."""
     try:
-        check_rate_limit(str(tenant.id))
         response = await estimation_service.start_estimation(request, tenant)
         return response
+    except QuotaExceededError:
+        raise HTTPException(
+            status_code=HTTP_STATUS["RATE_LIMITED"],
+            detail=API_MESSAGES["QUOTA_EXCEEDED"]
+        )
     except Exception as e:
         logger.error(f"Error starting estimation: {e}")
         raise HTTPException(
@@ -76,7 +94,30 @@ async def get_estimation(
         )
 
 
-@api_router.post("/estimate/{session_id}/upload")
+@api_router.get("/estimates")
+async def list_estimations(
+    limit: int = Query(ESTIMATION_CONFIG["DEFAULT_LIST_LIMIT"], ge=1, le=ESTIMATION_CONFIG["MAX_LIST_LIMIT"]),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    reference_class: Optional[str] = None,
+    tenant: Tenant = Depends(get_current_tenant),
+    estimation_service: EstimationService = Depends(get_estimation_service)
+):
+    """List the tenant's estimation sessions, newest first."""
+    try:
+        return await estimation_service.list_estimations(
+            tenant, limit=limit, cursor=cursor, reference_class=reference_class
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=HTTP_STATUS["BAD_REQUEST"], detail=str(e))
+    except Exception as e:
+        logger.error(f"Error listing estimations: {e}")
+        raise HTTPException(
+            status_code=HTTP_STATUS["INTERNAL_ERROR"],
+            detail=API_MESSAGES["DB_ERROR"]
+        )
+
+
+@api_router.post("/estimate/{session_id}/upload", dependencies=[Depends(rate_limit("IMAGE_UPLOAD"))])
 async def upload_image(
     session_id: str,
     file: UploadFile = File(...),
@@ -85,9 +126,10 @@ async def upload_image(
 ):
     """Upload image for estimation session."""
     try:
-        check_rate_limit(str(tenant.id))
         result = await estimation_service.upload_image(session_id, file, tenant)
         return {"message": "Image uploaded successfully", "image_url": result}
+    except FileTooLargeError as e:
+        raise HTTPException(status_code=HTTP_STATUS["PAYLOAD_TOO_LARGE"], detail=str(e))
     except Exception as e:
         logger.error(f"Error uploading image: {e}")
         raise HTTPException(
@@ -97,7 +139,9 @@ async def upload_image(
 
 
 # Chat endpoints
-@api_router.post("/chat/send", response_model=ChatResponse)
+@api_router.post(
+    "/chat/send", response_model=ChatResponse, dependencies=[Depends(rate_limit("CHAT_MESSAGE"))]
+)
 async def send_chat_message(
     request: ChatRequest,
     tenant: Tenant = Depends(get_current_tenant),
@@ -105,7 +149,6 @@ async def send_chat_message(
 ):
     """Send a chat message for estimation."""
     try:
-        check_rate_limit(str(tenant.id))
         response = await chat_service.send_message(request, tenant)
         return response
     except Exception as e:
@@ -116,16 +159,85 @@ async def send_chat_message(
         )
 
 
+@api_router.post("/chat/stream")
+async def stream_chat_message(
+    request: ChatRequest,
+    tenant: Tenant = Depends(get_current_tenant),
+    limit: Optional[RateLimitResult] = Depends(rate_limit("CHAT_MESSAGE")),
+    chat_service: ChatService = Depends(get_chat_service)
+):
+    """
+    Send a chat message and stream the reply as server-sent events.
+    
+    Events are ``start``, ``token`` (repeated), then ``done`` with the
+    stored ChatResponse, or ``error``. Disconnecting cancels generation.
+    """
+    async def event_stream():
+        async with aclosing(chat_service.stream_message(request, tenant)) as events:
+            async for event in events:
+                yield f"event: {event['event']}\ndata: {json.dumps(jsonable_encoder(event['data']))}\n\n"
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no", **(limit.headers() if limit else {})}
+    )
+
+
+@api_router.websocket("/chat/ws")
+async def chat_websocket(
+    websocket: WebSocket,
+    chat_service: ChatService = Depends(get_chat_service)
+):
+    """
+    Multi-turn chat over a WebSocket.
+    
+    Each client frame is a ChatRequest as JSON; the session ID from the
+    first reply is reused until the client sends another. Replies are the
+    same events as /chat/stream, sent as JSON frames.
+    """
+    try:
+        tenant = await get_websocket_tenant(websocket)
+    except HTTPException:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    
+    await websocket.accept()
+    session_id = websocket.query_params.get("session_id")
+    try:
+        while True:
+            try:
+                payload = await websocket.receive_json()
+                request = ChatRequest(**{"session_id": session_id, **payload})
+                await check_rate_limit(str(tenant.id), RATE_LIMIT_COSTS["CHAT_MESSAGE"])
+            except (ValueError, TypeError, HTTPException) as e:
+                detail = e.detail if isinstance(e, HTTPException) else API_MESSAGES["INVALID_INPUT"]
+                await websocket.send_json({"event": "error", "data": {"detail": detail}})
+                continue
+            
+            async with aclosing(chat_service.stream_message(request, tenant)) as events:
+                async for event in events:
+                    if event["event"] == "start":
+                        session_id = event["data"]["session_id"]
+                    await websocket.send_json(jsonable_encoder(event))
+    except WebSocketDisconnect:
+        logger.debug("Chat WebSocket disconnected")
+
+
 @api_router.get("/chat/{session_id}/history")
 async def get_chat_history(
     session_id: str,
+    before_seq: Optional[int] = Query(None, ge=1, description="Return messages before this sequence number"),
+    limit: int = Query(
+        ESTIMATION_CONFIG["DEFAULT_CHAT_HISTORY_LIMIT"], ge=1, le=ESTIMATION_CONFIG["MAX_CHAT_HISTORY_LIMIT"]
+    ),
     tenant: Tenant = Depends(get_current_tenant),
     chat_service: ChatService = Depends(get_chat_service)
 ):
-    """Get chat history for a session."""
+    """Get a page of chat history for a session."""
     try:
-        history = await chat_service.get_chat_history(session_id, tenant)
-        return {"session_id": session_id, "messages": history}
+        history = await chat_service.get_chat_history(session_id, tenant, before_seq=before_seq, limit=limit)
+        return {"session_id": session_id, **history}
     except Exception as e:
         logger.error(f"Error getting chat history: {e}")
         raise HTTPException(
@@ -135,7 +247,7 @@ async def get_chat_history(
 
 
 # Feedback endpoints
-@api_router.post("/feedback/submit")
+@api_router.post("/feedback/submit", dependencies=[Depends(rate_limit("FEEDBACK"))])
 async def submit_feedback(
     feedback: FeedbackCreate,
     tenant: Tenant = Depends(get_current_tenant),
@@ -143,7 +255,6 @@ async def submit_feedback(
 ):
     """Submit feedback for an estimation."""
     try:
-        check_rate_limit(str(tenant.id))
         result = await feedback_service.submit_feedback(feedback, tenant)
         return {"message": "Feedback submitted successfully", "feedback_id": result}
     except Exception as e:
@@ -174,19 +285,20 @@ async def get_feedback_summary(
 # Health and status endpoints
 @api_router.get("/status")
 async def get_service_status():
-    """Get service status and health information."""
+    """Get service status from the periodically refreshed platform snapshot."""
     try:
-        from app.db.mongodb import health_check, get_database_stats
+        from app.services.platform_stats import platform_stats
         
-        db_healthy = await health_check()
-        db_stats = await get_database_stats()
+        snapshot = await platform_stats.get_snapshot()
+        db_healthy = snapshot.database is not None
         
         return {
             "status": "healthy" if db_healthy else "unhealthy",
             "database": {
                 "connected": db_healthy,
-                "stats": db_stats
+                "stats": snapshot.database
             },
+            "as_of": snapshot.refreshed_at,
             "service": "efOfX Estimation Service",
             "version": "1.0.0"
         }
@@ -202,16 +314,17 @@ async def get_service_status():
 @api_router.get("/admin/tenants")
 async def list_tenants(
     tenant: Tenant = Depends(get_current_tenant),
-    limit: int = 10,
-    offset: int = 0
+    limit: int = Query(ESTIMATION_CONFIG["DEFAULT_LIST_LIMIT"], ge=1, le=ESTIMATION_CONFIG["MAX_LIST_LIMIT"]),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page")
 ):
     """List tenants (admin only)."""
     try:
         # This would include proper admin authorization
         from app.services.tenant_service import TenantService
         tenant_service = TenantService()
-        tenants = await tenant_service.list_tenants(limit, offset)
-        return {"tenants": tenants, "total": len(tenants)}
+        return await tenant_service.list_tenants(limit, cursor)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=HTTP_STATUS["BAD_REQUEST"], detail=str(e))
     except Exception as e:
         logger.error(f"Error listing tenants: {e}")
         raise HTTPException(
@@ -229,11 +342,43 @@ async def list_reference_classes(
     try:
         from app.services.reference_service import ReferenceService
         reference_service = ReferenceService()
-        classes = await reference_service.list_reference_classes(category)
+        classes = await reference_service.get_reference_classes(category)
         return {"reference_classes": classes}
     except Exception as e:
         logger.error(f"Error listing reference classes: {e}")
         raise HTTPException(
             status_code=HTTP_STATUS["FORBIDDEN"],
             detail="Access denied"
-        ) 
\ No newline at end of file
+        )
+
+
+@api_router.post("/admin/profile")
+async def profile_instance(
+    seconds: float = Query(10.0, gt=0, description="Sampling duration in seconds"),
+    format: Literal["collapsed", "speedscope"] = Query("speedscope"),
+    tenant: Tenant = Depends(require_admin_tenant)
+):
+    """Sample this worker's event loop for N seconds (admin only)."""
+    if not settings.PROFILING_ENABLED:
+        raise HTTPException(
+            status_code=HTTP_STATUS["NOT_FOUND"],
+            detail="Profiling is disabled"
+        )
+
+    if seconds > settings.PROFILING_MAX_SECONDS:
+        raise HTTPException(
+            status_code=HTTP_STATUS["BAD_REQUEST"],
+            detail=f"Profiling duration cannot exceed {settings.PROFILING_MAX_SECONDS}s"
+        )
+
+    logger.info(f"Starting {seconds}s profile requested by tenant {tenant.id}")
+
+    try:
+        profile = await profile_for(seconds, settings.PROFILING_INTERVAL_MS / 1000.0)
+    except RuntimeError as e:
+        raise HTTPException(status_code=HTTP_STATUS["CONFLICT"], detail=str(e))
+
+    if format == "collapsed":
+        return PlainTextResponse(profile.to_collapsed())
+
+    return JSONResponse(profile.to_speedscope(name=f"efofx-estimate-{seconds:g}s"))
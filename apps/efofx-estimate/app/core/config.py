@@ -32,10 +32,27 @@ class Settings(BaseSettings):
     ENCRYPTION_KEY: str = Field(..., env="ENCRYPTION_KEY")
     ALLOWED_HOSTS: List[str] = Field(default=["*"], env="ALLOWED_HOSTS")
     ALLOWED_ORIGINS: List[str] = Field(default=["*"], env="ALLOWED_ORIGINS")
+    ADMIN_TENANT_IDS: List[str] = Field(default=[], env="ADMIN_TENANT_IDS")
+    TENANT_CACHE_MAX_ENTRIES: int = Field(default=10_000, env="TENANT_CACHE_MAX_ENTRIES")
+    TENANT_CACHE_TTL_SECONDS: int = Field(default=60, env="TENANT_CACHE_TTL_SECONDS")
+    TENANT_CACHE_NEGATIVE_TTL_SECONDS: int = Field(default=30, env="TENANT_CACHE_NEGATIVE_TTL_SECONDS")
+    TENANT_CACHE_NEGATIVE_MAX_ENTRIES: int = Field(default=1_000, env="TENANT_CACHE_NEGATIVE_MAX_ENTRIES")
     
     # Database
     MONGO_URI: str = Field(..., env="MONGO_URI")
     MONGO_DB_NAME: str = Field(default="efofx_estimate", env="MONGO_DB_NAME")
+    MONGO_ENSURE_INDEXES: bool = Field(default=True, env="MONGO_ENSURE_INDEXES")
+    MONGO_VERIFY_QUERY_SHAPES: bool = Field(default=False, env="MONGO_VERIFY_QUERY_SHAPES")
+    MONGO_MAX_POOL_SIZE: int = Field(default=100, env="MONGO_MAX_POOL_SIZE")
+    MONGO_MIN_POOL_SIZE: int = Field(default=0, env="MONGO_MIN_POOL_SIZE")
+    MONGO_MAX_IDLE_TIME_MS: Optional[int] = Field(default=None, env="MONGO_MAX_IDLE_TIME_MS")
+    MONGO_WAIT_QUEUE_TIMEOUT_MS: Optional[int] = Field(default=None, env="MONGO_WAIT_QUEUE_TIMEOUT_MS")
+    MONGO_COMPRESSORS: str = Field(default="zstd,zlib", env="MONGO_COMPRESSORS")
+    MONGO_READ_PREFERENCE: str = Field(default="primary", env="MONGO_READ_PREFERENCE")
+    MONGO_RETRY_READS: bool = Field(default=True, env="MONGO_RETRY_READS")
+    MONGO_RETRY_WRITES: bool = Field(default=True, env="MONGO_RETRY_WRITES")
+    MONGO_COMMAND_MONITORING: bool = Field(default=True, env="MONGO_COMMAND_MONITORING")
+    MONGO_SLOW_COMMAND_MS: float = Field(default=100.0, env="MONGO_SLOW_COMMAND_MS")
     
     # OpenAI
     OPENAI_API_KEY: Optional[str] = Field(default=None, env="OPENAI_API_KEY")
@@ -46,6 +63,37 @@ class Settings(BaseSettings):
     # Estimation
     MAX_ESTIMATION_SESSIONS: int = Field(default=100, env="MAX_ESTIMATION_SESSIONS")
     SESSION_TIMEOUT_MINUTES: int = Field(default=30, env="SESSION_TIMEOUT_MINUTES")
+    ESTIMATION_CLAIM_WRITE_CONCERN: str = Field(default="1", env="ESTIMATION_CLAIM_WRITE_CONCERN")
+    ESTIMATION_FINAL_WRITE_CONCERN: str = Field(default="majority", env="ESTIMATION_FINAL_WRITE_CONCERN")
+    SESSION_SWEEP_INTERVAL_SECONDS: int = Field(default=60, env="SESSION_SWEEP_INTERVAL_SECONDS")
+    SESSION_SWEEP_WINDOW_MINUTES: int = Field(default=60, env="SESSION_SWEEP_WINDOW_MINUTES")
+    SESSION_SWEEP_MAX_BATCHES: int = Field(default=50, env="SESSION_SWEEP_MAX_BATCHES")
+    CHAT_SESSION_TTL_HOURS: int = Field(default=24, env="CHAT_SESSION_TTL_HOURS")
+    CHAT_MAX_TOKENS: int = Field(default=800, env="CHAT_MAX_TOKENS")
+    CHAT_MESSAGE_RETENTION_DAYS: int = Field(default=30, env="CHAT_MESSAGE_RETENTION_DAYS")
+    CHAT_CONTEXT_TOKEN_BUDGET: int = Field(default=1500, env="CHAT_CONTEXT_TOKEN_BUDGET")
+    CHAT_RECENT_MESSAGES: int = Field(default=12, env="CHAT_RECENT_MESSAGES")
+    CHAT_SUMMARY_TRIGGER_MESSAGES: int = Field(default=24, env="CHAT_SUMMARY_TRIGGER_MESSAGES")
+    CHAT_SUMMARY_MAX_TOKENS: int = Field(default=300, env="CHAT_SUMMARY_MAX_TOKENS")
+    REFERENCE_CATALOG_TTL_SECONDS: int = Field(default=300, env="REFERENCE_CATALOG_TTL_SECONDS")
+    CLASSIFIER_TOP_K: int = Field(default=5, env="CLASSIFIER_TOP_K")
+    CLASSIFIER_CONFIDENCE_THRESHOLD: float = Field(default=0.35, env="CLASSIFIER_CONFIDENCE_THRESHOLD")
+    SIMULATION_TRIALS: int = Field(default=100_000, env="SIMULATION_TRIALS")
+    TUNING_REFRESH_SECONDS: int = Field(default=300, env="TUNING_REFRESH_SECONDS")
+    USAGE_CACHE_TTL_SECONDS: int = Field(default=30, env="USAGE_CACHE_TTL_SECONDS")
+    USAGE_RECONCILE_SECONDS: int = Field(default=3600, env="USAGE_RECONCILE_SECONDS")
+    PLATFORM_STATS_REFRESH_SECONDS: int = Field(default=60, env="PLATFORM_STATS_REFRESH_SECONDS")
+    READINESS_TIMEOUT_SECONDS: float = Field(default=2.0, env="READINESS_TIMEOUT_SECONDS")
+    
+    # Background Jobs
+    JOB_QUEUE_BACKEND: str = Field(default="mongo", env="JOB_QUEUE_BACKEND")  # mongo or memory
+    JOB_WORKERS_ENABLED: bool = Field(default=True, env="JOB_WORKERS_ENABLED")
+    JOB_WORKER_CONCURRENCY: int = Field(default=4, env="JOB_WORKER_CONCURRENCY")
+    JOB_MAX_ATTEMPTS: int = Field(default=3, env="JOB_MAX_ATTEMPTS")
+    JOB_RETRY_BACKOFF_SECONDS: float = Field(default=5.0, env="JOB_RETRY_BACKOFF_SECONDS")
+    JOB_LEASE_SECONDS: int = Field(default=300, env="JOB_LEASE_SECONDS")
+    JOB_POLL_INTERVAL_SECONDS: float = Field(default=1.0, env="JOB_POLL_INTERVAL_SECONDS")
+    JOB_RETENTION_HOURS: int = Field(default=72, env="JOB_RETENTION_HOURS")
     
     # File Upload
     MAX_FILE_SIZE: int = Field(default=10 * 1024 * 1024, env="MAX_FILE_SIZE")  # 10MB
@@ -53,6 +101,8 @@ class Settings(BaseSettings):
         default=["image/jpeg", "image/png", "image/webp"], 
         env="ALLOWED_IMAGE_TYPES"
     )
+    UPLOAD_DIR: str = Field(default="uploads", env="UPLOAD_DIR")
+    UPLOAD_CHUNK_SIZE: int = Field(default=1024 * 1024, env="UPLOAD_CHUNK_SIZE")  # 1MB
     
     # Logging
     LOG_LEVEL: str = Field(default="INFO", env="LOG_LEVEL")
@@ -61,6 +111,20 @@ class Settings(BaseSettings):
     # Rate Limiting
     RATE_LIMIT_ENABLED: bool = Field(default=True, env="RATE_LIMIT_ENABLED")
     RATE_LIMIT_PER_MINUTE: int = Field(default=60, env="RATE_LIMIT_PER_MINUTE")
+    RATE_LIMIT_BACKEND: str = Field(default="memory", env="RATE_LIMIT_BACKEND")  # memory or mongo
+
+    # Event Loop Monitoring
+    LOOP_MONITOR_ENABLED: bool = Field(default=True, env="LOOP_MONITOR_ENABLED")
+    LOOP_MONITOR_INTERVAL: float = Field(default=0.1, env="LOOP_MONITOR_INTERVAL")
+    LOOP_BLOCK_THRESHOLD: float = Field(default=0.25, env="LOOP_BLOCK_THRESHOLD")
+    LOOP_STACK_SAMPLE_RATE: float = Field(default=1.0, env="LOOP_STACK_SAMPLE_RATE")
+    LOOP_STACK_MIN_INTERVAL: float = Field(default=60.0, env="LOOP_STACK_MIN_INTERVAL")
+
+    # Profiling (disabled by default; zero overhead unless enabled)
+    PROFILING_ENABLED: bool = Field(default=False, env="PROFILING_ENABLED")
+    PROFILING_MAX_SECONDS: int = Field(default=60, env="PROFILING_MAX_SECONDS")
+    PROFILING_INTERVAL_MS: float = Field(default=5.0, env="PROFILING_INTERVAL_MS")
+    PROFILING_REQUEST_TOKEN: Optional[str] = Field(default=None, env="PROFILING_REQUEST_TOKEN")
 
     # Error Tracking (Optional - Sentry removed but keeping config for backwards compatibility)
     SENTRY_DSN: Optional[str] = Field(default=None, env="SENTRY_DSN")
@@ -16,6 +16,19 @@ class EstimationStatus(str, Enum):
     COMPLETED = "completed"
     CANCELLED = "cancelled"
     EXPIRED = "expired"
+    FAILED = "failed"
+
+
+# Sessions that have not reached a final state and can still expire
+PENDING_ESTIMATION_STATUSES = (EstimationStatus.INITIATED, EstimationStatus.IN_PROGRESS)
+
+
+class JobStatus(str, Enum):
+    """Status of background jobs."""
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
 
 
 class ReferenceClassCategory(str, Enum):
@@ -62,6 +75,7 @@ API_MESSAGES = {
     "INVALID_INPUT": "Invalid input provided",
     "UNAUTHORIZED": "Unauthorized access",
     "RATE_LIMITED": "Rate limit exceeded",
+    "QUOTA_EXCEEDED": "Monthly estimation limit reached",
     "LLM_ERROR": "Language model processing error",
     "DB_ERROR": "Database operation failed",
 }
@@ -70,6 +84,10 @@ API_MESSAGES = {
 # Estimation Configuration
 ESTIMATION_CONFIG = {
     "MAX_CHAT_MESSAGES": 50,
+    "DEFAULT_CHAT_HISTORY_LIMIT": 50,
+    "MAX_CHAT_HISTORY_LIMIT": 200,
+    "DEFAULT_LIST_LIMIT": 20,
+    "MAX_LIST_LIMIT": 100,
     "MAX_PROJECT_DESCRIPTION_LENGTH": 2000,
     "MIN_PROJECT_DESCRIPTION_LENGTH": 10,
     "DEFAULT_CONFIDENCE_THRESHOLD": 0.7,
@@ -78,6 +96,75 @@ ESTIMATION_CONFIG = {
 }
 
 
+# Default share of total cost per breakdown category
+COST_BREAKDOWN_SHARES = {
+    "materials": 0.40,
+    "labor": 0.25,
+    "equipment": 0.08,
+    "permits": 0.03,
+    "design": 0.05,
+    "contingency": 0.08,
+    "profit_margin": 0.11,
+}
+
+
+# Regional cost level relative to SoCal - Inland
+REGION_COST_MULTIPLIERS = {
+    "SoCal - Coastal": 1.10,
+    "SoCal - Inland": 1.00,
+    "NorCal - Bay Area": 1.25,
+    "NorCal - Central": 0.95,
+    "Arizona - Phoenix": 0.90,
+    "Arizona - Tucson": 0.88,
+    "Nevada - Las Vegas": 0.97,
+    "Nevada - Reno": 0.95,
+}
+
+
+# Monte Carlo Simulation Configuration
+SIMULATION_CONFIG = {
+    "COMPONENT_CORRELATION": 0.5,  # Pairwise correlation between cost categories
+    "TIMELINE_CORRELATION": 0.4,  # Correlation between timeline and each cost category
+    "DEFAULT_COST_SIGMA": 0.25,  # Log-space spread of total cost without reference data
+    "DEFAULT_TIMELINE_SIGMA": 0.20,
+    "MAX_SIGMA": 1.5,
+    # Relative volatility of each category; scaled to match the fitted total spread
+    "COMPONENT_VOLATILITY": {
+        "materials": 1.0,
+        "labor": 1.2,
+        "equipment": 1.0,
+        "permits": 0.6,
+        "design": 0.8,
+        "contingency": 1.5,
+        "profit_margin": 0.5,
+    },
+}
+
+
+# Feedback-Driven Tuning Configuration
+TUNING_CONFIG = {
+    "MIN_SAMPLES": 5,  # Feedback entries needed before a factor is applied
+    "PRIOR_SAMPLES": 20,  # Shrinks factors towards 1.0 for small samples
+    "MIN_FACTOR": 0.5,
+    "MAX_FACTOR": 2.0,
+    "OUTLIER_THRESHOLD": 3.5,  # Modified z-score above which a ratio is ignored
+    "FEEDBACK_ID_SAMPLE": 20,  # Most recent feedback IDs kept per tuning document
+    "CHUNK_SIZE": 50_000,  # Rows converted to arrays at a time
+    "CURSOR_BATCH_SIZE": 5_000,
+    "WRITE_BATCH_SIZE": 500,
+}
+
+
+# Rate limit units spent per request, by route
+RATE_LIMIT_COSTS = {
+    "DEFAULT": 1,
+    "ESTIMATE_START": 5,  # Starts an LLM-backed estimation job
+    "IMAGE_UPLOAD": 3,
+    "CHAT_MESSAGE": 2,  # One LLM completion per message
+    "FEEDBACK": 1,
+}
+
+
 # LLM Prompt Templates
 LLM_PROMPTS = {
     "PROJECT_CLASSIFICATION": """
@@ -119,9 +206,16 @@ DB_COLLECTIONS = {
     "TENANTS": "tenants",
     "REFERENCE_CLASSES": "reference_classes",
     "REFERENCE_PROJECTS": "reference_projects",
+    "REFERENCE_STATS": "reference_stats",
     "ESTIMATES": "estimates",
     "FEEDBACK": "feedback",
+    "FEEDBACK_ROLLUPS": "feedback_rollups",
+    "TUNING_DATA": "tuning_data",
     "CHAT_SESSIONS": "chat_sessions",
+    "CHAT_MESSAGES": "chat_messages",
+    "JOBS": "jobs",
+    "RATE_LIMITS": "rate_limits",
+    "TENANT_USAGE": "tenant_usage",
 }
 
 
@@ -133,6 +227,8 @@ HTTP_STATUS = {
     "UNAUTHORIZED": 401,
     "FORBIDDEN": 403,
     "NOT_FOUND": 404,
+    "CONFLICT": 409,
+    "PAYLOAD_TOO_LARGE": 413,
     "RATE_LIMITED": 429,
     "INTERNAL_ERROR": 500,
 }
@@ -144,4 +240,6 @@ FILE_UPLOAD_CONFIG = {
     "ALLOWED_EXTENSIONS": [".jpg", ".jpeg", ".png", ".webp"],
     "UPLOAD_DIR": "uploads",
     "TEMP_DIR": "temp",
+    # Stored extension per accepted content type; uploads are named by content hash
+    "EXTENSIONS_BY_TYPE": {"image/jpeg": ".jpg", "image/png": ".png", "image/webp": ".webp"},
 } 
\ No newline at end of file
@@ -0,0 +1,164 @@
+"""
+Request rate limiting for efOfX Estimation Service.
+
+Limits use the generic cell rate algorithm (GCRA): each key stores a
+single "theoretical arrival time", so a check is O(1) in time and memory
+however much traffic the key sees. A limit of N per window admits bursts
+of up to N and then one request every window / N seconds. Requests may
+cost more than one unit (see RATE_LIMIT_COSTS).
+
+The in-memory backend limits per process. The MongoDB backend keeps the
+state in one document per key, updated atomically, so limits hold across
+workers.
+"""
+
+import logging
+import math
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, Optional, Tuple
+
+from pymongo import ReturnDocument
+
+from app.core.config import settings
+from app.core.constants import DB_COLLECTIONS
+from app.db.indexes import TTLIndex
+from app.db.mongodb import get_rate_limits_collection
+
+logger = logging.getLogger(__name__)
+
+# Keys are looked up by _id; documents expire once their bucket is full again
+TTL_INDEXES = [
+    TTLIndex(DB_COLLECTIONS["RATE_LIMITS"], "expires_at", 0),
+]
+
+# Tolerance for floating point error when comparing arrival times
+_EPSILON = 1e-9
+
+
+def gcra(tat: Optional[float], now: float, cost: float, interval: float, window: float) -> Tuple[bool, float]:
+    """
+    One GCRA decision.
+
+    ``tat`` is the stored theoretical arrival time (None for a new key) and
+    ``interval`` the time one unit takes to replenish. Returns whether the
+    request is allowed and the arrival time to store.
+    """
+    current = max(tat if tat is not None else now, now)
+    candidate = current + cost * interval
+    if candidate - now <= window + _EPSILON:
+        return True, candidate
+    return False, current
+
+
+class RateLimitResult:
+    """Outcome of a rate limit check, with its RateLimit-* response headers."""
+
+    def __init__(self, allowed: bool, limit: int, window: float, tat: float, now: float, cost: float):
+        interval = window / limit
+        self.allowed = allowed
+        self.limit = limit
+        self.window = window
+        self.remaining = max(0, int((window - (tat - now)) / interval + _EPSILON))
+        self.reset_after = max(0.0, tat - now)
+        self.retry_after = 0.0 if allowed else max(0.0, tat + cost * interval - window - now)
+
+    def headers(self) -> Dict[str, str]:
+        headers = {
+            "RateLimit-Policy": f"{self.limit};w={int(self.window)}",
+            "RateLimit-Limit": str(self.limit),
+            "RateLimit-Remaining": str(self.remaining),
+            "RateLimit-Reset": str(math.ceil(self.reset_after)),
+        }
+        if not self.allowed:
+            headers["Retry-After"] = str(max(1, math.ceil(self.retry_after)))
+        return headers
+
+
+class RateLimitBackend(ABC):
+    """Storage interface for GCRA state."""
+
+    @abstractmethod
+    async def update(self, key: str, now: float, cost: float, interval: float, window: float) -> Tuple[bool, float]:
+        """Apply one GCRA decision atomically; returns (allowed, stored arrival time)."""
+
+
+class InMemoryRateLimitBackend(RateLimitBackend):
+    """
+    Per-process backend. Keys whose bucket has refilled are pruned once
+    the table grows past ``max_keys``, so memory follows active keys only.
+    """
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._tats: Dict[str, float] = {}
+        self._prune_at = max_keys
+
+    def __len__(self) -> int:
+        return len(self._tats)
+
+    async def update(self, key: str, now: float, cost: float, interval: float, window: float) -> Tuple[bool, float]:
+        allowed, tat = gcra(self._tats.get(key), now, cost, interval, window)
+        self._tats[key] = tat
+        if len(self._tats) >= self._prune_at:
+            self._tats = {k: v for k, v in self._tats.items() if v > now}
+            self._prune_at = max(self.max_keys, 2 * len(self._tats))
+        return allowed, tat
+
+
+class MongoRateLimitBackend(RateLimitBackend):
+    """
+    Shared backend: one find_one_and_update per check, evaluating the GCRA
+    decision inside an update pipeline. Worker clocks are assumed to agree
+    to within a small fraction of the replenish interval.
+    """
+
+    async def update(self, key: str, now: float, cost: float, interval: float, window: float) -> Tuple[bool, float]:
+        current = {"$max": [{"$ifNull": ["$tat", now]}, now]}
+        candidate = {"$add": [current, cost * interval]}
+        state = await get_rate_limits_collection().find_one_and_update(
+            {"_id": key},
+            [
+                {"$set": {"allowed": {"$lte": [{"$subtract": [candidate, now]}, window + _EPSILON]}}},
+                {"$set": {"tat": {"$cond": ["$allowed", candidate, current]}}},
+                {"$set": {"expires_at": {"$toDate": {"$multiply": ["$tat", 1000]}}}},
+            ],
+            projection={"_id": 0, "allowed": 1, "tat": 1},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        return state["allowed"], state["tat"]
+
+
+class RateLimiter:
+    """GCRA limiter allowing ``limit`` units per ``window_seconds`` per key."""
+
+    def __init__(self, backend: RateLimitBackend, limit: int, window_seconds: float = 60.0):
+        self.backend = backend
+        self.limit = limit
+        self.window = window_seconds
+
+    async def check(self, key: str, cost: float = 1) -> RateLimitResult:
+        """
+        Spend ``cost`` units for ``key`` if available.
+
+        Backend errors fail open: the request is allowed and the error
+        logged, so a database outage does not also reject all traffic.
+        """
+        now = time.time()
+        try:
+            allowed, tat = await self.backend.update(key, now, cost, self.window / self.limit, self.window)
+        except Exception as e:
+            logger.error(f"Error checking rate limit for {key}: {e}")
+            return RateLimitResult(True, self.limit, self.window, now, now, cost)
+        return RateLimitResult(allowed, self.limit, self.window, tat, now, cost)
+
+
+def _create_backend() -> RateLimitBackend:
+    if settings.RATE_LIMIT_BACKEND == "mongo":
+        return MongoRateLimitBackend()
+    return InMemoryRateLimitBackend()
+
+
+# Global rate limiter instance
+rate_limiter = RateLimiter(_create_backend(), limit=settings.RATE_LIMIT_PER_MINUTE, window_seconds=60.0)
@@ -5,7 +5,7 @@ This module provides authentication, authorization, and security utilities
 for the estimation service including API key validation and tenant management.
 """
 
-from fastapi import HTTPException, Depends, Request
+from fastapi import HTTPException, Depends, Request, Response, WebSocket
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from typing import Optional, Dict, Any
 from jose import jwt
@@ -13,8 +13,9 @@ import logging
 from datetime import datetime, timedelta
 
 from app.core.config import settings
-from app.core.constants import API_MESSAGES, HTTP_STATUS
-from app.db.mongodb import get_database
+from app.core.constants import API_MESSAGES, HTTP_STATUS, RATE_LIMIT_COSTS
+from app.core.rate_limit import RateLimitResult, rate_limiter
+from app.core.tenant_cache import tenant_cache
 from app.models.tenant import Tenant
 
 logger = logging.getLogger(__name__)
@@ -54,8 +55,7 @@ class AuthService:
     
     async def validate_api_key(self, api_key: str) -> Tenant:
         """Validate API key and return associated tenant."""
-        db = get_database()
-        tenant = await db[DB_COLLECTIONS["TENANTS"]].find_one({"api_key": api_key})
+        tenant = await tenant_cache.get_by_api_key(api_key)
         
         if not tenant:
             raise HTTPException(
@@ -63,7 +63,7 @@ class AuthService:
                 detail="Invalid API key"
             )
         
-        return Tenant(**tenant)
+        return tenant
     
     async def get_current_tenant(self, credentials: HTTPAuthorizationCredentials = Depends(security)) -> Tenant:
         """Get current tenant from API key or JWT token."""
@@ -87,8 +87,7 @@ class AuthService:
                 detail="Invalid token payload"
             )
         
-        db = get_database()
-        tenant = await db[DB_COLLECTIONS["TENANTS"]].find_one({"_id": tenant_id})
+        tenant = await tenant_cache.get_by_id(tenant_id)
         
         if not tenant:
             raise HTTPException(
@@ -96,7 +95,7 @@ class AuthService:
                 detail="Tenant not found"
             )
         
-        return Tenant(**tenant)
+        return tenant
 
 
 # Global auth service instance
@@ -108,6 +107,30 @@ async def get_current_tenant(credentials: HTTPAuthorizationCredentials = Depends
     return await auth_service.get_current_tenant(credentials)
 
 
+async def get_websocket_tenant(websocket: WebSocket) -> Tenant:
+    """
+    Authenticate a WebSocket handshake.
+    
+    Browsers cannot set headers on WebSocket requests, so the credential
+    may also be passed as a ``token`` query parameter.
+    """
+    scheme, _, token = websocket.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        token = websocket.query_params.get("token", "")
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token) if token else None
+    return await auth_service.get_current_tenant(credentials)
+
+
+async def require_admin_tenant(tenant: Tenant = Depends(get_current_tenant)) -> Tenant:
+    """Dependency to require an operator (admin) tenant."""
+    if str(tenant.id) not in settings.ADMIN_TENANT_IDS:
+        raise HTTPException(
+            status_code=HTTP_STATUS["FORBIDDEN"],
+            detail="Admin access required"
+        )
+    return tenant
+
+
 def require_tenant_permission(permission: str):
     """Decorator to require specific tenant permission."""
     def decorator(func):
@@ -119,43 +142,34 @@ def require_tenant_permission(permission: str):
     return decorator
 
 
-class RateLimiter:
-    """Simple rate limiting implementation."""
-    
-    def __init__(self):
-        self.requests = {}
+async def check_rate_limit(tenant_id: str, cost: int = RATE_LIMIT_COSTS["DEFAULT"]) -> Optional[RateLimitResult]:
+    """Spend rate limit units for a tenant; raises 429 with Retry-After when exhausted."""
+    if not settings.RATE_LIMIT_ENABLED:
+        return None
     
-    def is_allowed(self, tenant_id: str, limit: int = 100, window: int = 3600) -> bool:
-        """Check if request is allowed based on rate limit."""
-        now = datetime.utcnow()
-        window_start = now - timedelta(seconds=window)
-        
-        if tenant_id not in self.requests:
-            self.requests[tenant_id] = []
-        
-        # Clean old requests
-        self.requests[tenant_id] = [
-            req_time for req_time in self.requests[tenant_id]
-            if req_time > window_start
-        ]
-        
-        # Check if under limit
-        if len(self.requests[tenant_id]) >= limit:
-            return False
-        
-        # Add current request
-        self.requests[tenant_id].append(now)
-        return True
-
-
-# Global rate limiter instance
-rate_limiter = RateLimiter()
-
-
-def check_rate_limit(tenant_id: str, limit: int = 100):
-    """Check rate limit for tenant."""
-    if not rate_limiter.is_allowed(tenant_id, limit):
+    result = await rate_limiter.check(tenant_id, cost)
+    if not result.allowed:
         raise HTTPException(
             status_code=HTTP_STATUS["RATE_LIMITED"],
-            detail="Rate limit exceeded"
-        ) 
\ No newline at end of file
+            detail=API_MESSAGES["RATE_LIMITED"],
+            headers=result.headers()
+        )
+    return result
+
+
+def rate_limit(route: str = "DEFAULT"):
+    """
+    Dependency factory charging the current tenant the cost of ``route``.
+    
+    The RateLimit-* headers are added to the response; routes returning a
+    Response themselves must copy them from the returned result.
+    """
+    cost = RATE_LIMIT_COSTS[route]
+    
+    async def dependency(response: Response, tenant: Tenant = Depends(get_current_tenant)) -> Optional[RateLimitResult]:
+        result = await check_rate_limit(str(tenant.id), cost)
+        if result:
+            response.headers.update(result.headers())
+        return result
+    
+    return dependency
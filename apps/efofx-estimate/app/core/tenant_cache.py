@@ -0,0 +1,163 @@
+"""
+Tenant lookup cache for efOfX Estimation Service.
+
+Authentication resolves a tenant on every request. This module keeps a
+bounded, process-wide LRU of tenants keyed by a SHA-256 hash of the API
+key and by tenant id, so hot tenants authenticate without a database
+round-trip. Unknown keys are cached too (negatively, for a shorter TTL,
+in a separate smaller LRU), which keeps repeated bad keys from reaching
+MongoDB without letting a stream of distinct bad keys evict hot tenants.
+
+Writes made through TenantService invalidate the affected entries; writes
+made by other processes become visible within one TTL.
+"""
+
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from bson import ObjectId
+
+from app.core.config import settings
+from app.db.mongodb import get_tenants_collection
+from app.models.tenant import Tenant
+from app.observability.metrics import tenant_cache_metrics
+
+logger = logging.getLogger(__name__)
+
+# Lookups here are served by the by_api_key index declared in
+# app.services.tenant_service and by _id
+
+
+def hash_api_key(api_key: str) -> str:
+    """Cache key for an API key; raw keys are never held in the cache."""
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()
+
+
+class TenantCache:
+    """
+    LRU cache of tenants by API key hash and by tenant id.
+
+    Entries expire after ``ttl_seconds``; misses are remembered for
+    ``negative_ttl_seconds``. At most ``max_entries`` tenants and
+    ``negative_max_entries`` misses are kept, each evicting its own least
+    recently used.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10_000,
+        ttl_seconds: float = 60.0,
+        negative_ttl_seconds: float = 30.0,
+        negative_max_entries: int = 1_000,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self.negative_max_entries = negative_max_entries
+        # cache key -> (expires_at, tenant)
+        self._entries: "OrderedDict[str, Tuple[float, Tenant]]" = OrderedDict()
+        # cache key -> expires_at, for lookups that found no tenant
+        self._negative_entries: "OrderedDict[str, float]" = OrderedDict()
+        # tenant id -> cache key of its API key entry, for invalidation
+        self._api_key_entries: Dict[str, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries) + len(self._negative_entries)
+
+    def _lookup(self, key: str) -> Tuple[bool, Optional[Tenant]]:
+        negative_expires_at = self._negative_entries.get(key)
+        if negative_expires_at is not None:
+            if negative_expires_at <= time.monotonic():
+                del self._negative_entries[key]
+                return False, None
+            self._negative_entries.move_to_end(key)
+            return True, None
+
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        expires_at, tenant = entry
+        if expires_at <= time.monotonic():
+            self._discard(key)
+            return False, None
+        self._entries.move_to_end(key)
+        return True, tenant
+
+    def _store(self, key: str, tenant: Optional[Tenant]) -> None:
+        self._discard(key)
+        if tenant is None:
+            self._negative_entries[key] = time.monotonic() + self.negative_ttl_seconds
+            while len(self._negative_entries) > self.negative_max_entries:
+                self._negative_entries.popitem(last=False)
+            return
+
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, tenant)
+        while len(self._entries) > self.max_entries:
+            self._discard(next(iter(self._entries)))
+
+    def _discard(self, key: str) -> None:
+        self._negative_entries.pop(key, None)
+        _, tenant = self._entries.pop(key, (0.0, None))
+        if tenant is not None and self._api_key_entries.get(str(tenant.id)) == key:
+            del self._api_key_entries[str(tenant.id)]
+
+    async def get_by_api_key(self, api_key: str) -> Optional[Tenant]:
+        """Tenant owning ``api_key``, or None if there is none."""
+        key = f"key:{hash_api_key(api_key)}"
+        hit, tenant = self._lookup(key)
+        if hit:
+            tenant_cache_metrics.record_lookup("api_key", "hit" if tenant else "negative_hit")
+            return tenant
+
+        tenant_cache_metrics.record_lookup("api_key", "miss")
+        tenant_data = await get_tenants_collection().find_one({"api_key": api_key})
+        tenant = Tenant(**tenant_data) if tenant_data else None
+        self._store(key, tenant)
+        if tenant is not None:
+            self._api_key_entries[str(tenant.id)] = key
+        return tenant
+
+    async def get_by_id(self, tenant_id: str) -> Optional[Tenant]:
+        """Tenant with id ``tenant_id``, or None if there is none."""
+        key = f"id:{tenant_id}"
+        hit, tenant = self._lookup(key)
+        if hit:
+            tenant_cache_metrics.record_lookup("id", "hit" if tenant else "negative_hit")
+            return tenant
+
+        tenant_cache_metrics.record_lookup("id", "miss")
+        tenant_data = None
+        if ObjectId.is_valid(tenant_id):
+            tenant_data = await get_tenants_collection().find_one({"_id": ObjectId(tenant_id)})
+        tenant = Tenant(**tenant_data) if tenant_data else None
+        self._store(key, tenant)
+        return tenant
+
+    def invalidate(self, tenant_id: str) -> None:
+        """Drop a tenant's entries after it changes."""
+        tenant_id = str(tenant_id)
+        api_key_entry = self._api_key_entries.pop(tenant_id, None)
+        if api_key_entry:
+            self._entries.pop(api_key_entry, None)
+        self._discard(f"id:{tenant_id}")
+
+    def invalidate_api_key(self, api_key: str) -> None:
+        """Drop any entry, including a negative one, for ``api_key``."""
+        self._discard(f"key:{hash_api_key(api_key)}")
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._negative_entries.clear()
+        self._api_key_entries.clear()
+
+
+# Global tenant cache instance
+tenant_cache = TenantCache(
+    max_entries=settings.TENANT_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.TENANT_CACHE_TTL_SECONDS,
+    negative_ttl_seconds=settings.TENANT_CACHE_NEGATIVE_TTL_SECONDS,
+    negative_max_entries=settings.TENANT_CACHE_NEGATIVE_MAX_ENTRIES,
+)
@@ -0,0 +1,281 @@
+"""
+Declarative index management for efOfX Estimation Service.
+
+Each service module declares the query shapes it issues in a module-level
+``QUERY_SHAPES`` list, and optionally the expiring data it owns in
+``TTL_INDEXES``. At startup the matching compound and TTL indexes are
+created idempotently, and a check mode runs ``explain()`` for every shape
+to flag collection scans and in-memory sorts.
+
+Usage:
+    python -m app.db.indexes            # create indexes
+    python -m app.db.indexes --check    # create, then verify query plans
+"""
+
+import argparse
+import asyncio
+import importlib
+import logging
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo.errors import OperationFailure
+
+logger = logging.getLogger(__name__)
+
+IndexKeys = Tuple[Tuple[str, int], ...]
+
+# Server error code for an existing index with the same keys but different options
+INDEX_OPTIONS_CONFLICT = 85
+
+# Modules that declare QUERY_SHAPES or TTL_INDEXES
+SHAPE_MODULES = [
+    "app.services.tenant_service",
+    "app.services.usage_service",
+    "app.services.reference_service",
+    "app.services.reference_catalog",
+    "app.services.reference_stats",
+    "app.services.estimation_service",
+    "app.services.chat_service",
+    "app.services.feedback_service",
+    "app.services.feedback_rollups",
+    "app.services.tuning_service",
+    "app.services.job_queue",
+    "app.services.session_sweeper",
+    "app.core.rate_limit",
+]
+
+
+class QueryShape:
+    """
+    A query issued against a collection, with representative filter values.
+
+    Index keys follow the equality-sort-range rule: fields matched by value
+    first (in declaration order), then sort keys, then fields matched with
+    operators such as ``$gte``.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        collection: str,
+        filter: Dict[str, Any],
+        sort: Optional[List[Tuple[str, int]]] = None,
+        unique: bool = False
+    ):
+        self.name = name
+        self.collection = collection
+        self.filter = filter
+        self.sort = sort or []
+        self.unique = unique
+
+    @property
+    def index_keys(self) -> IndexKeys:
+        """Compound index keys serving this shape."""
+        equality = [(field, 1) for field, value in self.filter.items() if not _is_operator(value)]
+        ranges = [(field, 1) for field, value in self.filter.items() if _is_operator(value)]
+        sort_fields = {field for field, _ in self.sort}
+        keys = equality + list(self.sort) + [k for k in ranges if k[0] not in sort_fields]
+        return tuple(keys)
+
+    def __repr__(self) -> str:
+        return f"QueryShape({self.collection}.{self.name})"
+
+
+class TTLIndex:
+    """
+    A TTL index: documents are removed ``expire_after_seconds`` after the
+    date in ``field``. Documents without the field never expire.
+    """
+
+    def __init__(self, collection: str, field: str, expire_after_seconds: int):
+        self.collection = collection
+        self.field = field
+        self.expire_after_seconds = expire_after_seconds
+
+    @property
+    def index_keys(self) -> IndexKeys:
+        return ((self.field, 1),)
+
+    def __repr__(self) -> str:
+        return f"TTLIndex({self.collection}.{self.field}, {self.expire_after_seconds}s)"
+
+
+def _is_operator(value: Any) -> bool:
+    return isinstance(value, dict) and any(str(k).startswith("$") for k in value)
+
+
+def _fields(keys: IndexKeys) -> Tuple[str, ...]:
+    return tuple(field for field, _ in keys)
+
+
+def collect_query_shapes() -> List[QueryShape]:
+    """Gather QUERY_SHAPES from every declaring module."""
+    shapes: List[QueryShape] = []
+    for module_name in SHAPE_MODULES:
+        module = importlib.import_module(module_name)
+        shapes.extend(getattr(module, "QUERY_SHAPES", []))
+    return shapes
+
+
+def collect_ttl_indexes() -> List[TTLIndex]:
+    """Gather TTL_INDEXES from every declaring module."""
+    indexes: List[TTLIndex] = []
+    for module_name in SHAPE_MODULES:
+        module = importlib.import_module(module_name)
+        indexes.extend(getattr(module, "TTL_INDEXES", []))
+    return indexes
+
+
+def plan_indexes(shapes: List[QueryShape]) -> Dict[str, List[Tuple[IndexKeys, bool]]]:
+    """
+    Reduce query shapes to the minimal set of indexes per collection.
+
+    A key list is dropped when it is a prefix of another planned index, or
+    when a unique index on a prefix of it already pins the result to a
+    single document. Prefix checks compare field names only, which is
+    sufficient for single-key sorts; for the same reason key lists that
+    differ only in direction are planned once, as first declared.
+    """
+    by_collection: Dict[str, Dict[IndexKeys, bool]] = {}
+    declared: Dict[Tuple[str, Tuple[str, ...]], IndexKeys] = {}
+    for shape in shapes:
+        planned = by_collection.setdefault(shape.collection, {})
+        keys = declared.setdefault((shape.collection, _fields(shape.index_keys)), shape.index_keys)
+        planned[keys] = planned.get(keys, False) or shape.unique
+
+    plan: Dict[str, List[Tuple[IndexKeys, bool]]] = {}
+    for collection, planned in by_collection.items():
+        kept = []
+        for keys, unique in planned.items():
+            fields = _fields(keys)
+            covered = False
+            for other, other_unique in planned.items():
+                if other == keys:
+                    continue
+                other_fields = _fields(other)
+                if not unique and len(other_fields) > len(fields) and other_fields[:len(fields)] == fields:
+                    covered = True
+                elif other_unique and len(other_fields) < len(fields) and fields[:len(other_fields)] == other_fields:
+                    covered = True
+            if not covered:
+                kept.append((keys, unique))
+        plan[collection] = kept
+    return plan
+
+
+async def _ensure_ttl_index(db: AsyncIOMotorDatabase, ttl: TTLIndex) -> str:
+    """Create a TTL index, updating its expiry in place if it changed."""
+    collection = db[ttl.collection]
+    try:
+        return await collection.create_index(
+            list(ttl.index_keys), expireAfterSeconds=ttl.expire_after_seconds
+        )
+    except OperationFailure as e:
+        if e.code != INDEX_OPTIONS_CONFLICT:
+            raise
+        await db.command(
+            "collMod", ttl.collection,
+            index={"keyPattern": {ttl.field: 1}, "expireAfterSeconds": ttl.expire_after_seconds}
+        )
+        logger.info(f"Updated expiry of {ttl!r}")
+        return f"{ttl.field}_1"
+
+
+async def ensure_indexes(
+    db: Optional[AsyncIOMotorDatabase] = None,
+    shapes: Optional[List[QueryShape]] = None,
+    ttl_indexes: Optional[List[TTLIndex]] = None
+) -> List[str]:
+    """Create the planned indexes; existing identical indexes are left alone."""
+    if db is None:
+        from app.db.mongodb import get_database
+        db = get_database()
+    shapes = shapes if shapes is not None else collect_query_shapes()
+    ttl_indexes = ttl_indexes if ttl_indexes is not None else collect_ttl_indexes()
+
+    created = []
+    for ttl in ttl_indexes:
+        try:
+            name = await _ensure_ttl_index(db, ttl)
+            created.append(f"{ttl.collection}.{name}")
+        except OperationFailure as e:
+            logger.warning(f"Could not create {ttl!r}: {e}")
+
+    # A TTL index also serves queries on its field; don't plan a second one
+    ttl_keys = {(ttl.collection, ttl.index_keys) for ttl in ttl_indexes}
+    for collection, indexes in plan_indexes(shapes).items():
+        for keys, unique in indexes:
+            if (collection, keys) in ttl_keys and not unique:
+                continue
+            try:
+                name = await db[collection].create_index(list(keys), unique=unique)
+                created.append(f"{collection}.{name}")
+            except OperationFailure as e:
+                # Same keys with different options (e.g. a legacy non-unique index)
+                logger.warning(f"Could not create index {keys} on {collection}: {e}")
+
+    logger.info(f"Ensured {len(created)} indexes")
+    return created
+
+
+def _plan_stages(plan: Dict[str, Any]) -> List[str]:
+    """Flatten the stage names of a (possibly nested) winning plan."""
+    stages = [plan.get("stage", "")]
+    for child_key in ("inputStage", "queryPlan"):
+        if child_key in plan:
+            stages.extend(_plan_stages(plan[child_key]))
+    for child in plan.get("inputStages", []):
+        stages.extend(_plan_stages(child))
+    return stages
+
+
+async def verify_query_shapes(
+    db: Optional[AsyncIOMotorDatabase] = None,
+    shapes: Optional[List[QueryShape]] = None
+) -> List[str]:
+    """Explain every shape and report collection scans and in-memory sorts."""
+    if db is None:
+        from app.db.mongodb import get_database
+        db = get_database()
+    shapes = shapes if shapes is not None else collect_query_shapes()
+
+    problems = []
+    for shape in shapes:
+        cursor = db[shape.collection].find(shape.filter)
+        if shape.sort:
+            cursor = cursor.sort(shape.sort)
+        explain = await cursor.limit(1).explain()
+        stages = _plan_stages(explain["queryPlanner"]["winningPlan"])
+
+        if "COLLSCAN" in stages:
+            problems.append(f"{shape!r}: COLLSCAN")
+        if "SORT" in stages:
+            problems.append(f"{shape!r}: in-memory SORT")
+
+    for problem in problems:
+        logger.warning(f"Query shape check failed: {problem}")
+    return problems
+
+
+async def _main(check: bool) -> int:
+    from app.db.mongodb import connect_to_mongo, close_mongo_connection
+
+    await connect_to_mongo()
+    try:
+        await ensure_indexes()
+        if check and await verify_query_shapes():
+            return 1
+        return 0
+    finally:
+        await close_mongo_connection()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Create and verify MongoDB indexes")
+    parser.add_argument("--check", action="store_true", help="Explain each query shape after creating indexes")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(asyncio.run(_main(args.check)))
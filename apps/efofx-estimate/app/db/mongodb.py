@@ -6,12 +6,13 @@ and collection utilities for the estimation service.
 """
 
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
-from typing import Optional
+from typing import Any, Dict, Optional
 import logging
 from contextlib import asynccontextmanager
 
 from app.core.config import settings
 from app.core.constants import DB_COLLECTIONS
+from app.db.monitoring import CommandMetricsListener, PoolMetricsListener
 
 logger = logging.getLogger(__name__)
 
@@ -20,12 +21,38 @@ _client: Optional[AsyncIOMotorClient] = None
 _database: Optional[AsyncIOMotorDatabase] = None
 
 
+def client_options() -> Dict[str, Any]:
+    """
+    Driver options from settings.
+
+    Compression is negotiated with the server: the first listed compressor
+    both sides support is used, and ones whose library is not installed are
+    skipped by the driver with a warning.
+    """
+    options: Dict[str, Any] = {
+        "maxPoolSize": settings.MONGO_MAX_POOL_SIZE,
+        "minPoolSize": settings.MONGO_MIN_POOL_SIZE,
+        "compressors": settings.MONGO_COMPRESSORS,
+        "readPreference": settings.MONGO_READ_PREFERENCE,
+        "retryReads": settings.MONGO_RETRY_READS,
+        "retryWrites": settings.MONGO_RETRY_WRITES,
+        "event_listeners": [PoolMetricsListener()],
+    }
+    if settings.MONGO_MAX_IDLE_TIME_MS is not None:
+        options["maxIdleTimeMS"] = settings.MONGO_MAX_IDLE_TIME_MS
+    if settings.MONGO_WAIT_QUEUE_TIMEOUT_MS is not None:
+        options["waitQueueTimeoutMS"] = settings.MONGO_WAIT_QUEUE_TIMEOUT_MS
+    if settings.MONGO_COMMAND_MONITORING:
+        options["event_listeners"].append(CommandMetricsListener(settings.MONGO_SLOW_COMMAND_MS))
+    return options
+
+
 async def connect_to_mongo():
     """Create database connection."""
     global _client, _database
     
     try:
-        _client = AsyncIOMotorClient(settings.MONGO_URI)
+        _client = AsyncIOMotorClient(settings.MONGO_URI, **client_options())
         _database = _client[settings.MONGO_DB_NAME]
         
         # Test the connection
@@ -88,6 +115,11 @@ def get_reference_projects_collection():
     return get_collection(DB_COLLECTIONS["REFERENCE_PROJECTS"])
 
 
+def get_reference_stats_collection():
+    """Get reference stats collection."""
+    return get_collection(DB_COLLECTIONS["REFERENCE_STATS"])
+
+
 def get_estimates_collection():
     """Get estimates collection."""
     return get_collection(DB_COLLECTIONS["ESTIMATES"])
@@ -98,53 +130,48 @@ def get_feedback_collection():
     return get_collection(DB_COLLECTIONS["FEEDBACK"])
 
 
+def get_feedback_rollups_collection():
+    """Get weekly feedback rollups collection."""
+    return get_collection(DB_COLLECTIONS["FEEDBACK_ROLLUPS"])
+
+
+def get_tuning_data_collection():
+    """Get tuning data collection."""
+    return get_collection(DB_COLLECTIONS["TUNING_DATA"])
+
+
 def get_chat_sessions_collection():
     """Get chat sessions collection."""
     return get_collection(DB_COLLECTIONS["CHAT_SESSIONS"])
 
 
+def get_chat_messages_collection():
+    """Get chat messages collection."""
+    return get_collection(DB_COLLECTIONS["CHAT_MESSAGES"])
+
+
+def get_jobs_collection():
+    """Get background jobs collection."""
+    return get_collection(DB_COLLECTIONS["JOBS"])
+
+
+def get_tenant_usage_collection():
+    """Get tenant usage counters collection."""
+    return get_collection(DB_COLLECTIONS["TENANT_USAGE"])
+
+
+def get_rate_limits_collection():
+    """Get shared rate limit state collection."""
+    return get_collection(DB_COLLECTIONS["RATE_LIMITS"])
+
+
 # Database utilities
 async def create_indexes():
-    """Create database indexes for optimal performance."""
+    """Create the indexes declared by service query shapes."""
+    from app.db.indexes import ensure_indexes
+    
     try:
-        # Tenants collection indexes
-        tenants_collection = get_tenants_collection()
-        await tenants_collection.create_index("api_key", unique=True)
-        await tenants_collection.create_index("name")
-        
-        # Reference classes collection indexes
-        ref_classes_collection = get_reference_classes_collection()
-        await ref_classes_collection.create_index("name", unique=True)
-        await ref_classes_collection.create_index("category")
-        await ref_classes_collection.create_index("regions")
-        
-        # Reference projects collection indexes
-        ref_projects_collection = get_reference_projects_collection()
-        await ref_projects_collection.create_index("project_id", unique=True)
-        await ref_projects_collection.create_index("reference_class")
-        await ref_projects_collection.create_index("region")
-        await ref_projects_collection.create_index("completion_date")
-        
-        # Estimates collection indexes
-        estimates_collection = get_estimates_collection()
-        await estimates_collection.create_index("session_id", unique=True)
-        await estimates_collection.create_index("tenant_id")
-        await estimates_collection.create_index("status")
-        await estimates_collection.create_index("created_at")
-        
-        # Feedback collection indexes
-        feedback_collection = get_feedback_collection()
-        await feedback_collection.create_index("estimation_session_id")
-        await feedback_collection.create_index("tenant_id")
-        await feedback_collection.create_index("feedback_type")
-        await feedback_collection.create_index("created_at")
-        
-        # Chat sessions collection indexes
-        chat_sessions_collection = get_chat_sessions_collection()
-        await chat_sessions_collection.create_index("session_id", unique=True)
-        await chat_sessions_collection.create_index("tenant_id")
-        await chat_sessions_collection.create_index("estimation_session_id")
-        
+        await ensure_indexes(get_database())
         logger.info("Database indexes created successfully")
         
     except Exception as e:
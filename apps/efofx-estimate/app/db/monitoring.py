@@ -0,0 +1,113 @@
+"""
+MongoDB driver monitoring for efOfX Estimation Service.
+
+This module subscribes to pymongo's command and connection pool events
+and exports them as Prometheus metrics: per-collection and per-command
+latency, pool checkouts and the time spent waiting for a connection.
+Commands slower than a threshold are logged by name and namespace only,
+never with their arguments.
+
+Listeners run synchronously on the driver's threads (Motor executes
+pymongo in a thread pool), so they only do constant-time bookkeeping.
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Dict, Tuple
+
+from pymongo import monitoring
+
+from app.observability.metrics import mongo_metrics
+
+logger = logging.getLogger(__name__)
+
+# Commands whose first value is not a collection name
+_COLLECTION_FIELDS = {"getMore": "collection"}
+
+
+def command_collection(command_name: str, command: Dict[str, Any]) -> str:
+    """Collection a command targets, or "" for database and admin commands."""
+    value = command.get(_COLLECTION_FIELDS.get(command_name, command_name))
+    return value if isinstance(value, str) else ""
+
+
+class CommandMetricsListener(monitoring.CommandListener):
+    """Records command latency and logs slow commands."""
+
+    def __init__(self, slow_command_ms: float = 100.0):
+        self.slow_command_ms = slow_command_ms
+        # Namespace of each in-flight command, keyed by (request_id, connection_id)
+        self._in_flight: Dict[Tuple[int, Any], Tuple[str, str]] = {}
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        self._in_flight[(event.request_id, event.connection_id)] = (
+            event.database_name, command_collection(event.command_name, event.command)
+        )
+
+    def _finish(self, event, status: str) -> None:
+        database, collection = self._in_flight.pop((event.request_id, event.connection_id), ("", ""))
+        duration_ms = event.duration_micros / 1000
+        mongo_metrics.record_command(collection, event.command_name, status, duration_ms / 1000)
+        if duration_ms >= self.slow_command_ms:
+            logger.warning(
+                f"Slow MongoDB command {event.command_name} on {database}.{collection or '$cmd'}: "
+                f"{duration_ms:.1f}ms ({status})"
+            )
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        self._finish(event, "succeeded")
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        self._finish(event, "failed")
+
+
+class PoolMetricsListener(monitoring.ConnectionPoolListener):
+    """Records pool size, checkouts and checkout wait time per server."""
+
+    def __init__(self):
+        # Checkout start time; a checkout completes on the thread that started it
+        self._local = threading.local()
+
+    @staticmethod
+    def _address(event) -> str:
+        host, port = event.address
+        return f"{host}:{port}"
+
+    def _wait_seconds(self) -> float:
+        started = getattr(self._local, "checkout_started", None)
+        self._local.checkout_started = None
+        return time.perf_counter() - started if started is not None else 0.0
+
+    def pool_created(self, event: monitoring.PoolCreatedEvent) -> None:
+        pass
+
+    def pool_ready(self, event: monitoring.PoolReadyEvent) -> None:
+        pass
+
+    def pool_cleared(self, event: monitoring.PoolClearedEvent) -> None:
+        logger.warning(f"MongoDB connection pool for {self._address(event)} cleared")
+
+    def pool_closed(self, event: monitoring.PoolClosedEvent) -> None:
+        pass
+
+    def connection_created(self, event: monitoring.ConnectionCreatedEvent) -> None:
+        mongo_metrics.record_connection(self._address(event), 1)
+
+    def connection_ready(self, event: monitoring.ConnectionReadyEvent) -> None:
+        pass
+
+    def connection_closed(self, event: monitoring.ConnectionClosedEvent) -> None:
+        mongo_metrics.record_connection(self._address(event), -1)
+
+    def connection_check_out_started(self, event: monitoring.ConnectionCheckOutStartedEvent) -> None:
+        self._local.checkout_started = time.perf_counter()
+
+    def connection_check_out_failed(self, event: monitoring.ConnectionCheckOutFailedEvent) -> None:
+        mongo_metrics.record_checkout(self._address(event), event.reason, self._wait_seconds())
+
+    def connection_checked_out(self, event: monitoring.ConnectionCheckedOutEvent) -> None:
+        mongo_metrics.record_checkout(self._address(event), "ok", self._wait_seconds())
+
+    def connection_checked_in(self, event: monitoring.ConnectionCheckedInEvent) -> None:
+        mongo_metrics.record_checkin(self._address(event))
@@ -6,16 +6,30 @@ routers, and configuration for the estimation service.
 """
 
 from fastapi import FastAPI, Request, HTTPException
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from contextlib import asynccontextmanager
+import asyncio
 import time
 import logging
 import os
 
 from app.core.config import settings
 from app.api.routes import api_router
-from app.db.mongodb import connect_to_mongo, close_mongo_connection, health_check as db_health_check
+from app.db.mongodb import connect_to_mongo, close_mongo_connection, create_indexes, health_check as db_health_check
+from app.db.indexes import verify_query_shapes
+from app.middleware.profiling import RequestProfilingMiddleware
+from app.observability.loop_monitor import EventLoopMonitor
+from app.observability.metrics import metrics_app
+from app.services.reference_catalog import reference_catalog
+from app.services.job_queue import job_queue
+from app.services.session_sweeper import session_sweeper
+from app.services.chat_context import chat_context
+from app.services.tuning_service import tuning_factors
+from app.services.usage_service import usage_counters
+from app.services.platform_stats import platform_stats
+from app.services.estimation_service import ESTIMATION_JOB, run_estimation_job
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -30,13 +44,49 @@ async def lifespan(app: FastAPI):
     try:
         await connect_to_mongo()
         logger.info("MongoDB connection established")
+        if settings.MONGO_ENSURE_INDEXES:
+            await create_indexes()
+        if settings.MONGO_VERIFY_QUERY_SHAPES:
+            await verify_query_shapes()
+        try:
+            await usage_counters.ensure_index()
+        except Exception as e:
+            logger.error(f"Quota index unavailable, estimations cannot start until it is created: {e}")
+        reference_catalog.start()
+        session_sweeper.start()
+        tuning_factors.start()
+        usage_counters.start()
+        platform_stats.start()
     except Exception as e:
         logger.error(f"Failed to connect to MongoDB: {e}")
 
+    job_queue.register(ESTIMATION_JOB, run_estimation_job)
+    if settings.JOB_WORKERS_ENABLED:
+        job_queue.start()
+
+    loop_monitor = None
+    if settings.LOOP_MONITOR_ENABLED:
+        loop_monitor = EventLoopMonitor(
+            interval=settings.LOOP_MONITOR_INTERVAL,
+            block_threshold=settings.LOOP_BLOCK_THRESHOLD,
+            stack_sample_rate=settings.LOOP_STACK_SAMPLE_RATE,
+            stack_min_interval=settings.LOOP_STACK_MIN_INTERVAL,
+        )
+        loop_monitor.start()
+
     yield
 
     # Shutdown
     logger.info("Shutting down efOfX Estimation Service...")
+    await job_queue.stop()
+    await session_sweeper.stop()
+    await chat_context.stop()
+    await tuning_factors.stop()
+    await usage_counters.stop()
+    await platform_stats.stop()
+    await reference_catalog.stop()
+    if loop_monitor:
+        await loop_monitor.stop()
     await close_mongo_connection()
     logger.info("MongoDB connection closed")
 
@@ -65,6 +115,14 @@ app.add_middleware(
     allowed_hosts=settings.ALLOWED_HOSTS
 )
 
+# Per-request profiling is opt-in; nothing is installed unless enabled
+if settings.PROFILING_ENABLED and settings.PROFILING_REQUEST_TOKEN:
+    app.add_middleware(
+        RequestProfilingMiddleware,
+        token=settings.PROFILING_REQUEST_TOKEN,
+        interval=settings.PROFILING_INTERVAL_MS / 1000.0,
+    )
+
 # Request timing middleware
 @app.middleware("http")
 async def add_process_time_header(request: Request, call_next):
@@ -78,23 +136,51 @@ async def add_process_time_header(request: Request, call_next):
 # Include API routes
 app.include_router(api_router, prefix="/api/v1")
 
+# Prometheus metrics
+app.mount("/metrics", metrics_app)
+
 @app.get("/health")
 async def health_check():
     """
-    Health check endpoint with database status.
+    Liveness check; answers without touching the database.
 
     Returns:
-        dict: Service health status including database connectivity
+        dict: Service liveness status
     """
-    db_status = "connected" if await db_health_check() else "disconnected"
-
     return {
-        "status": "healthy" if db_status == "connected" else "degraded",
+        "status": "healthy",
         "service": "efOfX Estimation Service",
-        "database": db_status,
         "version": "1.0.0"
     }
 
+@app.get("/ready")
+async def readiness_check():
+    """
+    Readiness check: database ping and reference catalog.
+
+    Returns:
+        JSONResponse: 200 when ready to serve traffic, 503 otherwise
+    """
+    try:
+        db_ready = await asyncio.wait_for(db_health_check(), settings.READINESS_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        db_ready = False
+    checks = {
+        "database": "connected" if db_ready else "disconnected",
+        "reference_catalog": "loaded" if reference_catalog.loaded else "loading",
+    }
+    ready = db_ready and reference_catalog.loaded
+
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={
+            "status": "ready" if ready else "not_ready",
+            "service": "efOfX Estimation Service",
+            "checks": checks,
+            "version": "1.0.0"
+        }
+    )
+
 @app.get("/")
 async def root():
     """Root endpoint with service information."""
@@ -19,6 +19,7 @@ class ChatMessage(BaseModel):
     id: Optional[PyObjectId] = Field(default_factory=PyObjectId, alias="_id")
     session_id: str = Field(..., description="Associated session ID")
     message_id: str = Field(..., description="Unique message identifier")
+    seq: int = Field(default=0, description="Position in the session, starting at 1")
     role: str = Field(..., description="Message role (user, assistant, system)")
     content: str = Field(..., description="Message content")
     timestamp: datetime = Field(default_factory=datetime.utcnow, description="Message timestamp")
@@ -32,6 +33,7 @@ class ChatMessage(BaseModel):
             "example": {
                 "session_id": "sess_123456789",
                 "message_id": "msg_001",
+                "seq": 1,
                 "role": "user",
                 "content": "I want to install a 15x30 foot pool with spa in my backyard.",
                 "timestamp": "2024-01-01T00:00:00Z",
@@ -51,7 +53,10 @@ class ChatSession(BaseModel):
     tenant_id: PyObjectId = Field(..., description="Associated tenant ID")
     estimation_session_id: str = Field(..., description="Associated estimation session ID")
     status: str = Field(default="active", description="Session status")
-    messages: List[str] = Field(default_factory=list, description="Message IDs in order")
+    messages: List[str] = Field(default_factory=list, description="Most recent message IDs in order")
+    message_count: int = Field(default=0, description="Messages stored for this session")
+    summary: str = Field(default="", description="Running summary of earlier messages")
+    summarized_seq: int = Field(default=0, description="Last message seq folded into the summary")
     context: Dict[str, Any] = Field(default_factory=dict, description="Session context")
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
@@ -68,6 +73,7 @@ class ChatSession(BaseModel):
                 "estimation_session_id": "sess_123456789",
                 "status": "active",
                 "messages": ["msg_001", "msg_002", "msg_003"],
+                "message_count": 3,
                 "context": {
                     "project_type": "residential_pool",
                     "region": "SoCal - Coastal",
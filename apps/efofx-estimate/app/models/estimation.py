@@ -10,7 +10,7 @@ from typing import Optional, List, Dict, Any
 from datetime import datetime
 from bson import ObjectId
 
-from app.core.constants import EstimationStatus, Region, CostBreakdownCategory
+from app.core.constants import EstimationStatus, Region, CostBreakdownCategory, PENDING_ESTIMATION_STATUSES
 from app.models.tenant import PyObjectId
 
 
@@ -66,6 +66,15 @@ class CostBreakdown(BaseModel):
         }
 
 
+class PercentileRange(BaseModel):
+    """Model for a simulated distribution summary."""
+    
+    mean: float = Field(..., description="Mean across trials")
+    p50: float = Field(..., description="Median (P50)")
+    p80: float = Field(..., description="80th percentile")
+    p95: float = Field(..., description="95th percentile")
+
+
 class EstimationResult(BaseModel):
     """Model for estimation result."""
     
@@ -78,6 +87,12 @@ class EstimationResult(BaseModel):
     assumptions: List[str] = Field(default_factory=list, description="Key assumptions")
     risks: List[str] = Field(default_factory=list, description="Identified risks")
     reference_projects_used: List[str] = Field(default_factory=list, description="Reference projects used")
+    cost_percentiles: Optional[PercentileRange] = Field(None, description="Simulated total cost distribution")
+    cost_breakdown_percentiles: Optional[Dict[str, PercentileRange]] = Field(
+        None, description="Simulated distribution per cost category"
+    )
+    timeline_percentiles: Optional[PercentileRange] = Field(None, description="Simulated timeline distribution in weeks")
+    tuning_factor: float = Field(1.0, description="Feedback tuning factor applied to the costs")
     
     class Config:
         schema_extra = {
@@ -105,7 +120,9 @@ class EstimationResult(BaseModel):
                     "Soil conditions may require additional foundation work",
                     "Weather delays during construction"
                 ],
-                "reference_projects_used": ["pool_001", "pool_002", "pool_003"]
+                "reference_projects_used": ["pool_001", "pool_002", "pool_003"],
+                "cost_percentiles": {"mean": 63900.0, "p50": 62100.0, "p80": 71800.0, "p95": 82400.0},
+                "timeline_percentiles": {"mean": 8.2, "p50": 8.0, "p80": 9.4, "p95": 10.9}
             }
         }
 
@@ -128,6 +145,14 @@ class EstimationSession(BaseModel):
     updated_at: datetime = Field(default_factory=datetime.utcnow)
     completed_at: Optional[datetime] = Field(None, description="Completion timestamp")
     expires_at: Optional[datetime] = Field(None, description="Session expiration")
+    version: int = Field(default=0, description="Incremented on every status transition")
+    
+    def current_status(self, now: Optional[datetime] = None) -> EstimationStatus:
+        """Status as of ``now``; pending sessions past expires_at read as EXPIRED."""
+        now = now or datetime.utcnow()
+        if self.status in PENDING_ESTIMATION_STATUSES and self.expires_at and now > self.expires_at:
+            return EstimationStatus.EXPIRED
+        return self.status
     
     class Config:
         allow_population_by_field_name = True
@@ -179,6 +204,7 @@ class EstimationResponse(BaseModel):
     result: Optional[EstimationResult] = Field(None, description="Estimation result if completed")
     next_action: Optional[str] = Field(None, description="Next action required")
     estimated_completion: Optional[datetime] = Field(None, description="Estimated completion time")
+    progress: Optional[float] = Field(None, ge=0.0, le=1.0, description="Completed fraction while processing")
     
     class Config:
         schema_extra = {
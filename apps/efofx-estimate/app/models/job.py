@@ -0,0 +1,39 @@
+"""
+Background job models for efOfX Estimation Service.
+
+This module defines the job document processed by the worker pool.
+"""
+
+from pydantic import BaseModel, Field
+from typing import Optional, Dict, Any
+from datetime import datetime
+
+from app.core.constants import JobStatus
+
+
+class Job(BaseModel):
+    """Model for a queued unit of background work."""
+    
+    id: str = Field(..., alias="_id", description="Job identifier")
+    kind: str = Field(..., description="Handler name")
+    tenant_id: str = Field(..., description="Owning tenant, used for fair scheduling")
+    payload: Dict[str, Any] = Field(default_factory=dict, description="Handler arguments")
+    status: JobStatus = Field(default=JobStatus.QUEUED, description="Job status")
+    attempts: int = Field(default=0, description="Attempts started so far")
+    max_attempts: int = Field(default=3, description="Attempts before the job is failed")
+    progress: float = Field(default=0.0, ge=0.0, le=1.0, description="Completed fraction")
+    error: Optional[str] = Field(None, description="Last error message")
+    worker_id: Optional[str] = Field(None, description="Worker holding the lease")
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    available_at: datetime = Field(default_factory=datetime.utcnow, description="Earliest time the job may run")
+    started_at: Optional[datetime] = Field(None, description="Start of the current attempt")
+    finished_at: Optional[datetime] = Field(None, description="Completion timestamp")
+    lease_expires_at: Optional[datetime] = Field(None, description="Lease expiry of the current attempt")
+    
+    @property
+    def is_last_attempt(self) -> bool:
+        """Whether a failure of the current attempt is final."""
+        return self.attempts >= self.max_attempts
+    
+    class Config:
+        populate_by_name = True
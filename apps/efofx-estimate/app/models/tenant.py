@@ -16,13 +16,13 @@ class PyObjectId(ObjectId):
     @classmethod
     def __get_pydantic_core_schema__(cls, source_type, handler):
         from pydantic_core import core_schema
-        return core_schema.with_info_after_validator_function(
+        return core_schema.no_info_plain_validator_function(
             cls._validate,
-            handler(source_type),
+            serialization=core_schema.plain_serializer_function_ser_schema(str, when_used="json"),
         )
     
     @classmethod
-    def _validate(cls, v, handler):
+    def _validate(cls, v):
         if isinstance(v, ObjectId):
             return v
         if isinstance(v, str):
@@ -0,0 +1,6 @@
+"""
+Observability package for efOfX Estimation Service.
+
+This package contains profiling, metrics, and runtime diagnostics
+used to understand the service's behaviour in production.
+"""
@@ -0,0 +1,209 @@
+"""
+Prometheus metrics for efOfX Estimation Service.
+
+Metrics are exposed at /metrics on the main application.
+"""
+
+from prometheus_client import Counter, Gauge, Histogram, make_asgi_app
+
+
+class EventLoopMetrics:
+    """Event loop health metrics."""
+
+    def __init__(self):
+        self.lag_seconds = Histogram(
+            "event_loop_lag_seconds",
+            "Event loop scheduling lag in seconds",
+            buckets=[0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0]
+        )
+
+        self.blocked_total = Counter(
+            "event_loop_blocked_total",
+            "Times the event loop was blocked longer than the threshold"
+        )
+
+    def record_lag(self, lag_seconds: float) -> None:
+        """Record observed scheduling lag."""
+        self.lag_seconds.observe(lag_seconds)
+
+    def record_block(self) -> None:
+        """Record a blocking-call detection."""
+        self.blocked_total.inc()
+
+
+class JobQueueMetrics:
+    """Background job queue metrics."""
+
+    def __init__(self):
+        self.queue_depth = Gauge(
+            "job_queue_depth",
+            "Jobs waiting to run",
+            ["kind"]
+        )
+
+        self.running = Gauge(
+            "job_queue_running",
+            "Jobs currently held by workers in this process"
+        )
+
+        self.wait_seconds = Histogram(
+            "job_wait_seconds",
+            "Time from a job becoming available to a worker claiming it",
+            ["kind"],
+            buckets=[0.01, 0.05, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0]
+        )
+
+        self.duration_seconds = Histogram(
+            "job_duration_seconds",
+            "Job execution time per attempt",
+            ["kind", "status"],
+            buckets=[0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0]
+        )
+
+        self.jobs_total = Counter(
+            "jobs_total",
+            "Job attempts by outcome",
+            ["kind", "status"]
+        )
+
+    def record_depth(self, depth_by_kind: dict) -> None:
+        """Record queued jobs per kind."""
+        for kind, depth in depth_by_kind.items():
+            self.queue_depth.labels(kind=kind).set(depth)
+
+    def record_claim(self, kind: str, wait_seconds: float) -> None:
+        """Record a job being picked up."""
+        self.wait_seconds.labels(kind=kind).observe(max(wait_seconds, 0.0))
+        self.running.inc()
+
+    def record_finish(self, kind: str, status: str, duration_seconds: float) -> None:
+        """Record the outcome of one attempt (succeeded, retried or failed)."""
+        self.duration_seconds.labels(kind=kind, status=status).observe(duration_seconds)
+        self.jobs_total.labels(kind=kind, status=status).inc()
+        self.running.dec()
+
+
+class LLMMetrics:
+    """Token usage reported by the LLM provider."""
+
+    def __init__(self):
+        self.tokens_total = Counter(
+            "llm_tokens_total",
+            "Tokens billed by the LLM provider",
+            ["model", "type"]
+        )
+
+    def record_usage(self, model: str, prompt_tokens: int, completion_tokens: int) -> None:
+        """Record the usage block of one completion."""
+        self.tokens_total.labels(model=model, type="prompt").inc(prompt_tokens)
+        self.tokens_total.labels(model=model, type="completion").inc(completion_tokens)
+
+
+class ChatMetrics:
+    """Chat prompt size and summarization metrics."""
+
+    def __init__(self):
+        self.prompt_tokens = Histogram(
+            "chat_prompt_tokens",
+            "Estimated tokens per chat prompt",
+            buckets=[100, 250, 500, 750, 1000, 1500, 2000, 3000, 4000, 8000]
+        )
+
+        self.summaries_total = Counter(
+            "chat_summaries_total",
+            "Background conversation summary runs by outcome",
+            ["status"]
+        )
+
+    def record_prompt(self, tokens: int) -> None:
+        """Record the estimated size of a chat prompt."""
+        self.prompt_tokens.observe(tokens)
+
+    def record_summary(self, status: str) -> None:
+        """Record a summary run (updated, superseded or failed)."""
+        self.summaries_total.labels(status=status).inc()
+
+
+class TenantCacheMetrics:
+    """Tenant lookup cache effectiveness."""
+
+    def __init__(self):
+        self.lookups_total = Counter(
+            "tenant_cache_lookups_total",
+            "Tenant cache lookups by key kind and result",
+            ["kind", "result"]
+        )
+
+    def record_lookup(self, kind: str, result: str) -> None:
+        """Record a lookup by api_key or id (hit, negative_hit or miss)."""
+        self.lookups_total.labels(kind=kind, result=result).inc()
+
+
+class MongoMetrics:
+    """MongoDB driver command and connection pool metrics."""
+
+    def __init__(self):
+        self.command_duration_seconds = Histogram(
+            "mongo_command_duration_seconds",
+            "MongoDB command round-trip time",
+            ["collection", "command", "status"],
+            buckets=[0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0]
+        )
+
+        self.pool_connections = Gauge(
+            "mongo_pool_connections",
+            "Open connections in the driver pool",
+            ["address"]
+        )
+
+        self.pool_checked_out = Gauge(
+            "mongo_pool_checked_out",
+            "Connections currently checked out of the driver pool",
+            ["address"]
+        )
+
+        self.pool_checkouts_total = Counter(
+            "mongo_pool_checkouts_total",
+            "Connection checkouts by result (ok, or the failure reason)",
+            ["address", "result"]
+        )
+
+        self.pool_wait_seconds = Histogram(
+            "mongo_pool_wait_seconds",
+            "Time spent waiting to check a connection out of the pool",
+            ["address"],
+            buckets=[0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0]
+        )
+
+    def record_command(self, collection: str, command: str, status: str, duration_seconds: float) -> None:
+        """Record one command (succeeded or failed)."""
+        self.command_duration_seconds.labels(
+            collection=collection, command=command, status=status
+        ).observe(duration_seconds)
+
+    def record_connection(self, address: str, delta: int) -> None:
+        """Record a connection being opened (+1) or closed (-1)."""
+        self.pool_connections.labels(address=address).inc(delta)
+
+    def record_checkout(self, address: str, result: str, wait_seconds: float) -> None:
+        """Record a checkout attempt and how long it waited."""
+        self.pool_checkouts_total.labels(address=address, result=result).inc()
+        self.pool_wait_seconds.labels(address=address).observe(wait_seconds)
+        if result == "ok":
+            self.pool_checked_out.labels(address=address).inc()
+
+    def record_checkin(self, address: str) -> None:
+        """Record a connection returned to the pool."""
+        self.pool_checked_out.labels(address=address).dec()
+
+
+# Global metric instances
+event_loop_metrics = EventLoopMetrics()
+job_queue_metrics = JobQueueMetrics()
+llm_metrics = LLMMetrics()
+chat_metrics = ChatMetrics()
+tenant_cache_metrics = TenantCacheMetrics()
+mongo_metrics = MongoMetrics()
+
+# ASGI app serving the default registry
+metrics_app = make_asgi_app()
@@ -0,0 +1,200 @@
+"""
+Rolling conversation context for efOfX chat prompts.
+
+A prompt carries the session's extracted facts, a running summary of older
+turns and as many of the most recent messages as fit in a token budget, so
+its size stays flat however long the conversation runs. Once enough turns
+have accumulated past the summary, a background task folds the older ones
+into it.
+"""
+
+import asyncio
+import logging
+from typing import Any, Dict, List, Set
+
+from app.core.config import settings
+from app.db.mongodb import get_chat_messages_collection, get_chat_sessions_collection
+from app.models.chat import ChatSession
+from app.observability.metrics import chat_metrics
+
+logger = logging.getLogger(__name__)
+
+# Message reads here are (session_id, seq) range scans, served by the
+# history_page index declared in app.services.chat_service
+
+CHARS_PER_TOKEN = 4
+
+# Context keys kept out of prompts
+_INTERNAL_CONTEXT_KEYS = {"created_at"}
+
+_MESSAGE_PROJECTION = {"_id": 0, "seq": 1, "role": 1, "content": 1}
+
+_RECENT_HEADER = "Recent conversation:"
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count; about four characters per token for English text."""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def _render_message(message: Dict[str, Any]) -> str:
+    return f"{message['role'].capitalize()}: {message['content']}"
+
+
+class PromptContext:
+    """Conversation context selected for one prompt."""
+
+    def __init__(self, facts: Dict[str, Any], summary: str, messages: List[Dict[str, Any]]):
+        self.facts = facts
+        self.summary = summary
+        self.messages = messages
+
+    def render(self) -> str:
+        sections = []
+        if self.facts:
+            sections.append("Known project details:\n" + "\n".join(f"- {k}: {v}" for k, v in self.facts.items()))
+        if self.summary:
+            sections.append(f"Conversation summary:\n{self.summary}")
+        if self.messages:
+            sections.append(f"{_RECENT_HEADER}\n" + "\n".join(_render_message(m) for m in self.messages))
+        return "\n\n".join(sections)
+
+    @property
+    def tokens(self) -> int:
+        return estimate_tokens(self.render())
+
+
+class ChatContextManager:
+    """Builds bounded prompt context and maintains running summaries."""
+
+    def __init__(
+        self,
+        token_budget: int = 1500,
+        recent_messages: int = 12,
+        summary_trigger: int = 24,
+        summary_max_tokens: int = 300
+    ):
+        self.token_budget = token_budget
+        self.recent_messages = recent_messages
+        self.summary_trigger = summary_trigger
+        self.summary_max_tokens = summary_max_tokens
+        self._pending: Set[str] = set()
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def build(self, session: ChatSession) -> PromptContext:
+        """
+        Select context for the next prompt.
+
+        Facts and the summary are always included; recent messages after
+        the summary are added newest-first until the budget is spent.
+        """
+        facts = {k: v for k, v in session.context.items() if k not in _INTERNAL_CONTEXT_KEYS}
+        context = PromptContext(facts, session.summary, [])
+        if session.message_count <= session.summarized_seq:
+            return context
+
+        cursor = get_chat_messages_collection().find(
+            {"session_id": session.session_id, "seq": {"$gt": session.summarized_seq}},
+            _MESSAGE_PROJECTION
+        ).sort("seq", -1).limit(self.recent_messages)
+
+        remaining = self.token_budget - context.tokens - estimate_tokens(f"\n\n{_RECENT_HEADER}")
+        async for message in cursor:
+            cost = estimate_tokens(_render_message(message)) + 1
+            if cost > remaining:
+                break
+            context.messages.insert(0, message)
+            remaining -= cost
+        return context
+
+    def needs_summary(self, session: ChatSession) -> bool:
+        return session.message_count - session.summarized_seq > self.summary_trigger
+
+    def maybe_summarize(self, session: ChatSession, llm_service) -> None:
+        """Start a background summary update if enough turns have accumulated."""
+        if not self.needs_summary(session) or session.session_id in self._pending:
+            return
+        self._pending.add(session.session_id)
+        task = asyncio.create_task(self._summarize(session.session_id, llm_service))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _summarize(self, session_id: str, llm_service) -> None:
+        try:
+            await self.summarize(session_id, llm_service)
+        except Exception as e:
+            chat_metrics.record_summary("failed")
+            logger.error(f"Error summarizing chat session {session_id}: {e}")
+        finally:
+            self._pending.discard(session_id)
+
+    async def summarize(self, session_id: str, llm_service) -> bool:
+        """
+        Fold messages older than the recent window into the summary.
+
+        The update is conditional on the summary not having moved since it
+        was read, so concurrent runs cannot regress it. Returns whether
+        the summary was updated.
+        """
+        sessions = get_chat_sessions_collection()
+        session_data = await sessions.find_one(
+            {"session_id": session_id},
+            {"_id": 0, "summary": 1, "summarized_seq": 1, "message_count": 1}
+        )
+        if not session_data:
+            return False
+
+        summarized_seq = session_data.get("summarized_seq", 0)
+        through = session_data.get("message_count", 0) - self.recent_messages
+        if through <= summarized_seq:
+            return False
+
+        messages = await get_chat_messages_collection().find(
+            {"session_id": session_id, "seq": {"$gt": summarized_seq, "$lte": through}},
+            _MESSAGE_PROJECTION
+        ).sort("seq", 1).limit(self.summary_trigger * 2).to_list(length=None)
+        if not messages:
+            return False
+
+        prompt = f"""
+            Update the summary of a conversation between a client and a construction estimator.
+            Keep every project detail, requirement, constraint and open question; drop pleasantries.
+            Answer in at most {self.summary_max_tokens * 3 // 4} words.
+
+            Current summary:
+            {session_data.get("summary") or "(none)"}
+
+            New messages:
+            {chr(10).join(_render_message(m) for m in messages)}
+            """
+        summary = await llm_service.generate_response(
+            prompt,
+            "You summarize conversations accurately and concisely.",
+            max_tokens=self.summary_max_tokens
+        )
+
+        result = await sessions.update_one(
+            {"session_id": session_id, "summarized_seq": session_data.get("summarized_seq")},
+            {"$set": {"summary": summary.strip(), "summarized_seq": messages[-1]["seq"]}}
+        )
+        updated = result.modified_count == 1
+        chat_metrics.record_summary("updated" if updated else "superseded")
+        return updated
+
+    async def stop(self) -> None:
+        """Cancel in-flight summary tasks."""
+        for task in list(self._tasks):
+            task.cancel()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+        self._pending.clear()
+
+
+# Global context manager instance
+chat_context = ChatContextManager(
+    token_budget=settings.CHAT_CONTEXT_TOKEN_BUDGET,
+    recent_messages=settings.CHAT_RECENT_MESSAGES,
+    summary_trigger=settings.CHAT_SUMMARY_TRIGGER_MESSAGES,
+    summary_max_tokens=settings.CHAT_SUMMARY_MAX_TOKENS,
+)
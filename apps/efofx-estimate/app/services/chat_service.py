@@ -7,16 +7,52 @@ and session management.
 
 import uuid
 import logging
-from datetime import datetime
-from typing import List, Dict, Any, Optional
+from datetime import datetime, timedelta
+from typing import List, Dict, Any, Optional, AsyncIterator, Tuple
+
+from bson import ObjectId
+from pymongo import ReturnDocument
 
 from app.models.tenant import Tenant
 from app.models.chat import ChatRequest, ChatResponse, ChatMessage, ChatSession
-from app.db.mongodb import get_chat_sessions_collection
+from app.db.mongodb import get_chat_messages_collection, get_chat_sessions_collection
+from app.db.indexes import QueryShape, TTLIndex
+from app.core.config import settings
+from app.core.constants import DB_COLLECTIONS, ESTIMATION_CONFIG
 from app.services.llm_service import LLMService
+from app.services.chat_context import chat_context, estimate_tokens
+from app.observability.metrics import chat_metrics
+from app.utils.async_utils import aclosing
 
 logger = logging.getLogger(__name__)
 
+# Query shapes issued by this module (see app.db.indexes)
+QUERY_SHAPES = [
+    QueryShape("by_session_id", DB_COLLECTIONS["CHAT_SESSIONS"], {"session_id": "chat_sess_sample"}, unique=True),
+    QueryShape(
+        "by_session_and_tenant", DB_COLLECTIONS["CHAT_SESSIONS"],
+        {"session_id": "chat_sess_sample", "tenant_id": ObjectId("000000000000000000000000")}
+    ),
+    QueryShape(
+        "history_page", DB_COLLECTIONS["CHAT_MESSAGES"],
+        {"session_id": "chat_sess_sample", "seq": {"$lt": 100}},
+        sort=[("seq", -1)], unique=True
+    ),
+]
+
+# Chat sessions are disposable: expires_at slides forward on every message
+TTL_INDEXES = [
+    TTLIndex(DB_COLLECTIONS["CHAT_SESSIONS"], "expires_at", 0),
+    TTLIndex(DB_COLLECTIONS["CHAT_MESSAGES"], "timestamp", settings.CHAT_MESSAGE_RETENTION_DAYS * 86400),
+]
+
+# Fields returned by history reads
+HISTORY_PROJECTION = {"_id": 0, "message_id": 1, "seq": 1, "role": 1, "content": 1, "timestamp": 1}
+
+
+def _chat_expiry() -> datetime:
+    return datetime.utcnow() + timedelta(hours=settings.CHAT_SESSION_TTL_HOURS)
+
 
 class ChatService:
     """Service for handling chat functionality."""
@@ -24,88 +60,186 @@ class ChatService:
     def __init__(self):
         self.llm_service = LLMService()
         self.sessions_collection = get_chat_sessions_collection()
+        self.messages_collection = get_chat_messages_collection()
     
     async def send_message(self, request: ChatRequest, tenant: Tenant) -> ChatResponse:
         """Send a chat message and get response."""
         try:
             # Get or create chat session
             session = await self._get_or_create_session(request.session_id, tenant)
-            
-            # Create user message
-            user_message = ChatMessage(
-                session_id=session.session_id,
-                message_id=f"msg_{uuid.uuid4().hex[:8]}",
-                role="user",
-                content=request.message
-            )
+            user_message = self._new_message(session, "user", request.message)
             
             # Generate assistant response
             assistant_response = await self._generate_chat_response(request.message, session)
             
-            # Create assistant message
-            assistant_message = ChatMessage(
-                session_id=session.session_id,
-                message_id=f"msg_{uuid.uuid4().hex[:8]}",
-                role="assistant",
-                content=assistant_response["content"]
-            )
-            
-            # Update session
-            session.messages.extend([user_message.message_id, assistant_message.message_id])
-            session.context.update(assistant_response.get("context_updates", {}))
-            session.updated_at = datetime.utcnow()
-            
-            # Save to database (in production, you'd save messages separately)
-            await self.sessions_collection.update_one(
-                {"session_id": session.session_id},
-                {"$set": {
-                    "messages": session.messages,
-                    "context": session.context,
-                    "updated_at": session.updated_at
-                }}
-            )
-            
-            return ChatResponse(
-                session_id=session.session_id,
-                message_id=assistant_message.message_id,
-                content=assistant_message.content,
-                timestamp=assistant_message.timestamp,
-                next_action=assistant_response.get("next_action"),
-                context_updates=assistant_response.get("context_updates"),
-                is_complete=assistant_response.get("is_complete", False)
-            )
+            return await self._complete_turn(session, user_message, assistant_response)
             
         except Exception as e:
             logger.error(f"Error sending chat message: {e}")
             raise
     
-    async def get_chat_history(self, session_id: str, tenant: Tenant) -> List[Dict[str, Any]]:
-        """Get chat history for a session."""
+    async def stream_message(self, request: ChatRequest, tenant: Tenant) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Send a chat message and stream the response as events.
+        
+        Yields a ``start`` event with the session ID, a ``token`` event per
+        chunk of generated text and, once both messages are stored, a
+        ``done`` event carrying the ChatResponse. Failures end the stream
+        with an ``error`` event. If the consumer stops early the upstream
+        completion is closed and nothing is stored.
+        """
         try:
-            session_data = await self.sessions_collection.find_one({
-                "session_id": session_id,
-                "tenant_id": tenant.id
-            })
+            session = await self._get_or_create_session(request.session_id, tenant)
+        except Exception as e:
+            logger.error(f"Error starting chat stream: {e}")
+            yield {"event": "error", "data": {"detail": "Failed to process chat message"}}
+            return
+        
+        user_message = self._new_message(session, "user", request.message)
+        yield {"event": "start", "data": {"session_id": session.session_id}}
+        
+        parts: List[str] = []
+        try:
+            prompt, system_message = await self._build_prompt(request.message, session)
+            # Closing this generator closes the upstream stream right away,
+            # rather than whenever the abandoned generator is finalized
+            async with aclosing(self.llm_service.stream_response(
+                prompt, system_message, max_tokens=settings.CHAT_MAX_TOKENS
+            )) as deltas:
+                async for delta in deltas:
+                    parts.append(delta)
+                    yield {"event": "token", "data": {"content": delta}}
+            
+            assistant_response = self._response_details(request.message, session, "".join(parts).strip())
+            response = await self._complete_turn(session, user_message, assistant_response)
+        except Exception as e:
+            logger.error(f"Error streaming chat response: {e}")
+            yield {"event": "error", "data": {"detail": "Failed to process chat message"}}
+            return
+        
+        yield {"event": "done", "data": response.dict()}
+    
+    async def get_chat_history(
+        self,
+        session_id: str,
+        tenant: Tenant,
+        before_seq: Optional[int] = None,
+        limit: int = ESTIMATION_CONFIG["DEFAULT_CHAT_HISTORY_LIMIT"]
+    ) -> Dict[str, Any]:
+        """
+        Get one page of chat history, oldest message first.
+        
+        Pages walk backwards from the newest message: pass the returned
+        ``next_before_seq`` as ``before_seq`` to fetch the preceding page.
+        It is None once the start of the conversation is reached.
+        """
+        try:
+            session_data = await self.sessions_collection.find_one(
+                {"session_id": session_id, "tenant_id": tenant.id},
+                {"_id": 1}
+            )
             
             if not session_data:
                 raise ValueError("Chat session not found")
             
-            # In production, you'd fetch actual messages from a messages collection
-            # For now, return a simplified history
-            return [
-                {
-                    "message_id": f"msg_{i}",
-                    "role": "user" if i % 2 == 0 else "assistant",
-                    "content": f"Message {i+1}",
-                    "timestamp": datetime.utcnow().isoformat()
-                }
-                for i in range(len(session_data.get("messages", [])))
-            ]
+            limit = max(1, min(limit, ESTIMATION_CONFIG["MAX_CHAT_HISTORY_LIMIT"]))
+            query: Dict[str, Any] = {"session_id": session_id}
+            if before_seq is not None:
+                query["seq"] = {"$lt": before_seq}
+            
+            cursor = self.messages_collection.find(query, HISTORY_PROJECTION).sort("seq", -1).limit(limit + 1)
+            messages = await cursor.to_list(length=limit + 1)
+            
+            has_more = len(messages) > limit
+            messages = messages[:limit]
+            messages.reverse()
+            
+            return {
+                "messages": messages,
+                "next_before_seq": messages[0]["seq"] if has_more else None
+            }
             
         except Exception as e:
             logger.error(f"Error getting chat history: {e}")
             raise
     
+    def _new_message(self, session: ChatSession, role: str, content: str) -> ChatMessage:
+        return ChatMessage(
+            session_id=session.session_id,
+            message_id=f"msg_{uuid.uuid4().hex[:8]}",
+            role=role,
+            content=content
+        )
+    
+    async def _complete_turn(
+        self,
+        session: ChatSession,
+        user_message: ChatMessage,
+        assistant_response: Dict[str, Any]
+    ) -> ChatResponse:
+        """Store the user message and the reply, then build the response."""
+        assistant_message = self._new_message(session, "assistant", assistant_response["content"])
+        
+        await self._append_messages(
+            session, [user_message, assistant_message], assistant_response.get("context_updates", {})
+        )
+        chat_context.maybe_summarize(session, self.llm_service)
+        
+        return ChatResponse(
+            session_id=session.session_id,
+            message_id=assistant_message.message_id,
+            content=assistant_message.content,
+            timestamp=assistant_message.timestamp,
+            next_action=assistant_response.get("next_action"),
+            context_updates=assistant_response.get("context_updates"),
+            is_complete=assistant_response.get("is_complete", False)
+        )
+    
+    async def _append_messages(
+        self,
+        session: ChatSession,
+        messages: List[ChatMessage],
+        context_updates: Dict[str, Any]
+    ) -> None:
+        """
+        Store one turn's messages.
+        
+        The session update reserves sequence numbers, keeps only the most
+        recent message IDs and sets only the changed context keys, so the
+        write size does not grow with the conversation.
+        """
+        now = datetime.utcnow()
+        updates = {f"context.{key}": value for key, value in context_updates.items()}
+        updates.update({"updated_at": now, "expires_at": _chat_expiry()})
+        
+        session_data = await self.sessions_collection.find_one_and_update(
+            {"session_id": session.session_id},
+            {
+                "$inc": {"message_count": len(messages)},
+                "$push": {"messages": {
+                    "$each": [message.message_id for message in messages],
+                    "$slice": -ESTIMATION_CONFIG["MAX_CHAT_MESSAGES"]
+                }},
+                "$set": updates
+            },
+            projection={"_id": 0, "message_count": 1},
+            return_document=ReturnDocument.AFTER
+        )
+        if session_data is None:
+            raise ValueError("Chat session not found")
+        
+        first_seq = session_data["message_count"] - len(messages) + 1
+        for offset, message in enumerate(messages):
+            message.seq = first_seq + offset
+        await self.messages_collection.insert_many(
+            [message.dict(by_alias=True) for message in messages], ordered=True
+        )
+        
+        session.messages = (session.messages + [m.message_id for m in messages])[-ESTIMATION_CONFIG["MAX_CHAT_MESSAGES"]:]
+        session.message_count = session_data["message_count"]
+        session.context.update(context_updates)
+        session.updated_at = now
+    
     async def _get_or_create_session(self, session_id: Optional[str], tenant: Tenant) -> ChatSession:
         """Get existing session or create new one."""
         if session_id:
@@ -123,20 +257,21 @@ class ChatService:
             session_id=new_session_id,
             tenant_id=tenant.id,
             estimation_session_id="",  # Will be set when estimation starts
-            context={"created_at": datetime.utcnow().isoformat()}
+            context={"created_at": datetime.utcnow().isoformat()},
+            expires_at=_chat_expiry()
         )
         
         await self.sessions_collection.insert_one(session.dict(by_alias=True))
         return session
     
-    async def _generate_chat_response(self, message: str, session: ChatSession) -> Dict[str, Any]:
-        """Generate chat response using LLM."""
-        try:
-            # Create context-aware prompt
-            prompt = f"""
+    async def _build_prompt(self, message: str, session: ChatSession) -> Tuple[str, str]:
+        """Create a context-aware prompt from a bounded slice of the conversation."""
+        context = await chat_context.build(session)
+        prompt = f"""
             You are an expert construction estimator helping a client with project estimation.
             
-            Current session context: {session.context}
+            {context.render()}
+            
             User message: {message}
             
             Provide a helpful, professional response that:
@@ -145,27 +280,33 @@ class ChatService:
             3. Provides relevant information about estimation process
             4. Guides them toward completing their project description
             """
-            
-            system_message = """
+        
+        system_message = """
             You are a professional construction estimator assistant. Be helpful, knowledgeable,
             and guide users through the estimation process. Ask clarifying questions when needed
             to gather complete project information.
             """
-            
-            response = await self.llm_service.generate_response(prompt, system_message)
-            
-            # Determine next action based on message content
-            next_action = self._determine_next_action(message, session.context)
-            
-            # Update context based on message
-            context_updates = self._extract_context_updates(message)
-            
-            return {
-                "content": response,
-                "next_action": next_action,
-                "context_updates": context_updates,
-                "is_complete": "complete" in message.lower() or "done" in message.lower()
-            }
+        
+        chat_metrics.record_prompt(estimate_tokens(prompt) + estimate_tokens(system_message))
+        return prompt, system_message
+    
+    def _response_details(self, message: str, session: ChatSession, content: str) -> Dict[str, Any]:
+        """Attach the next action and context updates derived from the user message."""
+        return {
+            "content": content,
+            "next_action": self._determine_next_action(message, session.context),
+            "context_updates": self._extract_context_updates(message),
+            "is_complete": "complete" in message.lower() or "done" in message.lower()
+        }
+    
+    async def _generate_chat_response(self, message: str, session: ChatSession) -> Dict[str, Any]:
+        """Generate chat response using LLM."""
+        try:
+            prompt, system_message = await self._build_prompt(message, session)
+            response = await self.llm_service.generate_response(
+                prompt, system_message, max_tokens=settings.CHAT_MAX_TOKENS
+            )
+            return self._response_details(message, session, response)
             
         except Exception as e:
             logger.error(f"Error generating chat response: {e}")
@@ -6,21 +6,88 @@ using Reference Class Forecasting (RCF) and LLM integration.
 """
 
 import uuid
+import asyncio
 import logging
 from datetime import datetime, timedelta
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Awaitable, Callable
 from fastapi import UploadFile
+from bson import ObjectId
 
 from app.core.config import settings
-from app.core.constants import EstimationStatus, API_MESSAGES, ESTIMATION_CONFIG
+from app.core.constants import (
+    EstimationStatus, API_MESSAGES, ESTIMATION_CONFIG, DB_COLLECTIONS,
+    COST_BREAKDOWN_SHARES, REGION_COST_MULTIPLIERS, PENDING_ESTIMATION_STATUSES
+)
 from app.models.tenant import Tenant
-from app.models.estimation import EstimationRequest, EstimationResponse, EstimationSession, EstimationResult
+from app.models.job import Job
+from app.models.estimation import (
+    CostBreakdown, EstimationRequest, EstimationResponse, EstimationSession, EstimationResult, PercentileRange
+)
 from app.db.mongodb import get_estimates_collection
+from app.db.indexes import QueryShape
 from app.services.llm_service import LLMService
 from app.services.reference_service import ReferenceService
+from app.services.reference_catalog import reference_catalog
+from app.services.reference_stats import ReferenceStatsService
+from app.services.job_queue import job_queue
+from app.services.estimation_state import EstimationStateMachine, StaleTransitionError
+from app.services.tuning_service import tuning_factors
+from app.services.usage_service import usage_counters
+from app.utils.calculation_utils import apply_tuning_factors, calculate_cost_breakdown
+from app.utils.file_utils import save_uploaded_file, validate_file_type
+from app.utils.monte_carlo import SimulationInput, simulate, stable_seed
+from app.utils.pagination import paginate
 
 logger = logging.getLogger(__name__)
 
+# Job kind processed by run_estimation_job
+ESTIMATION_JOB = "estimation"
+
+# Query shapes issued by this module (see app.db.indexes)
+QUERY_SHAPES = [
+    QueryShape("by_session_id", DB_COLLECTIONS["ESTIMATES"], {"session_id": "sess_sample"}, unique=True),
+    QueryShape(
+        "by_session_and_tenant", DB_COLLECTIONS["ESTIMATES"],
+        {"session_id": "sess_sample", "tenant_id": ObjectId("000000000000000000000000")}
+    ),
+    QueryShape(
+        "by_tenant_newest", DB_COLLECTIONS["ESTIMATES"],
+        {"tenant_id": ObjectId("000000000000000000000000")}, sort=[("created_at", -1), ("_id", -1)]
+    ),
+    QueryShape(
+        "by_tenant_class_newest", DB_COLLECTIONS["ESTIMATES"],
+        {"tenant_id": ObjectId("000000000000000000000000"), "reference_class": "residential_pool"},
+        sort=[("created_at", -1), ("_id", -1)]
+    ),
+]
+
+# Tenant listings page through estimates newest first
+ESTIMATE_LIST_SORT = [("created_at", -1), ("_id", -1)]
+
+# Listing fields; results and conversation details are fetched per session
+ESTIMATE_LIST_PROJECTION = {
+    "session_id": 1, "status": 1, "expires_at": 1, "region": 1, "reference_class": 1,
+    "result.total_cost": 1, "result.timeline_weeks": 1,
+}
+
+
+def _estimate_list_item(document: Dict[str, Any]) -> Dict[str, Any]:
+    """Listing item for an estimation session, with expiry applied as on read."""
+    status = document["status"]
+    expires_at = document.get("expires_at")
+    if status in PENDING_ESTIMATION_STATUSES and expires_at and datetime.utcnow() > expires_at:
+        status = EstimationStatus.EXPIRED
+    result = document.get("result") or {}
+    return {
+        "session_id": document["session_id"],
+        "status": status,
+        "region": document.get("region"),
+        "reference_class": document.get("reference_class"),
+        "total_cost": result.get("total_cost"),
+        "timeline_weeks": result.get("timeline_weeks"),
+        "created_at": document["created_at"],
+    }
+
 
 class EstimationService:
     """Service for handling estimation logic and sessions."""
@@ -28,11 +95,17 @@ class EstimationService:
     def __init__(self):
         self.llm_service = LLMService()
         self.reference_service = ReferenceService()
+        self.stats_service = ReferenceStatsService()
         self.collection = get_estimates_collection()
+        self.state = EstimationStateMachine(self.collection)
     
     async def start_estimation(self, request: EstimationRequest, tenant: Tenant) -> EstimationResponse:
-        """Start a new estimation session."""
+        """Start a new estimation session; raises QuotaExceededError at the monthly limit."""
         try:
+            # Count against the monthly quota before doing any work
+            started_at = datetime.utcnow()
+            await usage_counters.reserve(tenant.id, tenant.max_estimations_per_month, now=started_at)
+            
             # Generate session ID
             session_id = f"sess_{uuid.uuid4().hex[:12]}"
             
@@ -48,19 +121,34 @@ class EstimationService:
                 expires_at=datetime.utcnow() + timedelta(minutes=settings.SESSION_TIMEOUT_MINUTES)
             )
             
-            # Save to database
-            await self.collection.insert_one(session.dict(by_alias=True))
-            
-            # Start estimation process
-            result = await self._process_estimation(session, tenant)
+            # Save to database; unset optional fields are left out of the document
+            try:
+                await self.collection.insert_one(session.dict(by_alias=True, exclude_none=True))
+            except Exception:
+                await usage_counters.release(tenant.id, started_at)
+                raise
+            
+            # Hand off to the worker pool; the session ID doubles as the job ID
+            try:
+                await job_queue.enqueue(
+                    ESTIMATION_JOB, str(tenant.id), {"session_id": session_id}, job_id=session_id
+                )
+            except Exception:
+                # Without a job the session would never run; withdraw it and its quota
+                try:
+                    await self.collection.delete_one({"session_id": session_id, "tenant_id": tenant.id})
+                finally:
+                    await usage_counters.release(tenant.id, started_at)
+                raise
             
             return EstimationResponse(
                 session_id=session_id,
-                status=result.status,
+                status=session.status,
                 message=API_MESSAGES["ESTIMATION_STARTED"],
-                result=result.result,
+                result=None,
                 next_action="wait_for_completion",
-                estimated_completion=datetime.utcnow() + timedelta(minutes=5)
+                estimated_completion=datetime.utcnow() + timedelta(minutes=5),
+                progress=0.0
             )
             
         except Exception as e:
@@ -81,113 +169,169 @@ class EstimationService:
             
             session = EstimationSession(**session_data)
             
-            # Check if session has expired
-            if session.expires_at and datetime.utcnow() > session.expires_at:
-                session.status = EstimationStatus.EXPIRED
-                await self.collection.update_one(
-                    {"session_id": session_id},
-                    {"$set": {"status": EstimationStatus.EXPIRED}}
-                )
+            # Expiry is computed on read and persisted by the session sweeper
+            status = session.current_status()
+            
+            # Progress lives on the job while the session is pending
+            progress = 1.0 if status == EstimationStatus.COMPLETED else None
+            if status in PENDING_ESTIMATION_STATUSES:
+                job = await job_queue.get(session_id)
+                progress = job.progress if job else None
             
             return EstimationResponse(
                 session_id=session_id,
-                status=session.status,
-                message=API_MESSAGES.get(f"ESTIMATION_{session.status.upper()}", "Estimation status retrieved"),
+                status=status,
+                message=API_MESSAGES.get(f"ESTIMATION_{status.upper()}", "Estimation status retrieved"),
                 result=session.result,
-                next_action=None if session.status == EstimationStatus.COMPLETED else "wait_for_completion",
-                estimated_completion=session.completed_at
+                next_action=None if status == EstimationStatus.COMPLETED else "wait_for_completion",
+                estimated_completion=session.completed_at,
+                progress=progress
             )
             
         except Exception as e:
             logger.error(f"Error getting estimation: {e}")
             raise
     
+    async def list_estimations(
+        self,
+        tenant: Tenant,
+        limit: int = ESTIMATION_CONFIG["DEFAULT_LIST_LIMIT"],
+        cursor: Optional[str] = None,
+        reference_class: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """List a tenant's estimation sessions newest first, one keyset page at a time."""
+        try:
+            query: Dict[str, Any] = {"tenant_id": tenant.id}
+            if reference_class:
+                query["reference_class"] = reference_class
+            
+            return await paginate(
+                self.collection, query, ESTIMATE_LIST_SORT, limit, cursor,
+                projection=ESTIMATE_LIST_PROJECTION, transform=_estimate_list_item
+            )
+            
+        except Exception as e:
+            logger.error(f"Error listing estimations: {e}")
+            raise
+    
     async def upload_image(self, session_id: str, file: UploadFile, tenant: Tenant) -> str:
         """Upload image for estimation session."""
         try:
             # Validate file type
-            if file.content_type not in settings.ALLOWED_IMAGE_TYPES:
+            if not validate_file_type(file):
                 raise ValueError("Invalid file type")
             
-            # Validate file size
-            if file.size > settings.MAX_FILE_SIZE:
-                raise ValueError("File too large")
+            # Check the session before storing anything for it
+            query = {"session_id": session_id, "tenant_id": tenant.id}
+            if not await self.collection.find_one(query, {"_id": 1}):
+                raise ValueError("Estimation session not found")
             
-            # Generate image URL (in production, this would upload to cloud storage)
-            image_url = f"https://storage.efofx.ai/images/{session_id}/{file.filename}"
+            # Size is enforced while streaming; the declared size is not trusted
+            stored = await save_uploaded_file(file, str(tenant.id))
+            if stored.deduplicated:
+                logger.info(f"Image for session {session_id} already stored as {stored.sha256}")
             
-            # Update session with image URL
-            await self.collection.update_one(
-                {"session_id": session_id, "tenant_id": tenant.id},
-                {"$push": {"images": image_url}}
-            )
+            # Update session with image URL; the same image is listed once
+            await self.collection.update_one(query, {"$addToSet": {"images": stored.url}})
             
-            return image_url
+            return stored.url
             
         except Exception as e:
             logger.error(f"Error uploading image: {e}")
             raise
     
-    async def _process_estimation(self, session: EstimationSession, tenant: Tenant) -> EstimationSession:
-        """Process estimation using RCF and LLM."""
+    async def process_job(self, job: Job, report_progress: Callable[[float], Awaitable[None]]) -> None:
+        """Run a queued estimation job."""
+        # Read and move to IN_PROGRESS in one write
+        session = await self.state.claim(job.payload["session_id"])
+        if session is None:
+            # Missing, finished by an earlier delivery of the same job, or expired while queued
+            logger.info(f"Skipping estimation job {job.id}: session is no longer pending")
+            return
+        
         try:
-            # Update status to in progress
-            session.status = EstimationStatus.IN_PROGRESS
-            await self.collection.update_one(
-                {"session_id": session.session_id},
-                {"$set": {"status": EstimationStatus.IN_PROGRESS}}
-            )
+            await self._process_estimation(session, report_progress)
+        except StaleTransitionError as e:
+            # Another worker took the session over; its result wins
+            logger.warning(f"Discarding estimation result: {e}")
+        except Exception:
+            # Earlier attempts are retried by the queue; only the last one fails the session
+            if job.is_last_attempt:
+                try:
+                    await self.state.transition(
+                        session, EstimationStatus.FAILED, write_concern=self.state.final_write_concern
+                    )
+                except StaleTransitionError:
+                    pass
+            raise
+    
+    async def _process_estimation(
+        self,
+        session: EstimationSession,
+        report_progress: Optional[Callable[[float], Awaitable[None]]] = None
+    ) -> EstimationSession:
+        """Process a claimed (IN_PROGRESS) session using RCF and LLM."""
+        async def progress(fraction: float) -> None:
+            if report_progress:
+                await report_progress(fraction)
+        
+        try:
+            await progress(0.1)
             
             # Classify project using LLM
             reference_class = await self._classify_project(session.description, session.region)
+            await progress(0.4)
             
-            # Get reference projects
-            reference_projects = await self.reference_service.get_reference_projects(
-                reference_class, session.region
-            )
+            # Get precomputed reference statistics for the class and region
+            reference_stats = await self.stats_service.get_stats(reference_class, session.region)
+            await progress(0.5)
             
             # Generate estimation using LLM
             estimation_result = await self._generate_estimation(
                 session.description,
                 session.region,
                 reference_class,
-                reference_projects
+                reference_stats
             )
             
-            # Update session with results
-            session.reference_class = reference_class
-            session.result = estimation_result
-            session.status = EstimationStatus.COMPLETED
-            session.completed_at = datetime.utcnow()
-            
-            # Save updated session
-            await self.collection.update_one(
-                {"session_id": session.session_id},
-                {"$set": {
+            # Save results with the status change in one conditional write
+            completed_at = datetime.utcnow()
+            await self.state.transition(
+                session,
+                EstimationStatus.COMPLETED,
+                {
                     "reference_class": reference_class,
                     "result": estimation_result.dict(),
-                    "status": EstimationStatus.COMPLETED,
-                    "completed_at": session.completed_at,
-                    "updated_at": datetime.utcnow()
-                }}
+                    "completed_at": completed_at,
+                },
+                write_concern=self.state.final_write_concern
             )
+            session.reference_class = reference_class
+            session.result = estimation_result
+            session.completed_at = completed_at
             
             return session
             
         except Exception as e:
             logger.error(f"Error processing estimation: {e}")
-            # Update status to failed
-            await self.collection.update_one(
-                {"session_id": session.session_id},
-                {"$set": {"status": "failed"}}
-            )
             raise
     
     async def _classify_project(self, description: str, region: str) -> str:
-        """Classify project using LLM."""
+        """Classify project locally, falling back to the LLM when unsure."""
         try:
-            # Get available reference classes
-            reference_classes = await self.reference_service.get_reference_classes()
+            snapshot = await reference_catalog.get_snapshot()
+            candidates, confidence = snapshot.classify(description, k=settings.CLASSIFIER_TOP_K)
+            
+            if candidates and confidence >= settings.CLASSIFIER_CONFIDENCE_THRESHOLD:
+                return candidates[0][0]
+            
+            # Ask the LLM to pick among the short-list only; with no lexical
+            # match at all, offer every class
+            shortlist = [name for name, _ in candidates] or snapshot.names
+            logger.info(
+                f"Low classification confidence ({confidence:.2f}); "
+                f"asking LLM among {len(shortlist)} candidates"
+            )
             
             # Create classification prompt
             prompt = f"""
@@ -196,7 +340,7 @@ class EstimationService:
             Project Description: {description}
             Region: {region}
             
-            Available Reference Classes: {[rc.name for rc in reference_classes]}
+            Available Reference Classes: {shortlist}
             
             Please provide only the reference class name as your response.
             """
@@ -207,11 +351,10 @@ class EstimationService:
             # Extract reference class from response
             reference_class = response.strip().lower()
             
-            # Validate reference class exists
-            valid_classes = [rc.name for rc in reference_classes]
-            if reference_class not in valid_classes:
-                # Default to first available class
-                reference_class = valid_classes[0] if valid_classes else "general"
+            # Validate reference class is one of the candidates
+            if reference_class not in shortlist:
+                # Default to best local candidate
+                reference_class = shortlist[0] if shortlist else "general"
             
             return reference_class
             
@@ -224,7 +367,7 @@ class EstimationService:
         description: str, 
         region: str, 
         reference_class: str, 
-        reference_projects: List[Dict[str, Any]]
+        reference_stats: Optional[Dict[str, Any]]
     ) -> EstimationResult:
         """Generate estimation using LLM and reference data."""
         try:
@@ -237,7 +380,7 @@ class EstimationService:
             - Region: {region}
             - Reference Class: {reference_class}
             
-            Reference Projects: {reference_projects[:5]}  # Use top 5 most relevant
+            Reference Statistics: {self._format_reference_stats(reference_stats)}
             
             Please provide a structured estimate with:
             1. Total estimated cost
@@ -254,7 +397,11 @@ class EstimationService:
             
             # Parse response and create estimation result
             # This is a simplified version - in production, you'd have more sophisticated parsing
-            estimation_result = self._parse_estimation_response(response, reference_projects)
+            estimation_result = self._parse_estimation_response(response, reference_stats, region)
+            tuning_factor = self._apply_tuning(estimation_result, reference_class, region)
+            await self._attach_simulation(
+                estimation_result, description, region, reference_class, reference_stats, tuning_factor
+            )
             
             return estimation_result
             
@@ -263,26 +410,43 @@ class EstimationService:
             # Return default estimation
             return self._create_default_estimation(description, region, reference_class)
     
-    def _parse_estimation_response(self, response: str, reference_projects: List[Dict[str, Any]]) -> EstimationResult:
+    def _format_reference_stats(self, reference_stats: Optional[Dict[str, Any]]) -> str:
+        """Render reference statistics compactly for the estimation prompt."""
+        if not reference_stats:
+            return "No reference projects available for this class and region"
+        
+        cost = reference_stats["total_cost"]
+        timeline = reference_stats["timeline_weeks"]
+        return (
+            f"{reference_stats['count']} projects; "
+            f"cost mean ${cost['mean']:,.0f}, P50 ${cost['p50']:,.0f}, P80 ${cost['p80']:,.0f}, P95 ${cost['p95']:,.0f}; "
+            f"timeline P50 {timeline['p50']:.0f} weeks, P80 {timeline['p80']:.0f}, P95 {timeline['p95']:.0f}; "
+            f"average team size {reference_stats['team_size']['mean']:.1f}; "
+            f"average breakdown {reference_stats.get('cost_breakdown_mean', {})}"
+        )
+    
+    def _parse_estimation_response(
+        self,
+        response: str,
+        reference_stats: Optional[Dict[str, Any]],
+        region: str
+    ) -> EstimationResult:
         """Parse LLM response into structured estimation result."""
         # This is a simplified parser - in production, you'd use more sophisticated parsing
         # or structured output from the LLM
         
-        # Calculate average from reference projects
-        avg_cost = sum(p.get("total_cost", 50000) for p in reference_projects) / len(reference_projects) if reference_projects else 50000
-        avg_timeline = sum(p.get("timeline_weeks", 8) for p in reference_projects) / len(reference_projects) if reference_projects else 8
-        avg_team_size = sum(p.get("team_size", 4) for p in reference_projects) / len(reference_projects) if reference_projects else 4
+        # Use precomputed reference statistics; they are already regional
+        if reference_stats and reference_stats.get("count"):
+            avg_cost = reference_stats["total_cost"]["mean"]
+            avg_timeline = reference_stats["timeline_weeks"]["mean"]
+            avg_team_size = reference_stats["team_size"]["mean"]
+            projects_used = reference_stats.get("top_project_ids", [])
+        else:
+            avg_cost = 50000 * REGION_COST_MULTIPLIERS.get(region, 1.0)
+            avg_timeline, avg_team_size, projects_used = 8, 4, []
         
         # Create cost breakdown (simplified)
-        cost_breakdown = {
-            "materials": avg_cost * 0.4,
-            "labor": avg_cost * 0.25,
-            "equipment": avg_cost * 0.08,
-            "permits": avg_cost * 0.03,
-            "design": avg_cost * 0.05,
-            "contingency": avg_cost * 0.08,
-            "profit_margin": avg_cost * 0.11
-        }
+        cost_breakdown = calculate_cost_breakdown(avg_cost, COST_BREAKDOWN_SHARES)
         
         return EstimationResult(
             total_cost=avg_cost,
@@ -293,9 +457,56 @@ class EstimationService:
             confidence_score=0.8,
             assumptions=["Standard project scope", "No major site preparation required"],
             risks=["Weather delays", "Material cost fluctuations"],
-            reference_projects_used=[p.get("project_id", "") for p in reference_projects[:3]]
+            reference_projects_used=projects_used
         )
     
+    def _apply_tuning(self, result: EstimationResult, reference_class: str, region: str) -> float:
+        """Scale costs by the feedback tuning factor for the class and region; returns the factor."""
+        factors = tuning_factors.for_class(reference_class)
+        if region not in factors:
+            return 1.0
+        
+        result.total_cost = apply_tuning_factors(result.total_cost, factors, region)
+        result.cost_breakdown = CostBreakdown(**{
+            category: apply_tuning_factors(cost, factors, region)
+            for category, cost in result.cost_breakdown.dict().items()
+        })
+        # Kept so feedback can be compared with the untuned estimate
+        result.tuning_factor = factors[region]
+        return factors[region]
+    
+    async def _attach_simulation(
+        self,
+        result: EstimationResult,
+        description: str,
+        region: str,
+        reference_class: str,
+        reference_stats: Optional[Dict[str, Any]],
+        tuning_factor: float = 1.0
+    ) -> None:
+        """Add simulated P50/P80/P95 ranges to an estimation result."""
+        try:
+            # The point estimate is already regional and tuned; the reference stats are
+            # regional but not tuned
+            if reference_stats and reference_stats.get("count"):
+                inputs = SimulationInput.from_reference_stats(reference_stats, multiplier=tuning_factor)
+            else:
+                inputs = SimulationInput.from_point_estimate(result.cost_breakdown.dict(), result.timeline_weeks)
+            
+            # Same inputs give the same ranges
+            seed = stable_seed(description, region, reference_class)
+            simulation = await asyncio.to_thread(simulate, inputs, settings.SIMULATION_TRIALS, seed)
+            
+            result.cost_percentiles = PercentileRange(**simulation["total_cost"])
+            result.cost_breakdown_percentiles = {
+                category: PercentileRange(**values)
+                for category, values in simulation["cost_breakdown"].items()
+            }
+            result.timeline_percentiles = PercentileRange(**simulation["timeline_weeks"])
+            
+        except Exception as e:
+            logger.error(f"Error simulating estimate ranges: {e}")
+    
     def _create_default_estimation(self, description: str, region: str, reference_class: str) -> EstimationResult:
         """Create default estimation when LLM processing fails."""
         return EstimationResult(
@@ -316,4 +527,9 @@ class EstimationService:
             assumptions=["Default estimation due to processing error"],
             risks=["Estimation accuracy may be lower than usual"],
             reference_projects_used=[]
-        ) 
\ No newline at end of file
+        )
+
+
+async def run_estimation_job(job: Job, report_progress: Callable[[float], Awaitable[None]]) -> None:
+    """Job handler for ESTIMATION_JOB."""
+    await EstimationService().process_job(job, report_progress)
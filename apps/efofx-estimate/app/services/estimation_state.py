@@ -0,0 +1,126 @@
+"""
+Estimation session state machine for efOfX Estimation Service.
+
+Every status change is one conditional ``find_one_and_update`` guarded by
+the session's current status and version. A writer holding an outdated
+copy of the session gets a StaleTransitionError instead of overwriting a
+newer state, and each transition sets only the fields it changes.
+"""
+
+import logging
+from datetime import datetime
+from typing import Any, Dict, Optional, Union
+
+from pymongo import ReturnDocument
+from pymongo.write_concern import WriteConcern
+
+from app.core.config import settings
+from app.core.constants import EstimationStatus, PENDING_ESTIMATION_STATUSES
+from app.models.estimation import EstimationSession
+
+logger = logging.getLogger(__name__)
+
+# Allowed status changes; IN_PROGRESS -> IN_PROGRESS is a retry taking over
+TRANSITIONS = {
+    EstimationStatus.INITIATED: {
+        EstimationStatus.IN_PROGRESS, EstimationStatus.CANCELLED,
+        EstimationStatus.EXPIRED, EstimationStatus.FAILED,
+    },
+    EstimationStatus.IN_PROGRESS: {
+        EstimationStatus.IN_PROGRESS, EstimationStatus.COMPLETED, EstimationStatus.CANCELLED,
+        EstimationStatus.EXPIRED, EstimationStatus.FAILED,
+    },
+}
+
+
+class StaleTransitionError(Exception):
+    """The session changed since it was read; the transition was not applied."""
+
+
+def parse_write_concern(value: str) -> WriteConcern:
+    """Build a write concern from a setting such as "1" or "majority"."""
+    return WriteConcern(w=int(value) if value.isdigit() else value)
+
+
+def _version_filter(version: int) -> Union[int, Dict[str, Any]]:
+    # Sessions written before versioning have no version field
+    return version if version else {"$in": [0, None]}
+
+
+class EstimationStateMachine:
+    """Applies status transitions to estimation sessions."""
+
+    def __init__(self, collection):
+        self.collection = collection
+        self.claim_write_concern = parse_write_concern(settings.ESTIMATION_CLAIM_WRITE_CONCERN)
+        self.final_write_concern = parse_write_concern(settings.ESTIMATION_FINAL_WRITE_CONCERN)
+
+    def _with_write_concern(self, write_concern: Optional[WriteConcern]):
+        if write_concern is None:
+            return self.collection
+        return self.collection.with_options(write_concern=write_concern)
+
+    async def claim(self, session_id: str, now: Optional[datetime] = None) -> Optional[EstimationSession]:
+        """
+        Move a pending, unexpired session to IN_PROGRESS and return it.
+
+        Reading and claiming the session is a single round trip. Returns
+        None if the session is missing, finished or expired.
+        """
+        now = now or datetime.utcnow()
+        document = await self._with_write_concern(self.claim_write_concern).find_one_and_update(
+            {
+                "session_id": session_id,
+                "status": {"$in": [status.value for status in PENDING_ESTIMATION_STATUSES]},
+                "expires_at": {"$not": {"$lte": now}},
+            },
+            {
+                "$set": {"status": EstimationStatus.IN_PROGRESS, "updated_at": now},
+                "$inc": {"version": 1},
+            },
+            return_document=ReturnDocument.AFTER
+        )
+        return EstimationSession(**document) if document else None
+
+    async def transition(
+        self,
+        session: EstimationSession,
+        status: EstimationStatus,
+        changes: Optional[Dict[str, Any]] = None,
+        write_concern: Optional[WriteConcern] = None
+    ) -> EstimationSession:
+        """
+        Apply ``status`` and ``changes`` if the session is still at the
+        status and version it was read at.
+
+        ``changes`` maps field names to already-serialized values. On
+        success the session's status, version and updated_at are updated;
+        callers apply ``changes`` to their copy themselves.
+        """
+        if status not in TRANSITIONS.get(session.status, set()):
+            raise ValueError(f"Invalid estimation transition: {session.status} -> {status}")
+
+        now = datetime.utcnow()
+        changes = changes or {}
+        document = await self._with_write_concern(write_concern).find_one_and_update(
+            {
+                "session_id": session.session_id,
+                "status": session.status,
+                "version": _version_filter(session.version),
+            },
+            {
+                "$set": {"status": status, "updated_at": now, **changes},
+                "$inc": {"version": 1},
+            },
+            projection={"_id": 0, "version": 1},
+            return_document=ReturnDocument.AFTER
+        )
+        if document is None:
+            raise StaleTransitionError(
+                f"Session {session.session_id} changed before {session.status} -> {status}"
+            )
+
+        session.status = status
+        session.updated_at = now
+        session.version = document["version"]
+        return session
@@ -0,0 +1,200 @@
+"""
+Weekly feedback rollups for efOfX Estimation Service.
+
+This module maintains the feedback_rollups collection: one document per
+(tenant_id, ISO week, feedback_type) holding the feedback count and the
+sums and counts of the rating and each accuracy field. Rollups are
+incremented as feedback arrives, so analytics for any period read at most
+one small document per week and type instead of the raw feedback.
+
+Usage:
+    python -m app.services.feedback_rollups --backfill [--tenant-id ID]
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from bson import ObjectId
+
+from app.core.constants import DB_COLLECTIONS
+from app.db.indexes import QueryShape
+from app.db.mongodb import get_feedback_collection, get_feedback_rollups_collection
+
+logger = logging.getLogger(__name__)
+
+# Query shapes issued by this module (see app.db.indexes)
+QUERY_SHAPES = [
+    QueryShape(
+        "by_tenant_week_type", DB_COLLECTIONS["FEEDBACK_ROLLUPS"],
+        {
+            "tenant_id": ObjectId("000000000000000000000000"),
+            "week_start": datetime(2024, 1, 1),
+            "feedback_type": "accuracy",
+        },
+        unique=True
+    ),
+    QueryShape(
+        "by_tenant_since", DB_COLLECTIONS["FEEDBACK_ROLLUPS"],
+        {"tenant_id": ObjectId("000000000000000000000000"), "week_start": {"$gte": datetime(2024, 1, 1)}}
+    ),
+]
+
+ACCURACY_FIELDS = ["cost_accuracy", "timeline_accuracy", "reference_class_accuracy"]
+
+# Fields identifying a rollup; the unique index above, and $merge's "on"
+ROLLUP_KEY = ["tenant_id", "week_start", "feedback_type"]
+
+
+def iso_week_start(moment: datetime) -> datetime:
+    """Monday 00:00 of the ISO week containing ``moment``."""
+    return datetime(moment.year, moment.month, moment.day) - timedelta(days=moment.weekday())
+
+
+def iso_week_label(moment: datetime) -> str:
+    """ISO week label such as ``2024-W22``."""
+    year, week, _ = moment.isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+def rollup_update(feedback: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Filter and upsert update adding one feedback document to its rollup."""
+    created_at = feedback.get("created_at") or datetime.utcnow()
+    week_start = iso_week_start(created_at)
+
+    increments = {"count": 1, "rating_sum": feedback.get("rating") or 0}
+    for field in ACCURACY_FIELDS:
+        if feedback.get(field) is not None:
+            increments[f"{field}_sum"] = feedback[field]
+            increments[f"{field}_count"] = 1
+
+    return (
+        {
+            "tenant_id": feedback["tenant_id"],
+            "week_start": week_start,
+            "feedback_type": feedback.get("feedback_type") or "unknown",
+        },
+        {
+            "$inc": increments,
+            "$set": {"updated_at": datetime.utcnow()},
+            "$setOnInsert": {"week": iso_week_label(week_start)},
+        },
+    )
+
+
+def backfill_pipeline(tenant_id: Optional[ObjectId] = None) -> List[Dict[str, Any]]:
+    """Aggregation recomputing rollups from raw feedback and merging them in."""
+    accuracy_totals: Dict[str, Any] = {}
+    for field in ACCURACY_FIELDS:
+        accuracy_totals[f"{field}_sum"] = {"$sum": f"${field}"}
+        accuracy_totals[f"{field}_count"] = {"$sum": {"$cond": [{"$isNumber": f"${field}"}, 1, 0]}}
+
+    return [
+        {"$match": {"tenant_id": tenant_id} if tenant_id else {}},
+        {"$group": {
+            "_id": {
+                "tenant_id": "$tenant_id",
+                "week_start": {"$dateTrunc": {"date": "$created_at", "unit": "week", "startOfWeek": "monday"}},
+                "feedback_type": {"$ifNull": ["$feedback_type", "unknown"]},
+            },
+            "count": {"$sum": 1},
+            "rating_sum": {"$sum": "$rating"},
+            **accuracy_totals,
+        }},
+        {"$project": {
+            "_id": 0,
+            "tenant_id": "$_id.tenant_id",
+            "week_start": "$_id.week_start",
+            "feedback_type": "$_id.feedback_type",
+            "week": {"$dateToString": {"format": "%G-W%V", "date": "$_id.week_start"}},
+            "count": 1,
+            "rating_sum": 1,
+            **{name: 1 for name in accuracy_totals},
+            "updated_at": "$$NOW",
+        }},
+        {"$merge": {
+            "into": DB_COLLECTIONS["FEEDBACK_ROLLUPS"],
+            "on": ROLLUP_KEY,
+            "whenMatched": "replace",
+            "whenNotMatched": "insert",
+        }},
+    ]
+
+
+class FeedbackRollupService:
+    """Service for maintaining and reading weekly feedback rollups."""
+
+    def __init__(self):
+        self.feedback_collection = get_feedback_collection()
+        self.rollups_collection = get_feedback_rollups_collection()
+
+    async def record(self, feedback: Dict[str, Any]) -> None:
+        """Add one feedback document to its weekly rollup."""
+        query, update = rollup_update(feedback)
+        await self.rollups_collection.update_one(query, update, upsert=True)
+
+    async def get_rollups(self, tenant_id: ObjectId, since: datetime) -> List[Dict[str, Any]]:
+        """Rollups for every week overlapping ``since`` onwards, oldest first."""
+        try:
+            cursor = self.rollups_collection.find(
+                {"tenant_id": tenant_id, "week_start": {"$gte": iso_week_start(since)}},
+                {"_id": 0, "tenant_id": 0, "updated_at": 0}
+            ).sort("week_start", 1)
+            return await cursor.to_list(length=None)
+
+        except Exception as e:
+            logger.error(f"Error getting feedback rollups: {e}")
+            raise
+
+    async def totals(self, tenant_id: ObjectId) -> Dict[str, Any]:
+        """All-time feedback count and rating sum for a tenant, summed over its rollups."""
+        try:
+            result = await self.rollups_collection.aggregate([
+                {"$match": {"tenant_id": tenant_id}},
+                {"$group": {"_id": None, "count": {"$sum": "$count"}, "rating_sum": {"$sum": "$rating_sum"}}},
+            ]).to_list(1)
+            return result[0] if result else {"count": 0, "rating_sum": 0}
+
+        except Exception as e:
+            logger.error(f"Error getting feedback totals: {e}")
+            raise
+
+    async def backfill(self, tenant_id: Optional[ObjectId] = None) -> None:
+        """
+        Recompute rollups from raw feedback, for one tenant or all.
+
+        Runs entirely inside MongoDB. Feedback submitted while the backfill
+        runs may be counted by its increment and then overwritten; run it
+        before relying on rollups, or again afterwards for affected weeks.
+        """
+        try:
+            await self.feedback_collection.aggregate(backfill_pipeline(tenant_id)).to_list(length=None)
+            logger.info(f"Feedback rollups backfilled for {tenant_id or 'all tenants'}")
+
+        except Exception as e:
+            logger.error(f"Error backfilling feedback rollups: {e}")
+            raise
+
+
+async def _main(tenant_id: Optional[str]) -> int:
+    from app.db.mongodb import connect_to_mongo, close_mongo_connection
+
+    await connect_to_mongo()
+    try:
+        await FeedbackRollupService().backfill(ObjectId(tenant_id) if tenant_id else None)
+        return 0
+    finally:
+        await close_mongo_connection()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Maintain weekly feedback rollups")
+    parser.add_argument("--backfill", action="store_true", required=True, help="Recompute rollups from feedback")
+    parser.add_argument("--tenant-id", help="Only backfill this tenant")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(asyncio.run(_main(args.tenant_id)))
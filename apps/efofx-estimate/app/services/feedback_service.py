@@ -9,18 +9,68 @@ import logging
 from datetime import datetime, timedelta
 from typing import List, Dict, Any
 
+from bson import ObjectId
+
 from app.models.tenant import Tenant
 from app.models.feedback import FeedbackCreate, FeedbackSummary, Feedback
 from app.db.mongodb import get_feedback_collection
+from app.db.indexes import QueryShape
+from app.core.constants import DB_COLLECTIONS
+from app.services.feedback_rollups import ACCURACY_FIELDS, FeedbackRollupService
 
 logger = logging.getLogger(__name__)
 
+# Query shapes issued by this module (see app.db.indexes)
+QUERY_SHAPES = [
+    QueryShape("by_tenant", DB_COLLECTIONS["FEEDBACK"], {"tenant_id": ObjectId("000000000000000000000000")}),
+    QueryShape(
+        "by_tenant_and_type", DB_COLLECTIONS["FEEDBACK"],
+        {"tenant_id": ObjectId("000000000000000000000000"), "feedback_type": "accuracy"}
+    ),
+    QueryShape(
+        "by_tenant_and_session", DB_COLLECTIONS["FEEDBACK"],
+        {"tenant_id": ObjectId("000000000000000000000000"), "estimation_session_id": "sess_sample"}
+    ),
+    QueryShape(
+        "summary_newest_first", DB_COLLECTIONS["FEEDBACK"],
+        {"tenant_id": ObjectId("000000000000000000000000")}, sort=[("created_at", -1)]
+    ),
+]
+
+RECENT_FEEDBACK_LIMIT = 10
+
+# Free-form metadata is left out of summary listings
+RECENT_FEEDBACK_PROJECTION = {"metadata": 0}
+
+
+def feedback_summary_pipeline(tenant_id: ObjectId) -> List[Dict[str, Any]]:
+    """
+    Aggregation computing a tenant's feedback summary in one pass.
+
+    Documents are read newest-first from the (tenant_id, created_at) index,
+    so the recent facet is just a limit; the other facets group the same
+    stream. The result is a single document with ``totals``, ``by_type``
+    and ``recent`` arrays.
+    """
+    totals = {"_id": None, "total_feedback": {"$sum": 1}, "average_rating": {"$avg": "$rating"}}
+    totals.update({f"{field}_avg": {"$avg": f"${field}"} for field in ACCURACY_FIELDS})
+    return [
+        {"$match": {"tenant_id": tenant_id}},
+        {"$sort": {"created_at": -1}},
+        {"$facet": {
+            "totals": [{"$group": totals}],
+            "by_type": [{"$group": {"_id": {"$ifNull": ["$feedback_type", "unknown"]}, "count": {"$sum": 1}}}],
+            "recent": [{"$limit": RECENT_FEEDBACK_LIMIT}, {"$project": RECENT_FEEDBACK_PROJECTION}],
+        }},
+    ]
+
 
 class FeedbackService:
     """Service for handling feedback functionality."""
     
     def __init__(self):
         self.collection = get_feedback_collection()
+        self.rollups = FeedbackRollupService()
     
     async def submit_feedback(self, feedback: FeedbackCreate, tenant: Tenant) -> str:
         """Submit new feedback."""
@@ -42,7 +92,14 @@ class FeedbackService:
             )
             
             # Save to database
-            result = await self.collection.insert_one(feedback_doc.dict(by_alias=True))
+            document = feedback_doc.dict(by_alias=True)
+            result = await self.collection.insert_one(document)
+            
+            try:
+                await self.rollups.record(document)
+            except Exception as e:
+                # The feedback itself is stored; a backfill restores the rollup
+                logger.error(f"Error updating feedback rollup for {result.inserted_id}: {e}")
             
             logger.info(f"Feedback submitted successfully: {result.inserted_id}")
             return str(result.inserted_id)
@@ -54,11 +111,12 @@ class FeedbackService:
     async def get_feedback_summary(self, tenant: Tenant) -> FeedbackSummary:
         """Get feedback summary for tenant."""
         try:
-            # Get all feedback for tenant
-            feedback_cursor = self.collection.find({"tenant_id": tenant.id})
-            feedback_list = await feedback_cursor.to_list(length=None)
+            cursor = self.collection.aggregate(feedback_summary_pipeline(tenant.id))
+            results = await cursor.to_list(length=1)
+            facets = results[0] if results else {}
             
-            if not feedback_list:
+            totals = (facets.get("totals") or [{}])[0]
+            if not totals.get("total_feedback"):
                 return FeedbackSummary(
                     total_feedback=0,
                     average_rating=0.0,
@@ -69,42 +127,14 @@ class FeedbackService:
                     recent_feedback=[]
                 )
             
-            # Calculate statistics
-            total_feedback = len(feedback_list)
-            average_rating = sum(f.get("rating", 0) for f in feedback_list) / total_feedback
-            
-            # Calculate accuracy averages
-            cost_accuracies = [f.get("cost_accuracy") for f in feedback_list if f.get("cost_accuracy")]
-            timeline_accuracies = [f.get("timeline_accuracy") for f in feedback_list if f.get("timeline_accuracy")]
-            ref_class_accuracies = [f.get("reference_class_accuracy") for f in feedback_list if f.get("reference_class_accuracy")]
-            
-            cost_accuracy_avg = sum(cost_accuracies) / len(cost_accuracies) if cost_accuracies else None
-            timeline_accuracy_avg = sum(timeline_accuracies) / len(timeline_accuracies) if timeline_accuracies else None
-            reference_class_accuracy_avg = sum(ref_class_accuracies) / len(ref_class_accuracies) if ref_class_accuracies else None
-            
-            # Group by feedback type
-            feedback_by_type = {}
-            for f in feedback_list:
-                feedback_type = f.get("feedback_type", "unknown")
-                feedback_by_type[feedback_type] = feedback_by_type.get(feedback_type, 0) + 1
-            
-            # Get recent feedback (last 10)
-            recent_feedback = [
-                Feedback(**f) for f in sorted(
-                    feedback_list, 
-                    key=lambda x: x.get("created_at", datetime.min), 
-                    reverse=True
-                )[:10]
-            ]
-            
             return FeedbackSummary(
-                total_feedback=total_feedback,
-                average_rating=average_rating,
-                cost_accuracy_avg=cost_accuracy_avg,
-                timeline_accuracy_avg=timeline_accuracy_avg,
-                reference_class_accuracy_avg=reference_class_accuracy_avg,
-                feedback_by_type=feedback_by_type,
-                recent_feedback=recent_feedback
+                total_feedback=totals["total_feedback"],
+                average_rating=totals.get("average_rating") or 0.0,
+                cost_accuracy_avg=totals.get("cost_accuracy_avg"),
+                timeline_accuracy_avg=totals.get("timeline_accuracy_avg"),
+                reference_class_accuracy_avg=totals.get("reference_class_accuracy_avg"),
+                feedback_by_type={group["_id"]: group["count"] for group in facets.get("by_type", [])},
+                recent_feedback=[Feedback(**f) for f in facets.get("recent", [])]
             )
             
         except Exception as e:
@@ -142,19 +172,18 @@ class FeedbackService:
             raise
     
     async def get_feedback_analytics(self, tenant: Tenant, days: int = 30) -> Dict[str, Any]:
-        """Get feedback analytics for tenant."""
+        """
+        Get feedback analytics for tenant.
+        
+        Read from weekly rollups, so the period is widened to start at the
+        beginning of the ISO week containing the day ``days`` ago.
+        """
         try:
-            # Get feedback from last N days
             start_date = datetime.utcnow() - timedelta(days=days)
+            rollups = await self.rollups.get_rollups(tenant.id, start_date)
             
-            cursor = self.collection.find({
-                "tenant_id": tenant.id,
-                "created_at": {"$gte": start_date}
-            })
-            
-            feedback_list = await cursor.to_list(length=None)
-            
-            if not feedback_list:
+            total_feedback = sum(r.get("count", 0) for r in rollups)
+            if not total_feedback:
                 return {
                     "period_days": days,
                     "total_feedback": 0,
@@ -164,21 +193,18 @@ class FeedbackService:
                 }
             
             # Calculate analytics
-            total_feedback = len(feedback_list)
-            average_rating = sum(f.get("rating", 0) for f in feedback_list) / total_feedback
+            average_rating = sum(r.get("rating_sum", 0) for r in rollups) / total_feedback
             
             # Calculate accuracy trends
             accuracy_trends = {
-                "cost_accuracy": self._calculate_accuracy_trend(feedback_list, "cost_accuracy"),
-                "timeline_accuracy": self._calculate_accuracy_trend(feedback_list, "timeline_accuracy"),
-                "reference_class_accuracy": self._calculate_accuracy_trend(feedback_list, "reference_class_accuracy")
+                field: self._calculate_accuracy_trend(rollups, field) for field in ACCURACY_FIELDS
             }
             
             # Calculate feedback distribution
             feedback_distribution = {}
-            for f in feedback_list:
-                feedback_type = f.get("feedback_type", "unknown")
-                feedback_distribution[feedback_type] = feedback_distribution.get(feedback_type, 0) + 1
+            for r in rollups:
+                feedback_type = r["feedback_type"]
+                feedback_distribution[feedback_type] = feedback_distribution.get(feedback_type, 0) + r.get("count", 0)
             
             return {
                 "period_days": days,
@@ -192,26 +218,15 @@ class FeedbackService:
             logger.error(f"Error getting feedback analytics: {e}")
             raise
     
-    def _calculate_accuracy_trend(self, feedback_list: List[Dict], accuracy_field: str) -> Dict[str, float]:
-        """Calculate accuracy trend over time."""
-        # Group by week and calculate average accuracy
-        weekly_accuracies = {}
-        
-        for f in feedback_list:
-            if f.get(accuracy_field):
-                # Get week of feedback
-                created_at = f.get("created_at", datetime.utcnow())
-                week_start = created_at - timedelta(days=created_at.weekday())
-                week_key = week_start.strftime("%Y-%W")
-                
-                if week_key not in weekly_accuracies:
-                    weekly_accuracies[week_key] = []
-                
-                weekly_accuracies[week_key].append(f[accuracy_field])
+    def _calculate_accuracy_trend(self, rollups: List[Dict], accuracy_field: str) -> Dict[str, float]:
+        """Calculate weekly average accuracy, keyed by ISO week, across feedback types."""
+        sums: Dict[str, float] = {}
+        counts: Dict[str, int] = {}
         
-        # Calculate weekly averages
-        weekly_averages = {}
-        for week, accuracies in weekly_accuracies.items():
-            weekly_averages[week] = sum(accuracies) / len(accuracies)
+        for r in rollups:
+            count = r.get(f"{accuracy_field}_count", 0)
+            if count:
+                sums[r["week"]] = sums.get(r["week"], 0.0) + r[f"{accuracy_field}_sum"]
+                counts[r["week"]] = counts.get(r["week"], 0) + count
         
-        return weekly_averages 
\ No newline at end of file
+        return {week: sums[week] / counts[week] for week in sums} 
\ No newline at end of file
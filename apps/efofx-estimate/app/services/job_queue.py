@@ -0,0 +1,551 @@
+"""
+Background job queue for efOfX Estimation Service.
+
+This module provides a persistent job queue with a worker pool. Jobs are
+claimed under a lease, retried with exponential backoff, and scheduled
+round-robin across tenants so one tenant's backlog cannot starve others.
+The MongoDB backend survives restarts; the in-memory backend is intended
+for tests and single-process development.
+"""
+
+import asyncio
+import logging
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from app.core.config import settings
+from app.core.constants import DB_COLLECTIONS, JobStatus
+from app.db.indexes import QueryShape, TTLIndex
+from app.db.mongodb import get_jobs_collection
+from app.models.job import Job
+from app.observability.metrics import job_queue_metrics
+
+logger = logging.getLogger(__name__)
+
+# Query shapes issued by this module (see app.db.indexes)
+QUERY_SHAPES = [
+    QueryShape(
+        "ready", DB_COLLECTIONS["JOBS"],
+        {"status": "queued", "available_at": {"$lte": datetime(2024, 1, 1)}}
+    ),
+    QueryShape(
+        "claim", DB_COLLECTIONS["JOBS"],
+        {"status": "queued", "tenant_id": "tenant_sample", "available_at": {"$lte": datetime(2024, 1, 1)}},
+        sort=[("available_at", 1)]
+    ),
+    QueryShape(
+        "expired_leases", DB_COLLECTIONS["JOBS"],
+        {"status": "running", "lease_expires_at": {"$lt": datetime(2024, 1, 1)}}
+    ),
+]
+
+# Finished jobs are kept for inspection, then removed by the server
+TTL_INDEXES = [
+    TTLIndex(DB_COLLECTIONS["JOBS"], "finished_at", settings.JOB_RETENTION_HOURS * 3600),
+]
+
+ProgressCallback = Callable[[float], Awaitable[None]]
+JobHandler = Callable[[Job, ProgressCallback], Awaitable[None]]
+
+
+class JobBackend(ABC):
+    """
+    Storage interface for jobs.
+
+    Every mutation of a running job is conditional on the worker that
+    claimed it, so a worker whose lease expired cannot overwrite the state
+    written by the worker that took the job over.
+    """
+
+    @abstractmethod
+    async def enqueue(self, job: Job) -> bool:
+        """Store a new job; returns False if a job with the same ID exists."""
+
+    @abstractmethod
+    async def get(self, job_id: str) -> Optional[Job]:
+        """Get a job by ID."""
+
+    @abstractmethod
+    async def ready_tenants(self, now: datetime) -> List[str]:
+        """Tenants with at least one job ready to run."""
+
+    @abstractmethod
+    async def claim(self, tenant_id: str, worker_id: str, lease_seconds: float) -> Optional[Job]:
+        """Atomically take the oldest ready job of a tenant."""
+
+    @abstractmethod
+    async def heartbeat(self, job_id: str, worker_id: str, progress: float, lease_seconds: float) -> None:
+        """Record progress and extend the lease."""
+
+    @abstractmethod
+    async def complete(self, job_id: str, worker_id: str) -> None:
+        """Mark a job as succeeded."""
+
+    @abstractmethod
+    async def retry(self, job_id: str, worker_id: str, error: str, available_at: datetime) -> None:
+        """Return a job to the queue after a failed attempt."""
+
+    @abstractmethod
+    async def fail(self, job_id: str, worker_id: str, error: str) -> None:
+        """Mark a job as permanently failed."""
+
+    @abstractmethod
+    async def release(self, job_id: str, worker_id: str) -> None:
+        """Return a job to the queue without counting the attempt (shutdown)."""
+
+    @abstractmethod
+    async def requeue_expired(self, now: datetime) -> int:
+        """Requeue or fail running jobs whose lease has expired."""
+
+    @abstractmethod
+    async def depth(self) -> Dict[str, int]:
+        """Queued job count per kind."""
+
+
+class InMemoryJobBackend(JobBackend):
+    """Process-local backend for tests and development."""
+
+    def __init__(self):
+        self.jobs: Dict[str, Job] = {}
+
+    def _owned(self, job_id: str, worker_id: str) -> Optional[Job]:
+        job = self.jobs.get(job_id)
+        if job is None or job.status != JobStatus.RUNNING or job.worker_id != worker_id:
+            return None
+        return job
+
+    async def enqueue(self, job: Job) -> bool:
+        if job.id in self.jobs:
+            return False
+        self.jobs[job.id] = job.model_copy()
+        return True
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        job = self.jobs.get(job_id)
+        return job.model_copy() if job else None
+
+    async def ready_tenants(self, now: datetime) -> List[str]:
+        ready = sorted(
+            (job for job in self.jobs.values() if job.status == JobStatus.QUEUED and job.available_at <= now),
+            key=lambda job: job.available_at
+        )
+        return list(dict.fromkeys(job.tenant_id for job in ready))
+
+    async def claim(self, tenant_id: str, worker_id: str, lease_seconds: float) -> Optional[Job]:
+        now = datetime.utcnow()
+        ready = [
+            job for job in self.jobs.values()
+            if job.status == JobStatus.QUEUED and job.tenant_id == tenant_id and job.available_at <= now
+        ]
+        if not ready:
+            return None
+
+        job = min(ready, key=lambda j: j.available_at)
+        job.status = JobStatus.RUNNING
+        job.worker_id = worker_id
+        job.attempts += 1
+        job.started_at = now
+        job.lease_expires_at = now + timedelta(seconds=lease_seconds)
+        return job.model_copy()
+
+    async def heartbeat(self, job_id: str, worker_id: str, progress: float, lease_seconds: float) -> None:
+        job = self._owned(job_id, worker_id)
+        if job:
+            job.progress = progress
+            job.lease_expires_at = datetime.utcnow() + timedelta(seconds=lease_seconds)
+
+    async def complete(self, job_id: str, worker_id: str) -> None:
+        job = self._owned(job_id, worker_id)
+        if job:
+            job.status = JobStatus.SUCCEEDED
+            job.progress = 1.0
+            job.finished_at = datetime.utcnow()
+
+    async def retry(self, job_id: str, worker_id: str, error: str, available_at: datetime) -> None:
+        job = self._owned(job_id, worker_id)
+        if job:
+            job.status = JobStatus.QUEUED
+            job.error = error
+            job.available_at = available_at
+            job.worker_id = None
+            job.lease_expires_at = None
+
+    async def fail(self, job_id: str, worker_id: str, error: str) -> None:
+        job = self._owned(job_id, worker_id)
+        if job:
+            job.status = JobStatus.FAILED
+            job.error = error
+            job.finished_at = datetime.utcnow()
+
+    async def release(self, job_id: str, worker_id: str) -> None:
+        job = self._owned(job_id, worker_id)
+        if job:
+            job.status = JobStatus.QUEUED
+            job.attempts -= 1
+            job.worker_id = None
+            job.lease_expires_at = None
+
+    async def requeue_expired(self, now: datetime) -> int:
+        expired = [
+            job for job in self.jobs.values()
+            if job.status == JobStatus.RUNNING and job.lease_expires_at and job.lease_expires_at < now
+        ]
+        for job in expired:
+            job.worker_id = None
+            if job.is_last_attempt:
+                job.status = JobStatus.FAILED
+                job.error = "Lease expired"
+                job.finished_at = now
+            else:
+                job.status = JobStatus.QUEUED
+                job.available_at = now
+        return len(expired)
+
+    async def depth(self) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        for job in self.jobs.values():
+            if job.status == JobStatus.QUEUED:
+                counts[job.kind] = counts.get(job.kind, 0) + 1
+        return counts
+
+
+class MongoJobBackend(JobBackend):
+    """MongoDB backend; jobs survive restarts and are shared by all workers."""
+
+    @property
+    def collection(self):
+        return get_jobs_collection()
+
+    @staticmethod
+    def _owned(job_id: str, worker_id: str) -> Dict[str, Any]:
+        return {"_id": job_id, "worker_id": worker_id, "status": JobStatus.RUNNING}
+
+    async def enqueue(self, job: Job) -> bool:
+        try:
+            await self.collection.insert_one(job.dict(by_alias=True))
+            return True
+        except DuplicateKeyError:
+            return False
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        document = await self.collection.find_one({"_id": job_id})
+        return Job(**document) if document else None
+
+    async def ready_tenants(self, now: datetime) -> List[str]:
+        return await self.collection.distinct(
+            "tenant_id", {"status": JobStatus.QUEUED, "available_at": {"$lte": now}}
+        )
+
+    async def claim(self, tenant_id: str, worker_id: str, lease_seconds: float) -> Optional[Job]:
+        now = datetime.utcnow()
+        document = await self.collection.find_one_and_update(
+            {"status": JobStatus.QUEUED, "tenant_id": tenant_id, "available_at": {"$lte": now}},
+            {
+                "$set": {
+                    "status": JobStatus.RUNNING,
+                    "worker_id": worker_id,
+                    "started_at": now,
+                    "lease_expires_at": now + timedelta(seconds=lease_seconds),
+                },
+                "$inc": {"attempts": 1},
+            },
+            sort=[("available_at", 1)],
+            return_document=ReturnDocument.AFTER
+        )
+        return Job(**document) if document else None
+
+    async def heartbeat(self, job_id: str, worker_id: str, progress: float, lease_seconds: float) -> None:
+        await self.collection.update_one(
+            self._owned(job_id, worker_id),
+            {"$set": {
+                "progress": progress,
+                "lease_expires_at": datetime.utcnow() + timedelta(seconds=lease_seconds),
+            }}
+        )
+
+    async def complete(self, job_id: str, worker_id: str) -> None:
+        await self.collection.update_one(
+            self._owned(job_id, worker_id),
+            {"$set": {"status": JobStatus.SUCCEEDED, "progress": 1.0, "finished_at": datetime.utcnow()}}
+        )
+
+    async def retry(self, job_id: str, worker_id: str, error: str, available_at: datetime) -> None:
+        await self.collection.update_one(
+            self._owned(job_id, worker_id),
+            {"$set": {
+                "status": JobStatus.QUEUED,
+                "error": error,
+                "available_at": available_at,
+                "worker_id": None,
+                "lease_expires_at": None,
+            }}
+        )
+
+    async def fail(self, job_id: str, worker_id: str, error: str) -> None:
+        await self.collection.update_one(
+            self._owned(job_id, worker_id),
+            {"$set": {"status": JobStatus.FAILED, "error": error, "finished_at": datetime.utcnow()}}
+        )
+
+    async def release(self, job_id: str, worker_id: str) -> None:
+        await self.collection.update_one(
+            self._owned(job_id, worker_id),
+            {
+                "$set": {"status": JobStatus.QUEUED, "worker_id": None, "lease_expires_at": None},
+                "$inc": {"attempts": -1},
+            }
+        )
+
+    async def requeue_expired(self, now: datetime) -> int:
+        expired = {"status": JobStatus.RUNNING, "lease_expires_at": {"$lt": now}}
+        requeued = await self.collection.update_many(
+            {**expired, "$expr": {"$lt": ["$attempts", "$max_attempts"]}},
+            {"$set": {"status": JobStatus.QUEUED, "available_at": now, "worker_id": None}}
+        )
+        failed = await self.collection.update_many(
+            expired,
+            {"$set": {
+                "status": JobStatus.FAILED,
+                "error": "Lease expired",
+                "finished_at": now,
+                "worker_id": None,
+            }}
+        )
+        return requeued.modified_count + failed.modified_count
+
+    async def depth(self) -> Dict[str, int]:
+        cursor = self.collection.aggregate([
+            {"$match": {"status": JobStatus.QUEUED}},
+            {"$group": {"_id": "$kind", "count": {"$sum": 1}}},
+        ])
+        return {row["_id"]: row["count"] async for row in cursor}
+
+
+class JobQueue:
+    """
+    Worker pool over a job backend.
+
+    Workers claim jobs tenant by tenant in rotation: after a tenant's job is
+    claimed the tenant moves to the back of the cycle, and tenants with new
+    ready jobs join the cycle once per full rotation.
+    """
+
+    def __init__(
+        self,
+        backend: JobBackend,
+        concurrency: int = 4,
+        max_attempts: int = 3,
+        retry_backoff_seconds: float = 5.0,
+        lease_seconds: float = 300.0,
+        poll_interval: float = 1.0,
+        maintenance_interval: float = 15.0
+    ):
+        self.backend = backend
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.retry_backoff_seconds = retry_backoff_seconds
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.maintenance_interval = maintenance_interval
+
+        self._handlers: Dict[str, JobHandler] = {}
+        self._tasks: List[asyncio.Task] = []
+        self._tenant_cycle: Deque[str] = deque()
+        self._claims_since_refresh = 0
+        # Created on first use: on Python 3.9 asyncio primitives bind to the
+        # loop current at construction, and the global queue is built at import
+        self._wakeup_event: Optional[asyncio.Event] = None
+        self._lock: Optional[asyncio.Lock] = None
+
+    @property
+    def _wakeup(self) -> asyncio.Event:
+        if self._wakeup_event is None:
+            self._wakeup_event = asyncio.Event()
+        return self._wakeup_event
+
+    @property
+    def _cycle_lock(self) -> asyncio.Lock:
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+    def register(self, kind: str, handler: JobHandler) -> None:
+        """Register the coroutine that processes jobs of ``kind``."""
+        self._handlers[kind] = handler
+
+    async def enqueue(
+        self,
+        kind: str,
+        tenant_id: str,
+        payload: Dict[str, Any],
+        job_id: Optional[str] = None
+    ) -> Job:
+        """
+        Add a job to the queue.
+
+        Passing a ``job_id`` makes the call idempotent: enqueueing the same
+        ID twice keeps the first job.
+        """
+        job = Job(
+            id=job_id or f"job_{uuid.uuid4().hex[:16]}",
+            kind=kind,
+            tenant_id=tenant_id,
+            payload=payload,
+            max_attempts=self.max_attempts
+        )
+        if not await self.backend.enqueue(job):
+            logger.info(f"Job {job.id} already enqueued")
+        self._wakeup.set()
+        return job
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        """Get a job by ID."""
+        return await self.backend.get(job_id)
+
+    async def _claim_next(self, worker_id: str) -> Optional[Job]:
+        """
+        Claim the next job in tenant round-robin order.
+
+        Only refreshing the tenant cycle is serialized; each worker takes
+        the next tenant and moves it to the back before its claim, so
+        claims by different workers run concurrently.
+        """
+        async with self._cycle_lock:
+            if self._claims_since_refresh >= len(self._tenant_cycle):
+                ready = await self.backend.ready_tenants(datetime.utcnow())
+                known = [t for t in self._tenant_cycle if t in set(ready)]
+                known_set = set(known)
+                self._tenant_cycle = deque(known + [t for t in ready if t not in known_set])
+                self._claims_since_refresh = 0
+
+        for _ in range(len(self._tenant_cycle)):
+            if not self._tenant_cycle:
+                break
+            tenant_id = self._tenant_cycle[0]
+            self._tenant_cycle.rotate(-1)
+            job = await self.backend.claim(tenant_id, worker_id, self.lease_seconds)
+            if job:
+                self._claims_since_refresh += 1
+                return job
+            # Nothing ready for this tenant; the next refresh brings it back
+            if tenant_id in self._tenant_cycle:
+                self._tenant_cycle.remove(tenant_id)
+
+        self._claims_since_refresh = 0
+        return None
+
+    async def _run(self, job: Job, worker_id: str) -> None:
+        """Run one attempt of a job and record its outcome."""
+        started = time.monotonic()
+        job_queue_metrics.record_claim(job.kind, (datetime.utcnow() - job.available_at).total_seconds())
+
+        async def report_progress(fraction: float) -> None:
+            await self.backend.heartbeat(job.id, worker_id, min(max(fraction, 0.0), 1.0), self.lease_seconds)
+
+        try:
+            handler = self._handlers.get(job.kind)
+            if handler is None:
+                raise LookupError(f"No handler registered for job kind: {job.kind}")
+            await handler(job, report_progress)
+
+        except asyncio.CancelledError:
+            await self.backend.release(job.id, worker_id)
+            job_queue_metrics.record_finish(job.kind, "released", time.monotonic() - started)
+            raise
+
+        except Exception as e:
+            if job.is_last_attempt:
+                logger.error(f"Job {job.id} failed after {job.attempts} attempts: {e}")
+                await self.backend.fail(job.id, worker_id, str(e))
+                outcome = "failed"
+            else:
+                delay = self.retry_backoff_seconds * 2 ** (job.attempts - 1)
+                logger.warning(f"Job {job.id} attempt {job.attempts} failed, retrying in {delay:.1f}s: {e}")
+                await self.backend.retry(job.id, worker_id, str(e), datetime.utcnow() + timedelta(seconds=delay))
+                outcome = "retried"
+
+        else:
+            await self.backend.complete(job.id, worker_id)
+            outcome = "succeeded"
+
+        job_queue_metrics.record_finish(job.kind, outcome, time.monotonic() - started)
+
+    async def _worker(self, worker_id: str) -> None:
+        """Claim and run jobs until cancelled."""
+        while True:
+            try:
+                job = await self._claim_next(worker_id)
+            except Exception as e:
+                logger.error(f"Error claiming job: {e}")
+                job = None
+
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            try:
+                await self._run(job, worker_id)
+            except Exception as e:
+                logger.error(f"Error recording outcome of job {job.id}: {e}")
+
+    async def run_maintenance(self) -> None:
+        """Recover jobs from dead workers and export queue depth."""
+        recovered = await self.backend.requeue_expired(datetime.utcnow())
+        if recovered:
+            logger.warning(f"Recovered {recovered} jobs with expired leases")
+            self._wakeup.set()
+        job_queue_metrics.record_depth(await self.backend.depth())
+
+    async def _maintenance_loop(self) -> None:
+        while True:
+            try:
+                await self.run_maintenance()
+            except Exception as e:
+                logger.error(f"Error in job queue maintenance: {e}")
+            await asyncio.sleep(self.maintenance_interval)
+
+    def start(self) -> None:
+        """Start the worker pool."""
+        if self._tasks:
+            return
+        prefix = uuid.uuid4().hex[:8]
+        self._tasks = [
+            asyncio.create_task(self._worker(f"{prefix}-{i}")) for i in range(self.concurrency)
+        ]
+        self._tasks.append(asyncio.create_task(self._maintenance_loop()))
+        logger.info(f"Job queue started with {self.concurrency} workers")
+
+    async def stop(self) -> None:
+        """Stop the worker pool; running jobs are returned to the queue."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+
+def _create_backend() -> JobBackend:
+    if settings.JOB_QUEUE_BACKEND == "memory":
+        return InMemoryJobBackend()
+    return MongoJobBackend()
+
+
+# Global job queue instance
+job_queue = JobQueue(
+    _create_backend(),
+    concurrency=settings.JOB_WORKER_CONCURRENCY,
+    max_attempts=settings.JOB_MAX_ATTEMPTS,
+    retry_backoff_seconds=settings.JOB_RETRY_BACKOFF_SECONDS,
+    lease_seconds=settings.JOB_LEASE_SECONDS,
+    poll_interval=settings.JOB_POLL_INTERVAL_SECONDS,
+)
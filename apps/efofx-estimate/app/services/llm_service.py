@@ -6,11 +6,12 @@ for natural language processing and estimation generation.
 """
 
 import logging
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, AsyncIterator, List
 import openai
 from openai import AsyncOpenAI
 
 from app.core.config import settings
+from app.observability.metrics import llm_metrics
 
 logger = logging.getLogger(__name__)
 
@@ -24,29 +25,65 @@ class LLMService:
         self.max_tokens = settings.OPENAI_MAX_TOKENS
         self.temperature = settings.OPENAI_TEMPERATURE
     
-    async def generate_response(self, prompt: str, system_message: Optional[str] = None) -> str:
+    async def generate_response(
+        self,
+        prompt: str,
+        system_message: Optional[str] = None,
+        max_tokens: Optional[int] = None
+    ) -> str:
         """Generate response using OpenAI API."""
         try:
-            messages = []
-            
-            if system_message:
-                messages.append({"role": "system", "content": system_message})
-            
-            messages.append({"role": "user", "content": prompt})
-            
             response = await self.client.chat.completions.create(
                 model=self.model,
-                messages=messages,
-                max_tokens=self.max_tokens,
+                messages=self._messages(prompt, system_message),
+                max_tokens=max_tokens or self.max_tokens,
                 temperature=self.temperature
             )
             
+            if response.usage:
+                llm_metrics.record_usage(self.model, response.usage.prompt_tokens, response.usage.completion_tokens)
             return response.choices[0].message.content.strip()
             
         except Exception as e:
             logger.error(f"Error generating LLM response: {e}")
             raise
     
+    async def stream_response(
+        self,
+        prompt: str,
+        system_message: Optional[str] = None,
+        max_tokens: Optional[int] = None
+    ) -> AsyncIterator[str]:
+        """
+        Stream response text from OpenAI as it is generated.
+        
+        Closing the iterator early, e.g. when the client disconnects,
+        closes the upstream HTTP stream, which stops generation.
+        """
+        stream = await self.client.chat.completions.create(
+            model=self.model,
+            messages=self._messages(prompt, system_message),
+            max_tokens=max_tokens or self.max_tokens,
+            temperature=self.temperature,
+            stream=True,
+            stream_options={"include_usage": True}
+        )
+        try:
+            async for chunk in stream:
+                if chunk.usage:
+                    llm_metrics.record_usage(self.model, chunk.usage.prompt_tokens, chunk.usage.completion_tokens)
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        finally:
+            await stream.close()
+    
+    def _messages(self, prompt: str, system_message: Optional[str]) -> List[Dict[str, str]]:
+        messages = []
+        if system_message:
+            messages.append({"role": "system", "content": system_message})
+        messages.append({"role": "user", "content": prompt})
+        return messages
+    
     async def classify_project(self, description: str, region: str, reference_classes: list) -> str:
         """Classify project into reference class using LLM."""
         try:
@@ -0,0 +1,130 @@
+"""
+Platform-wide statistics for efOfX Estimation Service.
+
+Counting whole collections and running dbStats are too expensive to do
+per request, so this module keeps a process-wide snapshot of them that a
+background task refreshes on a schedule. Collection sizes come from
+collection metadata (estimated_document_count) rather than a scan.
+"""
+
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+from app.db.mongodb import (
+    get_database_stats, get_estimates_collection, get_feedback_collection, get_tenants_collection
+)
+
+logger = logging.getLogger(__name__)
+
+# The active tenant count is served by the prefix of the "active" index
+# declared in app.services.tenant_service
+
+
+class PlatformStatsSnapshot:
+    """Platform statistics at one point in time."""
+
+    def __init__(self, tenants: Optional[Dict[str, Any]], database: Optional[Dict[str, Any]]):
+        self.loaded_at = time.monotonic()
+        self.refreshed_at = datetime.utcnow()
+        self.tenants = tenants
+        self.database = database
+
+    @property
+    def age_seconds(self) -> float:
+        """Seconds since this snapshot was taken."""
+        return time.monotonic() - self.loaded_at
+
+
+class PlatformStats:
+    """
+    Process-wide cache of platform statistics.
+
+    The snapshot is refreshed every ``refresh_seconds`` by a background
+    task; readers never wait on the database once the first snapshot is
+    loaded.
+    """
+
+    def __init__(self, refresh_seconds: float = 60.0):
+        self.refresh_seconds = refresh_seconds
+        self._snapshot: Optional[PlatformStatsSnapshot] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    @property
+    def _load_lock(self) -> asyncio.Lock:
+        # Lazily, for the same reason as ReferenceCatalog._load_lock
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+    async def get_snapshot(self) -> PlatformStatsSnapshot:
+        """Return the current snapshot, loading it on first use."""
+        if self._snapshot is None:
+            return await self.refresh(force=False)
+        return self._snapshot
+
+    async def refresh(self, force: bool = True) -> PlatformStatsSnapshot:
+        """Take a new snapshot; concurrent callers share one load."""
+        async with self._load_lock:
+            if not force and self._snapshot is not None:
+                return self._snapshot
+
+            tenants, database = await asyncio.gather(
+                self._tenant_statistics(), get_database_stats(), return_exceptions=True
+            )
+            if isinstance(tenants, Exception):
+                logger.error(f"Error collecting tenant statistics: {tenants}")
+                tenants = None
+            if isinstance(database, Exception):
+                database = None
+
+            self._snapshot = PlatformStatsSnapshot(tenants, database)
+            return self._snapshot
+
+    @staticmethod
+    async def _tenant_statistics() -> Dict[str, Any]:
+        tenants = get_tenants_collection()
+        total_tenants, active_tenants, total_estimations, total_feedback = await asyncio.gather(
+            tenants.estimated_document_count(),
+            tenants.count_documents({"is_active": True}),
+            get_estimates_collection().estimated_document_count(),
+            get_feedback_collection().estimated_document_count(),
+        )
+        return {
+            "total_tenants": total_tenants,
+            "active_tenants": active_tenants,
+            "total_estimations": total_estimations,
+            "total_feedback": total_feedback,
+            "average_estimations_per_tenant": total_estimations / active_tenants if active_tenants > 0 else 0
+        }
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.error(f"Error refreshing platform statistics: {e}")
+            await asyncio.sleep(self.refresh_seconds)
+
+    def start(self) -> None:
+        """Start the background refresh task."""
+        if self._refresh_task is None:
+            self._refresh_task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self) -> None:
+        """Stop the background refresh task."""
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            try:
+                await self._refresh_task
+            except asyncio.CancelledError:
+                pass
+            self._refresh_task = None
+
+
+# Global platform statistics instance
+platform_stats = PlatformStats(refresh_seconds=settings.PLATFORM_STATS_REFRESH_SECONDS)
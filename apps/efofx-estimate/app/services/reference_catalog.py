@@ -0,0 +1,173 @@
+"""
+Reference class catalog for efOfX Estimation Service.
+
+This module keeps a process-wide, versioned snapshot of the active
+reference classes so that request paths (classification, lookups) never
+scan the reference_classes collection.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+from app.core.config import settings
+from app.models.reference import ReferenceClass
+from app.db.mongodb import get_reference_classes_collection
+from app.db.indexes import QueryShape
+from app.core.constants import DB_COLLECTIONS
+from app.utils.text_index import BM25Index, margin_confidence, tokenize
+
+logger = logging.getLogger(__name__)
+
+# Query shapes issued by this module (see app.db.indexes)
+QUERY_SHAPES = [
+    QueryShape("active", DB_COLLECTIONS["REFERENCE_CLASSES"], {"is_active": True}),
+]
+
+
+class CatalogSnapshot:
+    """Immutable view of the active reference classes at one point in time."""
+
+    def __init__(self, version: int, classes: List[ReferenceClass]):
+        self.version = version
+        self.loaded_at = time.monotonic()
+        self.classes = classes
+        self.names = [rc.name for rc in classes]
+        self.by_name: Dict[str, ReferenceClass] = {rc.name: rc for rc in classes}
+        self.by_category: Dict[str, List[ReferenceClass]] = {}
+        for rc in classes:
+            self.by_category.setdefault(rc.category.value, []).append(rc)
+        self.classifier = BM25Index([self._class_tokens(rc) for rc in classes])
+
+    @staticmethod
+    def _class_tokens(rc: ReferenceClass) -> List[str]:
+        """Indexed text for a class; name and keywords are weighted by repetition."""
+        return (
+            tokenize(rc.name) * 3
+            + tokenize(" ".join(rc.keywords)) * 2
+            + tokenize(rc.category.value)
+            + tokenize(rc.description)
+        )
+
+    def classify(self, description: str, k: int = 5) -> Tuple[List[Tuple[str, float]], float]:
+        """Rank classes against a description; returns (name, score) pairs and a confidence."""
+        matches = self.classifier.search(tokenize(description), k)
+        candidates = [(self.classes[i].name, score) for i, score in matches]
+        return candidates, margin_confidence([score for _, score in candidates])
+
+    @property
+    def age_seconds(self) -> float:
+        """Seconds since this snapshot was loaded."""
+        return time.monotonic() - self.loaded_at
+
+
+class ReferenceCatalog:
+    """
+    Process-wide cache of active reference classes.
+
+    The snapshot is refreshed by a background task every ``ttl_seconds`` and
+    reloaded immediately after writes made through ReferenceService. Writes
+    made by other processes become visible within one TTL.
+    """
+
+    def __init__(self, ttl_seconds: float = 300.0):
+        self.ttl_seconds = ttl_seconds
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._version = 0
+        self._lock: Optional[asyncio.Lock] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+        # Stale-snapshot reloads started from get_snapshot
+        self._tasks: Set[asyncio.Task] = set()
+
+    @property
+    def _load_lock(self) -> asyncio.Lock:
+        # Created on first use: on Python 3.9 a lock binds to the loop current at construction
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+    @property
+    def loaded(self) -> bool:
+        """Whether a snapshot has been loaded."""
+        return self._snapshot is not None
+
+    async def get_snapshot(self) -> CatalogSnapshot:
+        """
+        Return the current snapshot, loading it on first use.
+
+        A stale snapshot is still returned immediately; a reload is scheduled
+        in the background so the request path never waits on the database.
+        """
+        snapshot = self._snapshot
+        if snapshot is None:
+            return await self.refresh(force=False)
+
+        if snapshot.age_seconds > self.ttl_seconds * 2 and not self._load_lock.locked() and not self._tasks:
+            task = asyncio.create_task(self._refresh_quietly())
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+        return snapshot
+
+    async def refresh(self, force: bool = True) -> CatalogSnapshot:
+        """
+        Reload the snapshot from the database.
+
+        Concurrent callers share one load. With ``force=False`` a caller that
+        waited on another load reuses its result instead of reloading.
+        """
+        version_seen = self._version
+        async with self._load_lock:
+            if not force and self._snapshot is not None and self._version != version_seen:
+                return self._snapshot
+
+            collection = get_reference_classes_collection()
+            documents = await collection.find({"is_active": True}).to_list(length=None)
+            classes = [ReferenceClass(**doc) for doc in documents]
+
+            self._version += 1
+            self._snapshot = CatalogSnapshot(self._version, classes)
+
+            logger.info(
+                f"Reference catalog loaded: version={self._version}, classes={len(classes)}"
+            )
+            return self._snapshot
+
+    async def _refresh_quietly(self) -> None:
+        """Refresh without raising; used from background tasks."""
+        try:
+            await self.refresh(force=False)
+        except Exception as e:
+            logger.error(f"Error refreshing reference catalog: {e}")
+
+    async def _refresh_loop(self) -> None:
+        """Periodically reload the snapshot."""
+        while True:
+            await self._refresh_quietly()
+            await asyncio.sleep(self.ttl_seconds)
+
+    def start(self) -> None:
+        """Start the background refresh task."""
+        if self._refresh_task is None:
+            self._refresh_task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self) -> None:
+        """Stop the background refresh task and any in-flight reloads."""
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            try:
+                await self._refresh_task
+            except asyncio.CancelledError:
+                pass
+            self._refresh_task = None
+
+        for task in list(self._tasks):
+            task.cancel()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+
+
+# Global catalog instance
+reference_catalog = ReferenceCatalog(ttl_seconds=settings.REFERENCE_CATALOG_TTL_SECONDS)
@@ -9,11 +9,28 @@ import logging
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 
+from pymongo import ReturnDocument
+
 from app.models.reference import ReferenceClass, ReferenceProject
 from app.db.mongodb import get_reference_classes_collection, get_reference_projects_collection
+from app.db.indexes import QueryShape
+from app.core.constants import DB_COLLECTIONS
+from app.services.reference_catalog import reference_catalog
+from app.services.reference_stats import ReferenceStatsService
 
 logger = logging.getLogger(__name__)
 
+# Query shapes issued by this module (see app.db.indexes)
+QUERY_SHAPES = [
+    QueryShape("by_name", DB_COLLECTIONS["REFERENCE_CLASSES"], {"name": "residential_pool"}, unique=True),
+    QueryShape("by_project_id", DB_COLLECTIONS["REFERENCE_PROJECTS"], {"project_id": "pool_001"}, unique=True),
+    QueryShape(
+        "top_quality_for_class_region", DB_COLLECTIONS["REFERENCE_PROJECTS"],
+        {"reference_class": "residential_pool", "region": "SoCal - Coastal", "is_active": True},
+        sort=[("quality_score", -1)]
+    ),
+]
+
 
 class ReferenceService:
     """Service for handling reference classes and projects."""
@@ -21,31 +38,25 @@ class ReferenceService:
     def __init__(self):
         self.classes_collection = get_reference_classes_collection()
         self.projects_collection = get_reference_projects_collection()
+        self.stats_service = ReferenceStatsService()
     
     async def get_reference_classes(self, category: Optional[str] = None) -> List[ReferenceClass]:
-        """Get reference classes, optionally filtered by category."""
+        """Get active reference classes from the catalog, optionally filtered by category."""
         try:
-            query = {"is_active": True}
+            snapshot = await reference_catalog.get_snapshot()
             if category:
-                query["category"] = category
-            
-            cursor = self.classes_collection.find(query)
-            classes_list = await cursor.to_list(length=None)
-            
-            return [ReferenceClass(**cls) for cls in classes_list]
+                return list(snapshot.by_category.get(category, []))
+            return list(snapshot.classes)
             
         except Exception as e:
             logger.error(f"Error getting reference classes: {e}")
             raise
     
     async def get_reference_class(self, name: str) -> Optional[ReferenceClass]:
-        """Get specific reference class by name."""
+        """Get specific active reference class by name from the catalog."""
         try:
-            class_data = await self.classes_collection.find_one({"name": name, "is_active": True})
-            
-            if class_data:
-                return ReferenceClass(**class_data)
-            return None
+            snapshot = await reference_catalog.get_snapshot()
+            return snapshot.by_name.get(name)
             
         except Exception as e:
             logger.error(f"Error getting reference class: {e}")
@@ -113,6 +124,7 @@ class ReferenceService:
             # Create new reference class
             reference_class = ReferenceClass(**class_data)
             result = await self.classes_collection.insert_one(reference_class.dict(by_alias=True))
+            await reference_catalog.refresh()
             
             logger.info(f"Reference class created: {result.inserted_id}")
             return str(result.inserted_id)
@@ -132,6 +144,7 @@ class ReferenceService:
             # Create new reference project
             reference_project = ReferenceProject(**project_data)
             result = await self.projects_collection.insert_one(reference_project.dict(by_alias=True))
+            await self.stats_service.recompute_group(reference_project.reference_class, reference_project.region.value)
             
             logger.info(f"Reference project created: {result.inserted_id}")
             return str(result.inserted_id)
@@ -147,6 +160,8 @@ class ReferenceService:
                 {"name": name},
                 {"$set": {**updates, "updated_at": datetime.utcnow()}}
             )
+            if result.modified_count > 0:
+                await reference_catalog.refresh()
             
             return result.modified_count > 0
             
@@ -155,14 +170,28 @@ class ReferenceService:
             raise
     
     async def update_reference_project(self, project_id: str, updates: Dict[str, Any]) -> bool:
-        """Update an existing reference project."""
+        """Update an existing reference project; returns whether anything changed."""
         try:
-            result = await self.projects_collection.update_one(
-                {"project_id": project_id},
-                {"$set": {**updates, "updated_at": datetime.utcnow()}}
+            if not updates:
+                return False
+            
+            # Only match when some field differs, so unchanged projects keep
+            # their updated_at and stats are not recomputed
+            previous = await self.projects_collection.find_one_and_update(
+                {
+                    "project_id": project_id,
+                    "$or": [{field: {"$ne": value}} for field, value in updates.items()],
+                },
+                {"$set": {**updates, "updated_at": datetime.utcnow()}},
+                projection={"reference_class": 1, "region": 1},
+                return_document=ReturnDocument.BEFORE
             )
             
-            return result.modified_count > 0
+            if not previous:
+                return False
+            
+            await self._recompute_stats_for_change(previous, updates)
+            return True
             
         except Exception as e:
             logger.error(f"Error updating reference project: {e}")
@@ -175,6 +204,8 @@ class ReferenceService:
                 {"name": name},
                 {"$set": {"is_active": False, "updated_at": datetime.utcnow()}}
             )
+            if result.modified_count > 0:
+                await reference_catalog.refresh()
             
             return result.modified_count > 0
             
@@ -185,17 +216,35 @@ class ReferenceService:
     async def deactivate_reference_project(self, project_id: str) -> bool:
         """Deactivate a reference project."""
         try:
-            result = await self.projects_collection.update_one(
-                {"project_id": project_id},
-                {"$set": {"is_active": False, "updated_at": datetime.utcnow()}}
+            previous = await self.projects_collection.find_one_and_update(
+                {"project_id": project_id, "is_active": True},
+                {"$set": {"is_active": False, "updated_at": datetime.utcnow()}},
+                projection={"reference_class": 1, "region": 1}
             )
             
-            return result.modified_count > 0
+            if not previous:
+                return False
+            
+            await self.stats_service.recompute_group(previous["reference_class"], previous["region"])
+            return True
             
         except Exception as e:
             logger.error(f"Error deactivating reference project: {e}")
             raise
     
+    async def _recompute_stats_for_change(self, previous: Dict[str, Any], updates: Dict[str, Any]) -> None:
+        """Recompute the stats groups a project update touched."""
+        old_group = (previous["reference_class"], previous["region"])
+        new_region = updates.get("region", old_group[1])
+        new_group = (
+            updates.get("reference_class", old_group[0]),
+            getattr(new_region, "value", new_region)
+        )
+        
+        await self.stats_service.recompute_group(*old_group)
+        if new_group != old_group:
+            await self.stats_service.recompute_group(*new_group)
+    
     async def get_reference_statistics(self) -> Dict[str, Any]:
         """Get statistics about reference data."""
         try:
@@ -0,0 +1,206 @@
+"""
+Reference statistics service for efOfX Estimation Service.
+
+This module maintains the materialized reference_stats collection: one
+document per (reference_class, region) with cost, timeline and team-size
+distributions, so estimation reads a single small document instead of
+scanning reference projects.
+
+Usage:
+    python -m app.services.reference_stats --rebuild
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from pymongo import ReplaceOne
+
+from app.core.constants import DB_COLLECTIONS
+from app.db.indexes import QueryShape
+from app.db.mongodb import get_reference_projects_collection, get_reference_stats_collection
+from app.utils.calculation_utils import summarize_reference_projects
+from app.utils.statistics import summarize_project_groups
+
+logger = logging.getLogger(__name__)
+
+# Query shapes issued by this module (see app.db.indexes)
+QUERY_SHAPES = [
+    QueryShape(
+        "by_class_region", DB_COLLECTIONS["REFERENCE_STATS"],
+        {"reference_class": "residential_pool", "region": "SoCal - Coastal"}, unique=True
+    ),
+    QueryShape(
+        "active_by_class_region", DB_COLLECTIONS["REFERENCE_PROJECTS"],
+        {"is_active": True}, sort=[("reference_class", 1), ("region", 1)]
+    ),
+]
+
+# Only the fields the statistics need are read from reference_projects
+PROJECT_PROJECTION = {
+    "_id": 0,
+    "project_id": 1,
+    "reference_class": 1,
+    "region": 1,
+    "total_cost": 1,
+    "timeline_weeks": 1,
+    "team_size": 1,
+    "cost_breakdown": 1,
+    "quality_score": 1,
+}
+
+# Number of highest-quality project IDs kept for attribution
+TOP_PROJECTS = 3
+
+REBUILD_BATCH_SIZE = 500
+
+# Projects summarized together in one vectorized pass during a rebuild
+REBUILD_PROJECT_BATCH = 50_000
+
+
+def build_stats_document(
+    reference_class: str,
+    region: str,
+    projects: List[Dict[str, Any]],
+    summary: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """Build the stats document for one group of active projects."""
+    top = sorted(projects, key=lambda p: p.get("quality_score", 0.0), reverse=True)[:TOP_PROJECTS]
+    return {
+        "reference_class": reference_class,
+        "region": region,
+        **(summary or summarize_reference_projects(projects)),
+        "top_project_ids": [p.get("project_id", "") for p in top],
+        "updated_at": datetime.utcnow(),
+    }
+
+
+class ReferenceStatsService:
+    """Service for maintaining and reading materialized reference statistics."""
+
+    def __init__(self):
+        self.projects_collection = get_reference_projects_collection()
+        self.stats_collection = get_reference_stats_collection()
+
+    async def get_stats(self, reference_class: str, region: str) -> Optional[Dict[str, Any]]:
+        """Get precomputed statistics for a class and region."""
+        try:
+            return await self.stats_collection.find_one(
+                {"reference_class": reference_class, "region": region},
+                {"_id": 0}
+            )
+
+        except Exception as e:
+            logger.error(f"Error getting reference stats: {e}")
+            return None
+
+    async def recompute_group(self, reference_class: str, region: str) -> Optional[Dict[str, Any]]:
+        """Recompute one group's statistics from its active projects."""
+        try:
+            cursor = self.projects_collection.find(
+                {"reference_class": reference_class, "region": region, "is_active": True},
+                PROJECT_PROJECTION
+            )
+            projects = await cursor.to_list(length=None)
+
+            if not projects:
+                await self.stats_collection.delete_one(
+                    {"reference_class": reference_class, "region": region}
+                )
+                return None
+
+            document = build_stats_document(reference_class, region, projects)
+            await self.stats_collection.replace_one(
+                {"reference_class": reference_class, "region": region},
+                document,
+                upsert=True
+            )
+            return document
+
+        except Exception as e:
+            logger.error(f"Error recomputing reference stats: {e}")
+            raise
+
+    async def rebuild_all(self) -> int:
+        """
+        Rebuild every group in one ordered pass over active projects.
+
+        Groups that no longer have active projects are removed afterwards.
+        """
+        try:
+            started_at = datetime.utcnow()
+            cursor = self.projects_collection.find({"is_active": True}, PROJECT_PROJECTION).sort(
+                [("reference_class", 1), ("region", 1)]
+            )
+
+            operations: List[ReplaceOne] = []
+            groups = 0
+            current_key = None
+            batch: List[Dict[str, Any]] = []
+            # (key, start, end) slices of ``batch``; groups are never split
+            spans: List[Tuple[Tuple[str, str], int, int]] = []
+
+            async def flush_batch() -> None:
+                nonlocal groups
+                if not batch:
+                    return
+                summaries = summarize_project_groups(batch)
+                for key, start, end in spans:
+                    reference_class, region = key
+                    operations.append(ReplaceOne(
+                        {"reference_class": reference_class, "region": region},
+                        build_stats_document(reference_class, region, batch[start:end], summaries[key]),
+                        upsert=True
+                    ))
+                    groups += 1
+                    if len(operations) >= REBUILD_BATCH_SIZE:
+                        await self.stats_collection.bulk_write(operations, ordered=False)
+                        operations.clear()
+                batch.clear()
+                spans.clear()
+
+            async for project in cursor:
+                key = (project["reference_class"], project["region"])
+                if key != current_key:
+                    if len(batch) >= REBUILD_PROJECT_BATCH:
+                        await flush_batch()
+                    current_key = key
+                    spans.append((key, len(batch), len(batch)))
+                batch.append(project)
+                spans[-1] = (key, spans[-1][1], len(batch))
+            await flush_batch()
+
+            if operations:
+                await self.stats_collection.bulk_write(operations, ordered=False)
+
+            await self.stats_collection.delete_many({"updated_at": {"$lt": started_at}})
+
+            logger.info(f"Reference stats rebuilt: {groups} groups")
+            return groups
+
+        except Exception as e:
+            logger.error(f"Error rebuilding reference stats: {e}")
+            raise
+
+
+async def _main() -> int:
+    from app.db.mongodb import connect_to_mongo, close_mongo_connection
+
+    await connect_to_mongo()
+    try:
+        await ReferenceStatsService().rebuild_all()
+        return 0
+    finally:
+        await close_mongo_connection()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Maintain materialized reference statistics")
+    parser.add_argument("--rebuild", action="store_true", required=True, help="Rebuild all groups")
+    parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(asyncio.run(_main()))
@@ -0,0 +1,108 @@
+"""
+Session expiry sweeper for efOfX Estimation Service.
+
+Estimation sessions are kept after they expire, so they cannot use a TTL
+index. This module periodically marks pending sessions past their
+``expires_at`` as EXPIRED with a few ``update_many`` calls, each bounded
+to one window of the indexed ``expires_at`` range.
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Optional
+
+from app.core.config import settings
+from app.core.constants import DB_COLLECTIONS, EstimationStatus, PENDING_ESTIMATION_STATUSES
+from app.db.indexes import QueryShape
+from app.db.mongodb import get_estimates_collection
+
+logger = logging.getLogger(__name__)
+
+_PENDING = [status.value for status in PENDING_ESTIMATION_STATUSES]
+
+# Query shapes issued by this module (see app.db.indexes)
+QUERY_SHAPES = [
+    QueryShape(
+        "pending_by_expiry", DB_COLLECTIONS["ESTIMATES"],
+        {"status": {"$in": _PENDING}, "expires_at": {"$lt": datetime(2024, 1, 1)}},
+        sort=[("expires_at", 1)]
+    ),
+]
+
+
+class SessionSweeper:
+    """Background task that persists the EXPIRED status of pending sessions."""
+
+    def __init__(self, interval_seconds: float = 60.0, window_minutes: int = 60, max_batches: int = 50):
+        self.interval_seconds = interval_seconds
+        self.window = timedelta(minutes=window_minutes)
+        self.max_batches = max_batches
+        self._task: Optional[asyncio.Task] = None
+
+    async def sweep(self, now: Optional[datetime] = None) -> int:
+        """
+        Expire pending sessions whose expires_at is before ``now``.
+
+        Starts at the oldest expired pending session and walks forward one
+        window per ``update_many``, stopping after ``max_batches`` windows;
+        the rest is picked up by the next run.
+        """
+        now = now or datetime.utcnow()
+        collection = get_estimates_collection()
+
+        oldest = await collection.find_one(
+            {"status": {"$in": _PENDING}, "expires_at": {"$lt": now}},
+            {"expires_at": 1},
+            sort=[("expires_at", 1)]
+        )
+        if not oldest:
+            return 0
+
+        expired = 0
+        start = oldest["expires_at"]
+        for _ in range(self.max_batches):
+            if start >= now:
+                break
+            end = min(start + self.window, now)
+            result = await collection.update_many(
+                {"status": {"$in": _PENDING}, "expires_at": {"$gte": start, "$lt": end}},
+                {"$set": {"status": EstimationStatus.EXPIRED, "updated_at": now}, "$inc": {"version": 1}}
+            )
+            expired += result.modified_count
+            start = end
+
+        if expired:
+            logger.info(f"Expired {expired} estimation sessions")
+        return expired
+
+    async def _sweep_loop(self) -> None:
+        while True:
+            try:
+                await self.sweep()
+            except Exception as e:
+                logger.error(f"Error sweeping expired sessions: {e}")
+            await asyncio.sleep(self.interval_seconds)
+
+    def start(self) -> None:
+        """Start the background sweep task."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._sweep_loop())
+
+    async def stop(self) -> None:
+        """Stop the background sweep task."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+# Global sweeper instance
+session_sweeper = SessionSweeper(
+    interval_seconds=settings.SESSION_SWEEP_INTERVAL_SECONDS,
+    window_minutes=settings.SESSION_SWEEP_WINDOW_MINUTES,
+    max_batches=settings.SESSION_SWEEP_MAX_BATCHES,
+)
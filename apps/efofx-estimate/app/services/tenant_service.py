@@ -6,13 +6,35 @@ configuration in the multitenant system.
 """
 
 import logging
-from typing import List, Dict, Any, Optional
+from datetime import datetime
+from typing import Dict, Any, Optional
+
+from bson import ObjectId
 
 from app.models.tenant import Tenant, TenantCreate, TenantUpdate
+from app.core.tenant_cache import tenant_cache
 from app.db.mongodb import get_tenants_collection
+from app.services.feedback_rollups import FeedbackRollupService
+from app.services.platform_stats import platform_stats
+from app.services.usage_service import usage_counters
+from app.db.indexes import QueryShape
+from app.utils.pagination import paginate, with_string_id
+from app.core.constants import DB_COLLECTIONS
 
 logger = logging.getLogger(__name__)
 
+# Query shapes issued by this module (see app.db.indexes)
+QUERY_SHAPES = [
+    QueryShape("by_api_key", DB_COLLECTIONS["TENANTS"], {"api_key": "sk_sample"}, unique=True),
+    QueryShape("active", DB_COLLECTIONS["TENANTS"], {"is_active": True}, sort=[("_id", 1)]),
+]
+
+# Admin listings page through active tenants in _id order
+TENANT_LIST_SORT = [("_id", 1)]
+
+# Listing fields; API keys are never listed
+TENANT_LIST_PROJECTION = {"name": 1, "regions": 1, "max_estimations_per_month": 1, "is_active": 1, "created_at": 1}
+
 
 class TenantService:
     """Service for handling tenant management."""
@@ -47,13 +69,13 @@ class TenantService:
             logger.error(f"Error getting tenant by API key: {e}")
             raise
     
-    async def list_tenants(self, limit: int = 10, offset: int = 0) -> List[Tenant]:
-        """List tenants with pagination."""
+    async def list_tenants(self, limit: int = 10, cursor: Optional[str] = None) -> Dict[str, Any]:
+        """List active tenants, one keyset page at a time (see app.utils.pagination)."""
         try:
-            cursor = self.collection.find({"is_active": True}).skip(offset).limit(limit)
-            tenants_list = await cursor.to_list(length=None)
-            
-            return [Tenant(**tenant) for tenant in tenants_list]
+            return await paginate(
+                self.collection, {"is_active": True}, TENANT_LIST_SORT, limit, cursor,
+                projection=TENANT_LIST_PROJECTION, transform=with_string_id
+            )
             
         except Exception as e:
             logger.error(f"Error listing tenants: {e}")
@@ -70,6 +92,8 @@ class TenantService:
             # Create new tenant
             tenant = Tenant(**tenant_data.dict())
             result = await self.collection.insert_one(tenant.dict(by_alias=True))
+            # The key may have been cached as unknown before it existed
+            tenant_cache.invalidate_api_key(tenant.api_key)
             
             logger.info(f"Tenant created: {result.inserted_id}")
             return str(result.inserted_id)
@@ -92,6 +116,7 @@ class TenantService:
                 {"_id": ObjectId(tenant_id)},
                 {"$set": update_data}
             )
+            tenant_cache.invalidate(tenant_id)
             
             return result.modified_count > 0
             
@@ -109,6 +134,7 @@ class TenantService:
                 {"_id": ObjectId(tenant_id)},
                 {"$set": {"is_active": False, "updated_at": datetime.utcnow()}}
             )
+            tenant_cache.invalidate(tenant_id)
             
             return result.modified_count > 0
             
@@ -119,39 +145,25 @@ class TenantService:
     async def get_tenant_statistics(self, tenant_id: str) -> Dict[str, Any]:
         """Get statistics for a specific tenant."""
         try:
-            from bson import ObjectId
-            from datetime import datetime, timedelta
+            from datetime import timedelta
             
-            # Get estimation count for last 30 days
+            # Estimation count for the last 30 days, from daily usage counters
             thirty_days_ago = datetime.utcnow() - timedelta(days=30)
+            estimation_count = await usage_counters.usage_since(ObjectId(tenant_id), thirty_days_ago)
             
-            estimates_collection = get_estimates_collection()
-            estimation_count = await estimates_collection.count_documents({
-                "tenant_id": ObjectId(tenant_id),
-                "created_at": {"$gte": thirty_days_ago}
-            })
-            
-            # Get feedback count
-            feedback_collection = get_feedback_collection()
-            feedback_count = await feedback_collection.count_documents({
-                "tenant_id": ObjectId(tenant_id)
-            })
+            # Feedback count and average rating, from weekly rollups
+            feedback_totals = await FeedbackRollupService().totals(ObjectId(tenant_id))
+            feedback_count = feedback_totals["count"]
+            average_rating = feedback_totals["rating_sum"] / feedback_count if feedback_count else 0.0
             
-            # Get average rating
-            pipeline = [
-                {"$match": {"tenant_id": ObjectId(tenant_id)}},
-                {"$group": {"_id": None, "avg_rating": {"$avg": "$rating"}}}
-            ]
-            
-            rating_result = await feedback_collection.aggregate(pipeline).to_list(1)
-            average_rating = rating_result[0]["avg_rating"] if rating_result else 0.0
+            tenant = await tenant_cache.get_by_id(tenant_id)
             
             return {
                 "estimations_last_30_days": estimation_count,
                 "total_feedback": feedback_count,
                 "average_rating": average_rating,
                 "active_regions": [],  # Would be populated from actual data
-                "monthly_limit": 1000  # Would come from tenant settings
+                "monthly_limit": tenant.max_estimations_per_month if tenant else 0
             }
             
         except Exception as e:
@@ -161,22 +173,13 @@ class TenantService:
     async def validate_tenant_limits(self, tenant_id: str) -> Dict[str, Any]:
         """Validate tenant usage against limits."""
         try:
-            from bson import ObjectId
-            from datetime import datetime, timedelta
-            
             # Get tenant
-            tenant = await self.get_tenant(tenant_id)
+            tenant = await tenant_cache.get_by_id(tenant_id)
             if not tenant:
                 raise ValueError("Tenant not found")
             
-            # Get current month usage
-            start_of_month = datetime.utcnow().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-            
-            estimates_collection = get_estimates_collection()
-            monthly_usage = await estimates_collection.count_documents({
-                "tenant_id": ObjectId(tenant_id),
-                "created_at": {"$gte": start_of_month}
-            })
+            # Get current month usage from the usage counters
+            monthly_usage = await usage_counters.monthly_usage(tenant.id)
             
             # Check limits
             limit_exceeded = monthly_usage >= tenant.max_estimations_per_month
@@ -195,27 +198,13 @@ class TenantService:
             raise
     
     async def get_all_tenant_statistics(self) -> Dict[str, Any]:
-        """Get statistics for all tenants."""
+        """Get statistics for all tenants, from the periodically refreshed platform snapshot."""
         try:
-            # Count total tenants
-            total_tenants = await self.collection.count_documents({})
-            active_tenants = await self.collection.count_documents({"is_active": True})
+            snapshot = await platform_stats.get_snapshot()
+            if snapshot.tenants is None:
+                raise RuntimeError("Platform statistics are unavailable")
             
-            # Get total estimations across all tenants
-            estimates_collection = get_estimates_collection()
-            total_estimations = await estimates_collection.count_documents({})
-            
-            # Get total feedback
-            feedback_collection = get_feedback_collection()
-            total_feedback = await feedback_collection.count_documents({})
-            
-            return {
-                "total_tenants": total_tenants,
-                "active_tenants": active_tenants,
-                "total_estimations": total_estimations,
-                "total_feedback": total_feedback,
-                "average_estimations_per_tenant": total_estimations / active_tenants if active_tenants > 0 else 0
-            }
+            return {**snapshot.tenants, "as_of": snapshot.refreshed_at}
             
         except Exception as e:
             logger.error(f"Error getting all tenant statistics: {e}")
@@ -0,0 +1,316 @@
+"""
+Tuning service for efOfX Estimation Service.
+
+This module derives per-(reference_class, region) cost tuning factors from
+feedback that reports an actual cost, by comparing it with the estimate
+the feedback refers to. A batch rebuild streams the joined rows in chunks,
+computes robust log-ratio statistics for every group at once with NumPy
+and stores them as TuningData. A process-wide factor table serves the
+stored factors to the estimation path with a dictionary lookup.
+
+Usage:
+    python -m app.services.tuning_service --rebuild
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+from pymongo import ReplaceOne
+
+from app.core.config import settings
+from app.core.constants import DB_COLLECTIONS, TUNING_CONFIG, EstimationStatus
+from app.db.indexes import QueryShape
+from app.db.mongodb import get_feedback_collection, get_tuning_data_collection
+from app.models.feedback import TuningData
+from app.utils.statistics import grouped_mad_inlier_mask
+
+logger = logging.getLogger(__name__)
+
+# Query shapes issued by this module (see app.db.indexes)
+QUERY_SHAPES = [
+    QueryShape(
+        "by_class_region", DB_COLLECTIONS["TUNING_DATA"],
+        {"reference_class": "residential_pool", "region": "SoCal - Coastal"}, unique=True
+    ),
+]
+
+GroupKey = Tuple[str, str]
+
+
+def feedback_ratio_pipeline() -> List[Dict[str, Any]]:
+    """
+    Aggregation yielding one row per feedback entry with an actual cost:
+    the estimate's reference class, region, estimated cost and the tuning
+    factor that cost already includes alongside it.
+    """
+    return [
+        {"$match": {"actual_cost": {"$gt": 0}}},
+        {"$lookup": {
+            "from": DB_COLLECTIONS["ESTIMATES"],
+            "localField": "estimation_session_id",
+            "foreignField": "session_id",
+            "let": {"tenant_id": "$tenant_id"},
+            "pipeline": [
+                {"$match": {
+                    "status": EstimationStatus.COMPLETED.value,
+                    "$expr": {"$eq": ["$tenant_id", "$$tenant_id"]},
+                }},
+                {"$project": {
+                    "_id": 0, "reference_class": 1, "region": 1,
+                    "total_cost": "$result.total_cost",
+                    "tuning_factor": {"$ifNull": ["$result.tuning_factor", 1.0]},
+                }},
+            ],
+            "as": "estimate",
+        }},
+        {"$unwind": "$estimate"},
+        {"$match": {"estimate.total_cost": {"$gt": 0}}},
+        {"$project": {
+            "actual_cost": 1,
+            "reference_class": "$estimate.reference_class",
+            "region": "$estimate.region",
+            "estimated_cost": "$estimate.total_cost",
+            "tuning_factor": "$estimate.tuning_factor",
+        }},
+    ]
+
+
+class RatioAccumulator:
+    """
+    Collects log(actual / untuned estimate) per group in contiguous chunks.
+
+    Estimates already scaled by a published factor are divided by it, so a
+    rebuild measures the full correction rather than what is left after
+    the previous one; otherwise factors would flip between f and 1.0 on
+    alternate rebuilds.
+
+    Rows are converted to NumPy arrays every ``chunk_size`` rows, so memory
+    is about twelve bytes per row plus a bounded sample of feedback IDs.
+    """
+
+    def __init__(self, chunk_size: int = TUNING_CONFIG["CHUNK_SIZE"]):
+        self.chunk_size = chunk_size
+        self.group_keys: List[GroupKey] = []
+        self._codes_by_key: Dict[GroupKey, int] = {}
+        self._feedback_ids: List[Deque[str]] = []
+        self._code_chunks: List[np.ndarray] = []
+        self._ratio_chunks: List[np.ndarray] = []
+        self._codes: List[int] = []
+        self._actual: List[float] = []
+        self._estimated: List[float] = []
+
+    def add(self, row: Dict[str, Any]) -> None:
+        key = (row["reference_class"], row["region"])
+        code = self._codes_by_key.get(key)
+        if code is None:
+            code = self._codes_by_key[key] = len(self.group_keys)
+            self.group_keys.append(key)
+            self._feedback_ids.append(deque(maxlen=TUNING_CONFIG["FEEDBACK_ID_SAMPLE"]))
+        self._feedback_ids[code].append(str(row["_id"]))
+        self._codes.append(code)
+        self._actual.append(row["actual_cost"])
+        self._estimated.append(row["estimated_cost"] / (row.get("tuning_factor") or 1.0))
+        if len(self._codes) >= self.chunk_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._codes:
+            return
+        self._code_chunks.append(np.asarray(self._codes, dtype=np.int32))
+        self._ratio_chunks.append(np.log(
+            np.asarray(self._actual, dtype=np.float64) / np.asarray(self._estimated, dtype=np.float64)
+        ))
+        self._codes.clear()
+        self._actual.clear()
+        self._estimated.clear()
+
+    def arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        """All (codes, log ratios) collected so far."""
+        self.flush()
+        if not self._code_chunks:
+            return np.zeros(0, dtype=np.int32), np.zeros(0)
+        return np.concatenate(self._code_chunks), np.concatenate(self._ratio_chunks)
+
+    def feedback_ids(self, code: int) -> List[str]:
+        return list(self._feedback_ids[code])
+
+
+def robust_tuning_factors(
+    log_ratios: np.ndarray,
+    codes: np.ndarray,
+    n_groups: int
+) -> Dict[str, np.ndarray]:
+    """
+    Tuning factor, confidence and sample size for every group at once.
+
+    Outliers are dropped by MAD, then the median log ratio is shrunk
+    towards zero by ``n / (n + PRIOR_SAMPLES)`` so small groups move
+    factors less. Confidence is that shrinkage weight discounted by the
+    spread of the remaining ratios.
+    """
+    inliers, _, _ = grouped_mad_inlier_mask(log_ratios, codes, n_groups, TUNING_CONFIG["OUTLIER_THRESHOLD"])
+    kept_codes = codes[inliers]
+    kept_ratios = log_ratios[inliers]
+
+    counts = np.bincount(kept_codes, minlength=n_groups)
+    _, centers, mads = grouped_mad_inlier_mask(kept_ratios, kept_codes, n_groups)
+    spread = np.nan_to_num(1.4826 * mads)
+
+    weight = counts / (counts + TUNING_CONFIG["PRIOR_SAMPLES"])
+    factors = np.clip(
+        np.exp(weight * np.nan_to_num(centers)),
+        TUNING_CONFIG["MIN_FACTOR"],
+        TUNING_CONFIG["MAX_FACTOR"]
+    )
+    confidence = np.clip(weight * np.exp(-spread), 0.0, 1.0)
+    return {"tuning_factor": factors, "confidence": confidence, "sample_size": counts}
+
+
+class TuningFactorTable:
+    """
+    Process-wide table of published tuning factors.
+
+    Lookups are dictionary reads; the table is reloaded from tuning_data
+    every ``refresh_seconds`` and replaced in place after a rebuild in the
+    same process.
+    """
+
+    def __init__(self, refresh_seconds: float = 300.0):
+        self.refresh_seconds = refresh_seconds
+        self._by_class: Dict[str, Dict[str, float]] = {}
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    def for_class(self, reference_class: str) -> Dict[str, float]:
+        """Region -> factor for one reference class, as apply_tuning_factors expects."""
+        return self._by_class.get(reference_class, {})
+
+    def get(self, reference_class: str, region: str) -> float:
+        return self.for_class(reference_class).get(region, 1.0)
+
+    def publish(self, documents: List[Dict[str, Any]]) -> None:
+        """Replace the table with factors from qualifying TuningData documents."""
+        by_class: Dict[str, Dict[str, float]] = {}
+        for doc in documents:
+            if doc.get("sample_size", 0) >= TUNING_CONFIG["MIN_SAMPLES"]:
+                by_class.setdefault(doc["reference_class"], {})[doc["region"]] = doc["tuning_factor"]
+        self._by_class = by_class
+
+    async def refresh(self) -> None:
+        cursor = get_tuning_data_collection().find(
+            {}, {"_id": 0, "reference_class": 1, "region": 1, "tuning_factor": 1, "sample_size": 1}
+        )
+        self.publish(await cursor.to_list(length=None))
+        logger.info(f"Tuning factors loaded for {len(self._by_class)} reference classes")
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.error(f"Error refreshing tuning factors: {e}")
+            await asyncio.sleep(self.refresh_seconds)
+
+    def start(self) -> None:
+        """Start the background refresh task."""
+        if self._refresh_task is None:
+            self._refresh_task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self) -> None:
+        """Stop the background refresh task."""
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            try:
+                await self._refresh_task
+            except asyncio.CancelledError:
+                pass
+            self._refresh_task = None
+
+
+class TuningService:
+    """Service for computing tuning factors from feedback."""
+
+    def __init__(self):
+        self.feedback_collection = get_feedback_collection()
+        self.tuning_collection = get_tuning_data_collection()
+
+    async def rebuild(self) -> int:
+        """
+        Recompute every group's tuning factor and publish the result.
+
+        Groups without feedback are removed afterwards. Returns the number
+        of groups stored.
+        """
+        try:
+            started_at = datetime.utcnow()
+            accumulator = RatioAccumulator()
+            cursor = self.feedback_collection.aggregate(
+                feedback_ratio_pipeline(), allowDiskUse=True, batchSize=TUNING_CONFIG["CURSOR_BATCH_SIZE"]
+            )
+            async for row in cursor:
+                accumulator.add(row)
+
+            codes, log_ratios = accumulator.arrays()
+            n_groups = len(accumulator.group_keys)
+            results = robust_tuning_factors(log_ratios, codes, n_groups)
+
+            documents = []
+            operations = []
+            for code, (reference_class, region) in enumerate(accumulator.group_keys):
+                tuning = TuningData(
+                    reference_class=reference_class,
+                    region=region,
+                    tuning_factor=float(results["tuning_factor"][code]),
+                    confidence=float(results["confidence"][code]),
+                    sample_size=int(results["sample_size"][code]),
+                    feedback_ids=accumulator.feedback_ids(code),
+                    created_at=started_at
+                ).dict(by_alias=True)
+                tuning.pop("_id")
+                documents.append(tuning)
+                operations.append(ReplaceOne(
+                    {"reference_class": reference_class, "region": region}, tuning, upsert=True
+                ))
+
+            for start in range(0, len(operations), TUNING_CONFIG["WRITE_BATCH_SIZE"]):
+                await self.tuning_collection.bulk_write(
+                    operations[start:start + TUNING_CONFIG["WRITE_BATCH_SIZE"]], ordered=False
+                )
+            await self.tuning_collection.delete_many({"created_at": {"$lt": started_at}})
+
+            tuning_factors.publish(documents)
+            logger.info(f"Tuning factors rebuilt: {n_groups} groups from {log_ratios.size} feedback entries")
+            return n_groups
+
+        except Exception as e:
+            logger.error(f"Error rebuilding tuning factors: {e}")
+            raise
+
+
+# Global factor table instance
+tuning_factors = TuningFactorTable(refresh_seconds=settings.TUNING_REFRESH_SECONDS)
+
+
+async def _main() -> int:
+    from app.db.mongodb import connect_to_mongo, close_mongo_connection
+
+    await connect_to_mongo()
+    try:
+        await TuningService().rebuild()
+        return 0
+    finally:
+        await close_mongo_connection()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compute tuning factors from feedback")
+    parser.add_argument("--rebuild", action="store_true", required=True, help="Rebuild all tuning factors")
+    parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(asyncio.run(_main()))
@@ -0,0 +1,272 @@
+"""
+Tenant usage counters for efOfX Estimation Service.
+
+Started estimations are counted in tenant_usage, one document per
+(tenant_id, period) for calendar months ("2024-06") and days
+("2024-06-02"). Starting an estimation reserves quota with a single
+conditional upsert, so monthly limits hold across workers without
+counting estimates. Reads are served from an in-process cache, and a
+background task periodically recounts recent periods from the estimates
+collection to correct drift.
+"""
+
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from bson import ObjectId
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import DuplicateKeyError
+
+from app.core.config import settings
+from app.core.constants import DB_COLLECTIONS
+from app.db.indexes import QueryShape
+from app.db.mongodb import get_estimates_collection, get_tenant_usage_collection
+
+logger = logging.getLogger(__name__)
+
+MONTH = "month"
+DAY = "day"
+
+# The unique index on this shape is what makes reserve() enforce limits
+BY_TENANT_PERIOD = QueryShape(
+    "by_tenant_period", DB_COLLECTIONS["TENANT_USAGE"],
+    {"tenant_id": ObjectId("000000000000000000000000"), "kind": MONTH, "period": "2024-06"},
+    unique=True
+)
+
+# Query shapes issued by this module (see app.db.indexes)
+QUERY_SHAPES = [
+    BY_TENANT_PERIOD,
+    QueryShape(
+        "days_since", DB_COLLECTIONS["TENANT_USAGE"],
+        {"tenant_id": ObjectId("000000000000000000000000"), "kind": DAY, "period": {"$gte": "2024-06-01"}}
+    ),
+    QueryShape("created_since", DB_COLLECTIONS["ESTIMATES"], {"created_at": {"$gte": datetime(2024, 1, 1)}}),
+]
+
+# Days recounted by reconciliation, besides the current month
+RECONCILE_DAYS = 31
+
+WRITE_BATCH_SIZE = 500
+
+
+class QuotaExceededError(Exception):
+    """Raised when a tenant has used its monthly estimation limit."""
+
+
+def month_period(moment: datetime) -> str:
+    return moment.strftime("%Y-%m")
+
+
+def day_period(moment: datetime) -> str:
+    return moment.strftime("%Y-%m-%d")
+
+
+class UsageCounters:
+    """
+    Per-tenant estimation counters with a process-wide read cache.
+
+    Monthly counts are cached for ``cache_ttl_seconds``; counts written by
+    this process update the cache immediately, counts from other workers
+    become visible within one TTL.
+    """
+
+    def __init__(self, cache_ttl_seconds: float = 30.0, reconcile_seconds: float = 3600.0):
+        self.cache_ttl_seconds = cache_ttl_seconds
+        self.reconcile_seconds = reconcile_seconds
+        # (tenant_id, month) -> (loaded_at, count)
+        self._monthly: Dict[Tuple[str, str], Tuple[float, int]] = {}
+        self._reconcile_task: Optional[asyncio.Task] = None
+        self._index_ready = False
+        self._lock: Optional[asyncio.Lock] = None
+
+    @property
+    def _index_lock(self) -> asyncio.Lock:
+        # Not built in __init__, which runs at import time, outside the serving loop
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+    def _cached(self, tenant_id: ObjectId, month: str) -> Optional[int]:
+        entry = self._monthly.get((str(tenant_id), month))
+        if entry is None or time.monotonic() - entry[0] > self.cache_ttl_seconds:
+            return None
+        return entry[1]
+
+    def _remember(self, tenant_id: ObjectId, month: str, count: int) -> None:
+        self._monthly[(str(tenant_id), month)] = (time.monotonic(), count)
+
+    async def ensure_index(self) -> None:
+        """
+        Create the unique (tenant_id, kind, period) index reserve() relies on.
+
+        Without it an upsert at the limit inserts a second month document
+        instead of failing, and the quota silently stops applying. It is
+        created at startup regardless of MONGO_ENSURE_INDEXES, and
+        reservations fail until it exists.
+        """
+        if self._index_ready:
+            return
+        async with self._index_lock:
+            if not self._index_ready:
+                await get_tenant_usage_collection().create_index(
+                    list(BY_TENANT_PERIOD.index_keys), unique=True
+                )
+                self._index_ready = True
+
+    async def reserve(self, tenant_id: ObjectId, limit: int, now: Optional[datetime] = None) -> int:
+        """
+        Count one estimation against the tenant's month and day.
+
+        The month increment only matches while the count is below
+        ``limit``; at the limit the upsert collides with the existing
+        document and QuotaExceededError is raised. Returns the month's
+        usage including this estimation.
+        """
+        now = now or datetime.utcnow()
+        month = month_period(now)
+        cached = self._cached(tenant_id, month)
+        if limit <= 0 or (cached is not None and cached >= limit):
+            raise QuotaExceededError(f"Monthly estimation limit of {limit} reached")
+
+        await self.ensure_index()
+        collection = get_tenant_usage_collection()
+        try:
+            usage = await collection.find_one_and_update(
+                {"tenant_id": tenant_id, "kind": MONTH, "period": month, "count": {"$lt": limit}},
+                {"$inc": {"count": 1}, "$set": {"updated_at": now}},
+                projection={"_id": 0, "count": 1},
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+        except DuplicateKeyError:
+            self._remember(tenant_id, month, limit)
+            raise QuotaExceededError(f"Monthly estimation limit of {limit} reached")
+
+        self._remember(tenant_id, month, usage["count"])
+        await collection.update_one(
+            {"tenant_id": tenant_id, "kind": DAY, "period": day_period(now)},
+            {"$inc": {"count": 1}, "$set": {"updated_at": now}},
+            upsert=True
+        )
+        return usage["count"]
+
+    async def release(self, tenant_id: ObjectId, reserved_at: datetime) -> None:
+        """Undo a reservation whose estimation was never created."""
+        collection = get_tenant_usage_collection()
+        for kind, period in ((MONTH, month_period(reserved_at)), (DAY, day_period(reserved_at))):
+            await collection.update_one(
+                {"tenant_id": tenant_id, "kind": kind, "period": period, "count": {"$gt": 0}},
+                {"$inc": {"count": -1}}
+            )
+        self._monthly.pop((str(tenant_id), month_period(reserved_at)), None)
+
+    async def monthly_usage(self, tenant_id: ObjectId, now: Optional[datetime] = None) -> int:
+        """Estimations started this calendar month."""
+        month = month_period(now or datetime.utcnow())
+        cached = self._cached(tenant_id, month)
+        if cached is not None:
+            return cached
+
+        usage = await get_tenant_usage_collection().find_one(
+            {"tenant_id": tenant_id, "kind": MONTH, "period": month}, {"_id": 0, "count": 1}
+        )
+        count = usage["count"] if usage else 0
+        self._remember(tenant_id, month, count)
+        return count
+
+    async def usage_since(self, tenant_id: ObjectId, since: datetime) -> int:
+        """Estimations started on or after the day of ``since``; reads one document per day."""
+        cursor = get_tenant_usage_collection().find(
+            {"tenant_id": tenant_id, "kind": DAY, "period": {"$gte": day_period(since)}},
+            {"_id": 0, "count": 1}
+        )
+        total = 0
+        async for day in cursor:
+            total += day["count"]
+        return total
+
+    async def reconcile(self, now: Optional[datetime] = None) -> int:
+        """
+        Recount the current month and the last RECONCILE_DAYS days from estimates.
+
+        Estimations started while the recount runs may be overwritten by
+        it; they are counted again by the next run. Returns the number of
+        counters written.
+        """
+        now = now or datetime.utcnow()
+        today = datetime(now.year, now.month, now.day)
+        month_start = today.replace(day=1)
+        since = min(month_start, today - timedelta(days=RECONCILE_DAYS))
+
+        cursor = get_estimates_collection().aggregate([
+            {"$match": {"created_at": {"$gte": since}}},
+            {"$group": {
+                "_id": {
+                    "tenant_id": "$tenant_id",
+                    "day": {"$dateToString": {"format": "%Y-%m-%d", "date": "$created_at"}},
+                },
+                "count": {"$sum": 1},
+            }},
+        ])
+
+        month = month_period(now)
+        monthly: Dict[ObjectId, int] = {}
+        operations: List[UpdateOne] = []
+        async for row in cursor:
+            tenant_id, day = row["_id"]["tenant_id"], row["_id"]["day"]
+            operations.append(UpdateOne(
+                {"tenant_id": tenant_id, "kind": DAY, "period": day},
+                {"$set": {"count": row["count"], "updated_at": now}},
+                upsert=True
+            ))
+            if day.startswith(month):
+                monthly[tenant_id] = monthly.get(tenant_id, 0) + row["count"]
+        operations.extend(
+            UpdateOne(
+                {"tenant_id": tenant_id, "kind": MONTH, "period": month},
+                {"$set": {"count": count, "updated_at": now}},
+                upsert=True
+            )
+            for tenant_id, count in monthly.items()
+        )
+
+        collection = get_tenant_usage_collection()
+        for start in range(0, len(operations), WRITE_BATCH_SIZE):
+            await collection.bulk_write(operations[start:start + WRITE_BATCH_SIZE], ordered=False)
+        self._monthly.clear()
+        logger.info(f"Usage counters reconciled: {len(operations)} counters for {len(monthly)} tenants")
+        return len(operations)
+
+    async def _reconcile_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.reconcile_seconds)
+            try:
+                await self.reconcile()
+            except Exception as e:
+                logger.error(f"Error reconciling usage counters: {e}")
+
+    def start(self) -> None:
+        """Start the background reconciliation task."""
+        if self._reconcile_task is None:
+            self._reconcile_task = asyncio.create_task(self._reconcile_loop())
+
+    async def stop(self) -> None:
+        """Stop the background reconciliation task."""
+        if self._reconcile_task is not None:
+            self._reconcile_task.cancel()
+            try:
+                await self._reconcile_task
+            except asyncio.CancelledError:
+                pass
+            self._reconcile_task = None
+
+
+# Global usage counters instance
+usage_counters = UsageCounters(
+    cache_ttl_seconds=settings.USAGE_CACHE_TTL_SECONDS,
+    reconcile_seconds=settings.USAGE_RECONCILE_SECONDS,
+)
@@ -5,11 +5,13 @@ This package contains helper functions and utilities used throughout
 the estimation service.
 """
 
-from .file_utils import save_uploaded_file, validate_file_type
+from .file_utils import FileTooLargeError, StoredFile, save_uploaded_file, validate_file_type
 from .validation_utils import validate_region, validate_reference_class
 from .calculation_utils import calculate_cost_breakdown, apply_tuning_factors
 
 __all__ = [
+    "FileTooLargeError",
+    "StoredFile",
     "save_uploaded_file",
     "validate_file_type", 
     "validate_region",
@@ -0,0 +1,26 @@
+"""
+Async helpers for efOfX Estimation Service.
+
+This module provides small asyncio utilities that the supported Python
+versions do not all ship with.
+"""
+
+from contextlib import asynccontextmanager
+from typing import AsyncGenerator, AsyncIterator, TypeVar
+
+T = TypeVar("T")
+
+
+@asynccontextmanager
+async def aclosing(generator: AsyncGenerator[T, None]) -> AsyncIterator[AsyncGenerator[T, None]]:
+    """
+    Close an async generator when the block exits.
+
+    Equivalent to ``contextlib.aclosing`` (Python 3.10+): leaving the block
+    early runs the generator's cleanup immediately, instead of whenever
+    the abandoned generator is finalized.
+    """
+    try:
+        yield generator
+    finally:
+        await generator.aclose()
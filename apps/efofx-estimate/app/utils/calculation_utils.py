@@ -8,6 +8,8 @@ tuning factors, and estimation adjustments.
 from typing import Dict, List, Any
 import math
 
+from app.utils.statistics import summarize_project_groups
+
 
 def calculate_cost_breakdown(total_cost: float, breakdown_template: Dict[str, float]) -> Dict[str, float]:
     """Calculate cost breakdown based on template percentages."""
@@ -211,4 +213,19 @@ def calculate_equipment_cost(
     # Adjust for timeline (longer timeline = more equipment rental)
     timeline_factor = max(0.8, min(1.3, timeline_weeks / 8))
     
-    return base_cost * timeline_factor 
\ No newline at end of file
+    return base_cost * timeline_factor 
+
+
+def summarize_reference_projects(projects: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Aggregate statistics for one (reference class, region) group of projects."""
+    if not projects:
+        empty = {"mean": 0.0, "p50": 0.0, "p80": 0.0, "p95": 0.0}
+        return {
+            "count": 0,
+            "total_cost": dict(empty),
+            "timeline_weeks": dict(empty),
+            "team_size": dict(empty),
+            "cost_breakdown_mean": {},
+            "quality_score_mean": 0.0,
+        }
+    return summarize_project_groups(projects, group_by=())[()]
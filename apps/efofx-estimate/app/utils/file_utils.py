@@ -3,15 +3,24 @@ File utility functions for efOfX Estimation Service.
 
 This module provides utilities for file handling, validation,
 and upload management.
+
+Uploads are copied to storage in fixed-size chunks, with the hashing and
+blocking writes of each chunk run in a worker thread, so memory per upload
+is one chunk and the event loop never waits on the disk. Files are named
+by the SHA-256 of their content under the tenant's directory, so the same
+photo uploaded again by a tenant is stored once.
 """
 
+import asyncio
+import hashlib
 import os
-import uuid
+import tempfile
 import logging
-from typing import Optional
+from typing import BinaryIO, Optional, Tuple
 from fastapi import UploadFile
 
 from app.core.config import settings
+from app.core.constants import FILE_UPLOAD_CONFIG
 
 logger = logging.getLogger(__name__)
 
@@ -26,30 +35,103 @@ def validate_file_size(file: UploadFile) -> bool:
     return file.size <= settings.MAX_FILE_SIZE
 
 
-async def save_uploaded_file(file: UploadFile, session_id: str) -> str:
-    """Save uploaded file and return file path."""
+class FileTooLargeError(ValueError):
+    """Raised when an upload exceeds the maximum file size."""
+
+
+class StoredFile:
+    """Result of storing an upload."""
+
+    def __init__(self, url: str, sha256: str, size: int, deduplicated: bool):
+        self.url = url
+        self.sha256 = sha256
+        self.size = size
+        self.deduplicated = deduplicated
+
+
+def _open_temp_file(directory: str) -> Tuple[BinaryIO, str]:
+    os.makedirs(directory, exist_ok=True)
+    fd, path = tempfile.mkstemp(dir=directory, suffix=".part")
+    return os.fdopen(fd, "wb"), path
+
+
+def _write_chunk(buffer: BinaryIO, hasher, chunk: bytes) -> None:
+    hasher.update(chunk)
+    buffer.write(chunk)
+
+
+def _publish(temp_path: str, final_path: str) -> bool:
+    """Move a finished upload into place; returns True if identical content was already stored."""
+    os.makedirs(os.path.dirname(final_path), exist_ok=True)
+    if os.path.exists(final_path):
+        os.remove(temp_path)
+        return True
+    # Atomic on one filesystem, so concurrent identical uploads both succeed
+    os.replace(temp_path, final_path)
+    return False
+
+
+def _discard(buffer: BinaryIO, temp_path: str) -> None:
+    buffer.close()
     try:
-        # Create upload directory if it doesn't exist
-        upload_dir = os.path.join(settings.UPLOAD_DIR, session_id)
-        os.makedirs(upload_dir, exist_ok=True)
-        
-        # Generate unique filename
-        file_extension = os.path.splitext(file.filename)[1]
-        unique_filename = f"{uuid.uuid4().hex}{file_extension}"
-        file_path = os.path.join(upload_dir, unique_filename)
-        
-        # Save file
-        with open(file_path, "wb") as buffer:
-            content = await file.read()
-            buffer.write(content)
-        
-        # Return file URL (in production, this would be a cloud storage URL)
-        return f"/uploads/{session_id}/{unique_filename}"
-        
+        os.remove(temp_path)
+    except FileNotFoundError:
+        pass
+
+
+async def save_uploaded_file(
+    file: UploadFile,
+    tenant_id: str,
+    max_size: Optional[int] = None,
+    chunk_size: Optional[int] = None
+) -> StoredFile:
+    """
+    Stream an upload to storage and return where it was stored.
+
+    The upload is read ``chunk_size`` bytes at a time into a temporary file
+    under the upload directory while its SHA-256 is computed, and aborted
+    with FileTooLargeError as soon as more than ``max_size`` bytes have
+    been read, whatever the client declared. The finished file is renamed
+    to ``<tenant_id>/<sha256[:2]>/<sha256><ext>``; if that already exists
+    the copy is discarded.
+    """
+    max_size = settings.MAX_FILE_SIZE if max_size is None else max_size
+    chunk_size = chunk_size or settings.UPLOAD_CHUNK_SIZE
+    extension = FILE_UPLOAD_CONFIG["EXTENSIONS_BY_TYPE"].get(file.content_type) or get_file_extension(file.filename or "")
+
+    buffer, temp_path = await asyncio.to_thread(
+        _open_temp_file, os.path.join(settings.UPLOAD_DIR, FILE_UPLOAD_CONFIG["TEMP_DIR"])
+    )
+    try:
+        hasher = hashlib.sha256()
+        size = 0
+        while True:
+            chunk = await file.read(chunk_size)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > max_size:
+                raise FileTooLargeError(f"File exceeds {max_size} bytes")
+            await asyncio.to_thread(_write_chunk, buffer, hasher, chunk)
+        await asyncio.to_thread(buffer.close)
+
+        digest = hasher.hexdigest()
+        relative_path = f"{tenant_id}/{digest[:2]}/{digest}{extension}"
+        deduplicated = await asyncio.to_thread(
+            _publish, temp_path, os.path.join(settings.UPLOAD_DIR, relative_path)
+        )
+
+    except FileTooLargeError:
+        await asyncio.to_thread(_discard, buffer, temp_path)
+        raise
     except Exception as e:
+        await asyncio.to_thread(_discard, buffer, temp_path)
         logger.error(f"Error saving uploaded file: {e}")
         raise
 
+    # Return file URL (in production, this would be a cloud storage URL)
+    return StoredFile(f"/uploads/{relative_path}", digest, size, deduplicated)
+
 
 def get_file_extension(filename: str) -> str:
     """Get file extension from filename."""
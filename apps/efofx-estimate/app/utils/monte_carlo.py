@@ -0,0 +1,204 @@
+"""
+Monte Carlo cost and timeline simulation for efOfX Estimation Service.
+
+Each cost category and the timeline are modelled as correlated lognormal
+variables. All trials for one or many estimates are drawn in a single
+vectorized NumPy pass: standard normals are correlated through a Cholesky
+factor, scaled in log space and exponentiated, then reduced to
+percentiles.
+"""
+
+import hashlib
+import math
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from app.core.constants import (
+    COST_BREAKDOWN_SHARES,
+    SIMULATION_CONFIG,
+    CostBreakdownCategory,
+)
+
+COMPONENTS = [category.value for category in CostBreakdownCategory]
+
+PERCENTILES = (50.0, 80.0, 95.0)
+
+# Standard normal quantiles for P80 and P95, used to fit log-space spreads
+_Z80 = 0.8416212335729143
+_Z95 = 1.6448536269514722
+
+# Upper bound on float64 elements drawn at once by simulate_batch
+SIMULATION_CHUNK_ELEMENTS = 1 << 24
+
+
+def fit_log_sigma(p50: float, p80: float, p95: float) -> Optional[float]:
+    """
+    Lognormal spread implied by observed percentiles.
+
+    Averages the estimates from P80/P50 and P95/P50; returns None when the
+    percentiles carry no usable spread.
+    """
+    if p50 <= 0:
+        return None
+    estimates = []
+    if p80 > p50:
+        estimates.append(math.log(p80 / p50) / _Z80)
+    if p95 > p50:
+        estimates.append(math.log(p95 / p50) / _Z95)
+    if not estimates:
+        return None
+    return min(sum(estimates) / len(estimates), SIMULATION_CONFIG["MAX_SIGMA"])
+
+
+def correlation_matrix(
+    n_components: int = len(COMPONENTS),
+    component_correlation: float = SIMULATION_CONFIG["COMPONENT_CORRELATION"],
+    timeline_correlation: float = SIMULATION_CONFIG["TIMELINE_CORRELATION"]
+) -> np.ndarray:
+    """Correlation of the cost categories followed by the timeline."""
+    size = n_components + 1
+    matrix = np.full((size, size), component_correlation)
+    matrix[-1, :] = timeline_correlation
+    matrix[:, -1] = timeline_correlation
+    np.fill_diagonal(matrix, 1.0)
+    return matrix
+
+
+def stable_seed(*parts: Any) -> int:
+    """Deterministic 64-bit seed from the estimate inputs."""
+    digest = hashlib.sha256("|".join(str(p) for p in parts).encode()).digest()
+    return int.from_bytes(digest[:8], "big")
+
+
+class SimulationInput:
+    """
+    Lognormal parameters for one estimate.
+
+    ``component_medians`` follow COMPONENTS order. Category spreads share
+    the relative volatilities in SIMULATION_CONFIG, scaled so that the
+    simulated total has (to first order) a log-space spread of
+    ``cost_sigma``. ``multiplier`` scales every cost category, e.g. for
+    regional price levels.
+    """
+
+    def __init__(
+        self,
+        component_medians: Sequence[float],
+        timeline_median: float,
+        cost_sigma: float = SIMULATION_CONFIG["DEFAULT_COST_SIGMA"],
+        timeline_sigma: float = SIMULATION_CONFIG["DEFAULT_TIMELINE_SIGMA"],
+        multiplier: float = 1.0
+    ):
+        medians = np.asarray(component_medians, dtype=np.float64) * multiplier
+        volatility = np.array([SIMULATION_CONFIG["COMPONENT_VOLATILITY"][c] for c in COMPONENTS])
+
+        weighted = medians * volatility
+        spread = math.sqrt(weighted @ correlation_matrix()[:-1, :-1] @ weighted)
+        scale = cost_sigma * medians.sum() / spread if spread else 0.0
+        sigmas = np.minimum(volatility * scale, SIMULATION_CONFIG["MAX_SIGMA"])
+
+        self.medians = np.append(medians, timeline_median)
+        self.sigmas = np.append(sigmas, timeline_sigma)
+
+    @classmethod
+    def from_point_estimate(
+        cls,
+        cost_breakdown: Dict[str, float],
+        timeline_weeks: float,
+        multiplier: float = 1.0
+    ) -> "SimulationInput":
+        """Centre the distributions on a point estimate with default spreads."""
+        return cls(
+            [cost_breakdown.get(c, 0.0) for c in COMPONENTS],
+            timeline_weeks,
+            multiplier=multiplier
+        )
+
+    @classmethod
+    def from_reference_stats(cls, reference_stats: Dict[str, Any], multiplier: float = 1.0) -> "SimulationInput":
+        """
+        Fit the distributions to a materialized reference_stats document.
+
+        Category means become medians after removing the lognormal mean
+        shift; categories missing from the stats fall back to the default
+        cost shares.
+        """
+        cost = reference_stats["total_cost"]
+        timeline = reference_stats["timeline_weeks"]
+        cost_sigma = fit_log_sigma(cost["p50"], cost["p80"], cost["p95"]) or SIMULATION_CONFIG["DEFAULT_COST_SIGMA"]
+        timeline_sigma = (
+            fit_log_sigma(timeline["p50"], timeline["p80"], timeline["p95"])
+            or SIMULATION_CONFIG["DEFAULT_TIMELINE_SIGMA"]
+        )
+
+        breakdown = reference_stats.get("cost_breakdown_mean") or {}
+        means = [breakdown.get(c, cost["mean"] * COST_BREAKDOWN_SHARES[c]) for c in COMPONENTS]
+        shift = math.exp(-cost_sigma ** 2 / 2)
+
+        return cls(
+            [m * shift for m in means],
+            timeline["p50"],
+            cost_sigma=cost_sigma,
+            timeline_sigma=timeline_sigma,
+            multiplier=multiplier
+        )
+
+
+def _summaries(samples: np.ndarray) -> np.ndarray:
+    """Mean and percentiles along the trial axis: (..., trials) -> (..., 4)."""
+    pcts = np.percentile(samples, PERCENTILES, axis=-1)
+    return np.concatenate([samples.mean(axis=-1)[None], pcts]).transpose(
+        tuple(range(1, samples.ndim)) + (0,)
+    )
+
+
+def _range(row: np.ndarray) -> Dict[str, float]:
+    return {"mean": float(row[0]), "p50": float(row[1]), "p80": float(row[2]), "p95": float(row[3])}
+
+
+def simulate_batch(
+    inputs: Sequence[SimulationInput],
+    trials: int = 100_000,
+    seed: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """
+    Simulate many estimates in one array pass.
+
+    Returns, per input: ``total_cost`` and ``timeline_weeks`` ranges and a
+    ``cost_breakdown`` range per category, each with mean, p50, p80 and p95.
+    Estimates are processed in chunks to bound memory.
+    """
+    if not inputs:
+        return []
+
+    rng = np.random.default_rng(seed)
+    cholesky = np.linalg.cholesky(correlation_matrix())
+    dims = cholesky.shape[0]
+    chunk = max(1, SIMULATION_CHUNK_ELEMENTS // (trials * dims))
+
+    results: List[Dict[str, Any]] = []
+    for start in range(0, len(inputs), chunk):
+        batch = inputs[start:start + chunk]
+        medians = np.stack([item.medians for item in batch])[:, :, None]
+        sigmas = np.stack([item.sigmas for item in batch])[:, :, None]
+
+        # (batch, dims, trials) correlated standard normals
+        normals = cholesky @ rng.standard_normal((len(batch), dims, trials))
+        samples = medians * np.exp(sigmas * normals)
+
+        component_stats = _summaries(samples)
+        total_stats = _summaries(samples[:, :-1, :].sum(axis=1))
+
+        for i in range(len(batch)):
+            results.append({
+                "total_cost": _range(total_stats[i]),
+                "cost_breakdown": {c: _range(component_stats[i, j]) for j, c in enumerate(COMPONENTS)},
+                "timeline_weeks": _range(component_stats[i, -1]),
+            })
+    return results
+
+
+def simulate(inputs: SimulationInput, trials: int = 100_000, seed: Optional[int] = None) -> Dict[str, Any]:
+    """Simulate a single estimate."""
+    return simulate_batch([inputs], trials=trials, seed=seed)[0]
@@ -0,0 +1,115 @@
+"""
+Keyset pagination utilities for efOfX Estimation Service.
+
+List endpoints page by position in an indexed sort order instead of by
+offset: each page ends with an opaque cursor holding the sort key values
+of its last item, and the next page starts strictly after them. Every
+page therefore costs one bounded index range scan, however deep it is.
+
+All list endpoints return the same envelope::
+
+    {"items": [...], "next_cursor": "<token>" | None, "has_more": bool}
+"""
+
+import base64
+import binascii
+import json
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from bson import json_util
+from bson.errors import BSONError
+
+SortSpec = Sequence[Tuple[str, int]]
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a continuation token cannot be decoded."""
+
+
+def encode_cursor(values: Dict[str, Any]) -> str:
+    """Opaque, URL-safe token for a position in a sort order."""
+    return base64.urlsafe_b64encode(json_util.dumps(values).encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str, sort: SortSpec) -> Dict[str, Any]:
+    """Position encoded by ``token``; it must name every field of ``sort``."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        values = json_util.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (binascii.Error, ValueError, TypeError, UnicodeError, json.JSONDecodeError, BSONError) as e:
+        raise InvalidCursorError("Invalid pagination cursor") from e
+    if not isinstance(values, dict) or any(field not in values for field, _ in sort):
+        raise InvalidCursorError("Invalid pagination cursor")
+    return values
+
+
+def _get(document: Dict[str, Any], path: str) -> Any:
+    value: Any = document
+    for part in path.split("."):
+        value = value.get(part) if isinstance(value, dict) else None
+    return value
+
+
+def after_filter(sort: SortSpec, position: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Filter matching documents strictly after ``position`` in ``sort`` order.
+
+    For keys (a, b, c) this is ``a > x or (a == x and b > y) or
+    (a == x and b == y and c > z)``, with ``<`` for descending keys. The
+    leading key is also bounded outside the ``$or`` so the index scan
+    starts at the position rather than at the start of the range.
+    """
+    clauses = []
+    for i, (field, direction) in enumerate(sort):
+        clause = {prefix: position[prefix] for prefix, _ in sort[:i]}
+        clause[field] = {"$gt" if direction > 0 else "$lt": position[field]}
+        clauses.append(clause)
+    if len(clauses) == 1:
+        return clauses[0]
+    first, direction = sort[0]
+    return {first: {"$gte" if direction > 0 else "$lte": position[first]}, "$or": clauses}
+
+
+def with_string_id(document: Dict[str, Any]) -> Dict[str, Any]:
+    """Listing item with ``_id`` replaced by its string form under ``id``."""
+    document = dict(document)
+    return {"id": str(document.pop("_id")), **document}
+
+
+async def paginate(
+    collection,
+    query: Dict[str, Any],
+    sort: SortSpec,
+    limit: int,
+    cursor: Optional[str] = None,
+    projection: Optional[Dict[str, Any]] = None,
+    transform: Optional[Callable[[Dict[str, Any]], Any]] = None
+) -> Dict[str, Any]:
+    """
+    One page of ``collection`` in ``sort`` order, as the list envelope.
+
+    ``sort`` must end with a unique field (normally ``_id``) and should be
+    served by an index on the query's equality fields followed by the sort
+    keys. Sort fields are always projected so the next cursor can be built.
+    """
+    if cursor:
+        after = after_filter(sort, decode_cursor(cursor, sort))
+        query = {"$and": [query, after]} if set(query) & set(after) else {**query, **after}
+    if projection is not None:
+        projection = {**projection, **{field: 1 for field, _ in sort}}
+
+    documents: List[Dict[str, Any]] = await collection.find(query, projection).sort(list(sort)).limit(
+        limit + 1
+    ).to_list(length=limit + 1)
+
+    has_more = len(documents) > limit
+    documents = documents[:limit]
+    next_cursor = None
+    if has_more:
+        next_cursor = encode_cursor({field: _get(documents[-1], field) for field, _ in sort})
+
+    return {
+        "items": [transform(d) for d in documents] if transform else documents,
+        "next_cursor": next_cursor,
+        "has_more": has_more,
+    }
@@ -0,0 +1,257 @@
+"""
+Vectorized statistics for efOfX Estimation Service.
+
+This module loads reference-project fields into contiguous NumPy arrays
+once and computes weighted means, percentiles, MAD-based outlier masks and
+bootstrap intervals for one or many (reference class, region) groups at a
+time.
+"""
+
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+DEFAULT_PERCENTILES = (50.0, 80.0, 95.0)
+
+# Upper bound on resampled elements held in memory at once by bootstrap_interval
+BOOTSTRAP_CHUNK_ELEMENTS = 1 << 22
+
+
+class ProjectArrays:
+    """Column-oriented float64 view of a list of project documents."""
+
+    def __init__(
+        self,
+        columns: Dict[str, np.ndarray],
+        group_codes: Optional[np.ndarray] = None,
+        group_keys: Optional[List[Tuple[Hashable, ...]]] = None
+    ):
+        self.columns = columns
+        self.group_codes = group_codes
+        self.group_keys = group_keys or []
+
+    @classmethod
+    def from_projects(
+        cls,
+        projects: Sequence[Dict[str, Any]],
+        fields: Iterable[str],
+        group_by: Optional[Sequence[str]] = None,
+        defaults: Optional[Dict[str, float]] = None
+    ) -> "ProjectArrays":
+        """
+        Extract ``fields`` from project dicts.
+
+        Dotted names read one level into a nested dict, e.g.
+        ``cost_breakdown.materials``. Missing values take ``defaults[field]``
+        or 0.0. An empty ``group_by`` puts every project in one group.
+        """
+        defaults = defaults or {}
+        count = len(projects)
+        columns = {}
+        for field in fields:
+            default = defaults.get(field, 0.0)
+            if "." in field:
+                outer, inner = field.split(".", 1)
+                values = ((p.get(outer) or {}).get(inner, default) for p in projects)
+            else:
+                values = (p.get(field, default) for p in projects)
+            columns[field] = np.fromiter(values, dtype=np.float64, count=count)
+
+        group_codes = None
+        group_keys: List[Tuple[Hashable, ...]] = []
+        if group_by is not None:
+            code_of: Dict[Tuple[Hashable, ...], int] = {}
+            group_codes = np.fromiter(
+                (code_of.setdefault(tuple(p.get(g) for g in group_by), len(code_of)) for p in projects),
+                dtype=np.intp,
+                count=count
+            )
+            group_keys = list(code_of)
+
+        return cls(columns, group_codes, group_keys)
+
+    def __len__(self) -> int:
+        return len(next(iter(self.columns.values()))) if self.columns else 0
+
+    def __getitem__(self, field: str) -> np.ndarray:
+        return self.columns[field]
+
+
+def weighted_mean(values: np.ndarray, weights: Optional[np.ndarray] = None) -> float:
+    """Mean of ``values``, weighted when ``weights`` is given; 0.0 when empty."""
+    if values.size == 0:
+        return 0.0
+    if weights is None:
+        return float(values.mean())
+    total = weights.sum()
+    return float((values * weights).sum() / total) if total else float(values.mean())
+
+
+def percentiles(values: np.ndarray, qs: Sequence[float] = DEFAULT_PERCENTILES) -> np.ndarray:
+    """Linear-interpolated percentiles; zeros when empty."""
+    if values.size == 0:
+        return np.zeros(len(qs))
+    return np.percentile(values, qs)
+
+
+def mad_outlier_mask(values: np.ndarray, threshold: float = 3.5) -> np.ndarray:
+    """
+    Boolean mask of inliers by modified z-score (Iglewicz and Hoaglin).
+
+    Values with ``|0.6745 * (x - median) / MAD| > threshold`` are outliers.
+    When MAD is zero every value is treated as an inlier.
+    """
+    if values.size == 0:
+        return np.ones(0, dtype=bool)
+    median = np.median(values)
+    mad = np.median(np.abs(values - median))
+    if mad == 0:
+        return np.ones(values.shape, dtype=bool)
+    return np.abs(0.6745 * (values - median) / mad) <= threshold
+
+
+def bootstrap_interval(
+    values: np.ndarray,
+    statistic: str = "mean",
+    n_resamples: int = 1000,
+    confidence: float = 0.90,
+    seed: Optional[int] = None
+) -> Tuple[float, float]:
+    """
+    Percentile bootstrap confidence interval for the mean or median.
+
+    Resamples are drawn in chunks so memory stays bounded for large inputs.
+    """
+    if values.size == 0:
+        return 0.0, 0.0
+    if statistic not in ("mean", "median"):
+        raise ValueError(f"Unsupported bootstrap statistic: {statistic}")
+
+    rng = np.random.default_rng(seed)
+    reduce = np.mean if statistic == "mean" else np.median
+    chunk = max(1, min(n_resamples, BOOTSTRAP_CHUNK_ELEMENTS // values.size))
+
+    estimates = np.empty(n_resamples)
+    for start in range(0, n_resamples, chunk):
+        size = min(chunk, n_resamples - start)
+        sample = values[rng.integers(0, values.size, size=(size, values.size))]
+        estimates[start:start + size] = reduce(sample, axis=1)
+
+    alpha = (1.0 - confidence) / 2
+    low, high = np.quantile(estimates, [alpha, 1.0 - alpha])
+    return float(low), float(high)
+
+
+def grouped_mean(
+    values: np.ndarray,
+    codes: np.ndarray,
+    n_groups: int,
+    weights: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """Per-group (weighted) mean; NaN for empty groups."""
+    if weights is None:
+        weights = np.ones_like(values)
+    totals = np.bincount(codes, weights=values * weights, minlength=n_groups)
+    weight_sums = np.bincount(codes, weights=weights, minlength=n_groups)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return totals / weight_sums
+
+
+def grouped_percentiles(
+    values: np.ndarray,
+    codes: np.ndarray,
+    n_groups: int,
+    qs: Sequence[float] = DEFAULT_PERCENTILES
+) -> np.ndarray:
+    """
+    Per-group linear-interpolated percentiles as an (n_groups, len(qs)) array.
+
+    One lexsort orders values within groups; every group's percentiles are
+    then gathered at once. Empty groups yield NaN.
+    """
+    result = np.full((n_groups, len(qs)), np.nan)
+    if values.size == 0:
+        return result
+
+    ordered = values[np.lexsort((values, codes))]
+    counts = np.bincount(codes, minlength=n_groups)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    present = counts > 0
+
+    positions = starts[present, None] + (counts[present, None] - 1) * (np.asarray(qs) / 100.0)
+    lower = np.floor(positions).astype(np.intp)
+    upper = np.ceil(positions).astype(np.intp)
+    weight = positions - lower
+    result[present] = ordered[lower] * (1 - weight) + ordered[upper] * weight
+    return result
+
+
+def grouped_mad_inlier_mask(
+    values: np.ndarray,
+    codes: np.ndarray,
+    n_groups: int,
+    threshold: float = 3.5
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Per-group counterpart of mad_outlier_mask.
+
+    Returns the inlier mask over ``values`` together with each group's
+    median and MAD (NaN for empty groups).
+    """
+    medians = grouped_percentiles(values, codes, n_groups, (50.0,))[:, 0]
+    deviations = np.abs(values - medians[codes])
+    mads = grouped_percentiles(deviations, codes, n_groups, (50.0,))[:, 0]
+
+    row_mads = mads[codes]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        inliers = (row_mads == 0) | (np.abs(0.6745 * deviations / row_mads) <= threshold)
+    return inliers, medians, mads
+
+
+def _distribution(mean: float, pcts: np.ndarray) -> Dict[str, float]:
+    return {"mean": float(mean), "p50": float(pcts[0]), "p80": float(pcts[1]), "p95": float(pcts[2])}
+
+
+def summarize_project_groups(
+    projects: Sequence[Dict[str, Any]],
+    group_by: Sequence[str] = ("reference_class", "region")
+) -> Dict[Tuple[Hashable, ...], Dict[str, Any]]:
+    """
+    Summary statistics for every group of projects in one vectorized pass.
+
+    Returns, per group key: count, mean/P50/P80/P95 of total_cost,
+    timeline_weeks and team_size, mean cost breakdown and mean quality.
+    """
+    categories = sorted({c for p in projects for c in (p.get("cost_breakdown") or {})})
+    arrays = ProjectArrays.from_projects(
+        projects,
+        ["total_cost", "timeline_weeks", "team_size", "quality_score"]
+        + [f"cost_breakdown.{c}" for c in categories],
+        group_by=group_by,
+        defaults={"quality_score": 0.5}
+    )
+    n_groups = len(arrays.group_keys)
+    codes = arrays.group_codes
+    counts = np.bincount(codes, minlength=n_groups) if n_groups else np.zeros(0, dtype=np.intp)
+
+    distributions = {}
+    for field in ("total_cost", "timeline_weeks", "team_size"):
+        distributions[field] = (
+            grouped_mean(arrays[field], codes, n_groups),
+            grouped_percentiles(arrays[field], codes, n_groups)
+        )
+    quality = grouped_mean(arrays["quality_score"], codes, n_groups)
+    breakdown = {c: grouped_mean(arrays[f"cost_breakdown.{c}"], codes, n_groups) for c in categories}
+
+    summaries = {}
+    for code, key in enumerate(arrays.group_keys):
+        summaries[key] = {
+            "count": int(counts[code]),
+            **{
+                field: _distribution(means[code], pcts[code])
+                for field, (means, pcts) in distributions.items()
+            },
+            "cost_breakdown_mean": {c: float(means[code]) for c, means in breakdown.items()},
+            "quality_score_mean": float(quality[code]),
+        }
+    return summaries
@@ -0,0 +1,98 @@
+"""
+Text similarity utilities for efOfX Estimation Service.
+
+This module provides a small BM25 index built with NumPy, used to rank
+reference classes against a free-text project description locally.
+"""
+
+import re
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+STOPWORDS = frozenset({
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "i",
+    "in", "into", "is", "it", "my", "of", "on", "or", "our", "that", "the",
+    "this", "to", "we", "with", "want", "would", "like", "need",
+})
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase, split on non-alphanumerics, drop stopwords and plural 's'."""
+    tokens = []
+    for token in _TOKEN_PATTERN.findall(text.lower()):
+        if token in STOPWORDS:
+            continue
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+class BM25Index:
+    """
+    Okapi BM25 over a fixed set of documents.
+
+    Per-term document weights are precomputed into a dense
+    (documents x vocabulary) matrix at build time, so a query is a column
+    gather and a row sum.
+    """
+
+    def __init__(self, documents: Sequence[Iterable[str]], k1: float = 1.2, b: float = 0.75):
+        self.vocabulary: Dict[str, int] = {}
+        rows: List[Dict[int, int]] = []
+        for tokens in documents:
+            counts: Dict[int, int] = {}
+            for token in tokens:
+                index = self.vocabulary.setdefault(token, len(self.vocabulary))
+                counts[index] = counts.get(index, 0) + 1
+            rows.append(counts)
+
+        term_freq = np.zeros((len(rows), max(len(self.vocabulary), 1)), dtype=np.float32)
+        for row, counts in enumerate(rows):
+            if counts:
+                term_freq[row, list(counts.keys())] = list(counts.values())
+
+        doc_len = term_freq.sum(axis=1)
+        avg_len = doc_len.mean() if len(rows) else 0.0
+        doc_freq = (term_freq > 0).sum(axis=0)
+        idf = np.log1p((len(rows) - doc_freq + 0.5) / (doc_freq + 0.5))
+
+        norm = k1 * (1 - b + b * doc_len / avg_len) if avg_len else np.full(len(rows), k1)
+        self.weights = (idf * term_freq * (k1 + 1) / (term_freq + norm[:, None])).astype(np.float32)
+
+    def __len__(self) -> int:
+        return self.weights.shape[0]
+
+    def scores(self, query_tokens: Iterable[str]) -> np.ndarray:
+        """BM25 score of every document for the query."""
+        columns = [self.vocabulary[token] for token in query_tokens if token in self.vocabulary]
+        if not columns or not len(self):
+            return np.zeros(len(self), dtype=np.float32)
+        return self.weights[:, columns].sum(axis=1)
+
+    def search(self, query_tokens: Iterable[str], k: int) -> List[Tuple[int, float]]:
+        """Return up to ``k`` (document index, score) pairs with a positive score."""
+        scores = self.scores(query_tokens)
+        k = min(k, len(scores))
+        if k == 0:
+            return []
+
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(int(i), float(scores[i])) for i in top if scores[i] > 0]
+
+
+def margin_confidence(scores: Sequence[float]) -> float:
+    """
+    Confidence that the best candidate is correct, in [0, 1].
+
+    Relative margin between the top two scores: 1.0 when only one candidate
+    matches, 0.0 for a tie or no match.
+    """
+    if not scores or scores[0] <= 0:
+        return 0.0
+    runner_up = scores[1] if len(scores) > 1 else 0.0
+    return (scores[0] - runner_up) / scores[0]
@@ -0,0 +1,7 @@
+"""
+Benchmarks for efOfX Estimation Service.
+
+Usage:
+    python -m benchmarks.stats_bench --sizes 1000,100000,1000000
+    python -m benchmarks.estimation_writes --estimates 200
+"""
@@ -0,0 +1,109 @@
+"""
+Writes per completed estimate.
+
+Runs the real start -> worker -> get flow against in-process fakes (a
+counting in-memory Mongo stand-in and the in-memory job backend, with the
+LLM stubbed out) and reports database round trips per completed estimate
+for the estimates collection and the job queue.
+
+Usage:
+    python -m benchmarks.estimation_writes --estimates 200 --concurrency 4
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from collections import Counter
+from typing import Any, Dict
+
+from benchmarks.fakes import configure_environment, install_fake_database
+
+configure_environment()
+
+from app.core.constants import DB_COLLECTIONS, EstimationStatus  # noqa: E402
+from app.models.estimation import EstimationRequest  # noqa: E402
+from app.models.tenant import Tenant  # noqa: E402
+from app.services.job_queue import InMemoryJobBackend, job_queue  # noqa: E402
+from app.services.llm_service import LLMService  # noqa: E402
+
+JOB_WRITE_METHODS = {"enqueue", "claim", "heartbeat", "complete", "retry", "fail", "release"}
+
+
+class CountingJobBackend(InMemoryJobBackend):
+    """In-memory backend that counts calls; each maps to one Mongo round trip."""
+
+    def __init__(self):
+        super().__init__()
+        self.calls: Counter = Counter()
+
+    def __getattribute__(self, name):
+        attribute = super().__getattribute__(name)
+        if name in JOB_WRITE_METHODS or name in ("get", "ready_tenants", "depth"):
+            super().__getattribute__("calls")[name] += 1
+        return attribute
+
+
+async def _fake_llm(self, prompt: str, system_message=None) -> str:
+    return "residential_pool"
+
+
+async def run(estimates: int, concurrency: int) -> Dict[str, Any]:
+    from app.services.estimation_service import ESTIMATION_JOB, EstimationService, run_estimation_job
+
+    database = install_fake_database()
+    LLMService.generate_response = _fake_llm
+    backend = CountingJobBackend()
+    job_queue.backend = backend
+    job_queue.concurrency = concurrency
+    job_queue.poll_interval = 0.01
+    job_queue.register(ESTIMATION_JOB, run_estimation_job)
+
+    service = EstimationService()
+    tenant = Tenant(name="Bench Construction", api_key="sk_bench")
+    request = EstimationRequest(
+        description="Install a 15x30 foot pool with spa in the backyard",
+        region="SoCal - Coastal"
+    )
+
+    started = time.perf_counter()
+    job_queue.start()
+    session_ids = [(await service.start_estimation(request, tenant)).session_id for _ in range(estimates)]
+
+    estimates_collection = database[DB_COLLECTIONS["ESTIMATES"]]
+    while sum(d["status"] == EstimationStatus.COMPLETED for d in estimates_collection.documents) < estimates:
+        await asyncio.sleep(0.01)
+    await job_queue.stop()
+
+    for session_id in session_ids:
+        await service.get_estimation(session_id, tenant)
+    elapsed = time.perf_counter() - started
+
+    job_writes = sum(count for method, count in backend.calls.items() if method in JOB_WRITE_METHODS)
+    return {
+        "estimates": estimates,
+        "elapsed_s": round(elapsed, 3),
+        "estimates_writes_per_estimate": estimates_collection.writes / estimates,
+        "estimates_round_trips_per_estimate": estimates_collection.round_trips / estimates,
+        "estimates_calls": dict(estimates_collection.calls),
+        "job_writes_per_estimate": job_writes / estimates,
+        "job_calls": dict(backend.calls),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Count database writes per completed estimate")
+    parser.add_argument("--estimates", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args.estimates, args.concurrency))
+    print(json.dumps(result, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+"""
+In-process fakes for benchmarks.
+
+``configure_environment`` must run before anything under ``app`` is
+imported, since settings are read at import time.
+"""
+
+import os
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+WRITE_METHODS = {
+    "insert_one", "insert_many", "update_one", "update_many", "replace_one",
+    "find_one_and_update", "delete_one", "delete_many", "bulk_write",
+}
+
+
+def configure_environment() -> None:
+    """Provide the settings the service requires, without overriding real ones."""
+    for name, value in {
+        "SECRET_KEY": "bench",
+        "JWT_SECRET_KEY": "bench",
+        "ENCRYPTION_KEY": "bench",
+        "MONGO_URI": "mongodb://localhost:1",
+        "OPENAI_API_KEY": "sk-bench",
+        "JOB_QUEUE_BACKEND": "memory",
+        "LOOP_MONITOR_ENABLED": "false",
+    }.items():
+        os.environ.setdefault(name, value)
+
+
+def _get(document: Dict[str, Any], path: str) -> Any:
+    value: Any = document
+    for part in path.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+def _matches_condition(value: Any, condition: Any) -> bool:
+    if not (isinstance(condition, dict) and condition and all(k.startswith("$") for k in condition)):
+        return value == condition
+    for op, operand in condition.items():
+        if op == "$in" and value not in operand:
+            return False
+        if op == "$nin" and value in operand:
+            return False
+        if op == "$ne" and value == operand:
+            return False
+        if op == "$not" and _matches_condition(value, operand):
+            return False
+        if op in ("$lt", "$lte", "$gt", "$gte"):
+            if value is None:
+                return False
+            if op == "$lt" and not value < operand:
+                return False
+            if op == "$lte" and not value <= operand:
+                return False
+            if op == "$gt" and not value > operand:
+                return False
+            if op == "$gte" and not value >= operand:
+                return False
+    return True
+
+
+def matches(document: Dict[str, Any], query: Dict[str, Any]) -> bool:
+    """Evaluate the subset of the MongoDB query language the services use."""
+    return all(_matches_condition(_get(document, field), condition) for field, condition in query.items())
+
+
+def apply_update(document: Dict[str, Any], update: Dict[str, Any]) -> None:
+    """Apply $set, $inc and $push updates in place."""
+    for field, value in update.get("$set", {}).items():
+        document[field] = value
+    for field, amount in update.get("$inc", {}).items():
+        document[field] = (document.get(field) or 0) + amount
+    for field, value in update.get("$push", {}).items():
+        document.setdefault(field, []).append(value)
+
+
+def upserted(query: Dict[str, Any], update: Dict[str, Any]) -> Dict[str, Any]:
+    """New document for an upsert: the query's equality fields with the update applied."""
+    document = {
+        field: value for field, value in query.items()
+        if not (isinstance(value, dict) and any(k.startswith("$") for k in value))
+    }
+    apply_update(document, update)
+    return document
+
+
+class FakeCursor:
+    def __init__(self, documents: List[Dict[str, Any]]):
+        self.documents = documents
+
+    def sort(self, keys, direction=None):
+        if isinstance(keys, str):
+            keys = [(keys, direction or 1)]
+        for field, order in reversed(keys):
+            self.documents.sort(key=lambda d: _get(d, field), reverse=order < 0)
+        return self
+
+    def skip(self, count: int):
+        self.documents = self.documents[count:]
+        return self
+
+    def limit(self, count: int):
+        if count:
+            self.documents = self.documents[:count]
+        return self
+
+    async def to_list(self, length: Optional[int] = None):
+        return list(self.documents if length is None else self.documents[:length])
+
+    def __aiter__(self):
+        async def iterate():
+            for document in self.documents:
+                yield document
+        return iterate()
+
+
+class FakeCollection:
+    """Dict-backed collection that counts calls per method."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.documents: List[Dict[str, Any]] = []
+        self.calls: Counter = Counter()
+
+    @property
+    def writes(self) -> int:
+        return sum(count for method, count in self.calls.items() if method in WRITE_METHODS)
+
+    @property
+    def round_trips(self) -> int:
+        return sum(self.calls.values())
+
+    def with_options(self, **kwargs):
+        return self
+
+    async def create_index(self, keys, unique=False):
+        return "_".join(f"{field}_{direction}" for field, direction in keys)
+
+    async def insert_one(self, document):
+        self.calls["insert_one"] += 1
+        self.documents.append(dict(document))
+
+    async def find_one(self, query=None, projection=None, sort=None):
+        self.calls["find_one"] += 1
+        found = [d for d in self.documents if matches(d, query or {})]
+        if sort:
+            found = FakeCursor(found).sort(sort).documents
+        return dict(found[0]) if found else None
+
+    def find(self, query=None, projection=None):
+        self.calls["find"] += 1
+        return FakeCursor([dict(d) for d in self.documents if matches(d, query or {})])
+
+    async def find_one_and_update(self, query, update, projection=None, sort=None,
+                                  return_document=False, upsert=False):
+        self.calls["find_one_and_update"] += 1
+        found = [d for d in self.documents if matches(d, query)]
+        if sort:
+            found = FakeCursor(found).sort(sort).documents
+        if not found:
+            if not upsert:
+                return None
+            document = upserted(query, update)
+            self.documents.append(document)
+            return dict(document) if return_document else None
+        document = found[0]
+        before = dict(document)
+        apply_update(document, update)
+        return dict(document) if return_document else before
+
+    async def update_one(self, query, update, upsert=False):
+        self.calls["update_one"] += 1
+        for document in self.documents:
+            if matches(document, query):
+                apply_update(document, update)
+                break
+        else:
+            if upsert:
+                self.documents.append(upserted(query, update))
+
+    async def update_many(self, query, update, upsert=False):
+        self.calls["update_many"] += 1
+        for document in self.documents:
+            if matches(document, query):
+                apply_update(document, update)
+
+    async def delete_one(self, query):
+        self.calls["delete_one"] += 1
+        for index, document in enumerate(self.documents):
+            if matches(document, query):
+                del self.documents[index]
+                break
+
+
+class FakeDatabase:
+    """Maps collection names to FakeCollections, created on first use."""
+
+    def __init__(self):
+        self.collections: Dict[str, FakeCollection] = {}
+
+    def __getitem__(self, name: str) -> FakeCollection:
+        return self.collections.setdefault(name, FakeCollection(name))
+
+
+def install_fake_database() -> FakeDatabase:
+    """Route every collection getter in app.db.mongodb to a FakeDatabase."""
+    from app.db import mongodb
+
+    database = FakeDatabase()
+    mongodb._database = database
+    return database
@@ -0,0 +1,159 @@
+"""
+Reference aggregation benchmark: pure-Python loops versus NumPy.
+
+Generates synthetic reference projects spread over (class, region) groups
+and times the per-group summary both ways. Array loading is reported
+separately from the vectorized computation, since the loaded arrays can be
+reused across statistics.
+
+Usage:
+    python -m benchmarks.stats_bench --sizes 1000,100000,1000000 --groups 40
+"""
+
+import argparse
+import json
+import math
+import random
+import time
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from app.utils.statistics import (
+    ProjectArrays,
+    grouped_mean,
+    grouped_percentiles,
+    summarize_project_groups,
+)
+
+FIELDS = ["total_cost", "timeline_weeks", "team_size", "quality_score"]
+CATEGORIES = ["materials", "labor", "equipment", "permits", "contingency"]
+QS = (50.0, 80.0, 95.0)
+
+
+def make_projects(count: int, groups: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """Synthetic projects with lognormal costs, spread evenly over groups."""
+    rng = random.Random(seed)
+    projects = []
+    for i in range(count):
+        group = i % groups
+        cost = rng.lognormvariate(10.8, 0.35)
+        projects.append({
+            "project_id": f"bench_{i}",
+            "reference_class": f"class_{group // 4}",
+            "region": f"region_{group % 4}",
+            "total_cost": cost,
+            "timeline_weeks": rng.uniform(4, 20),
+            "team_size": rng.randint(2, 10),
+            "cost_breakdown": {c: cost * 0.2 for c in CATEGORIES},
+            "quality_score": rng.uniform(0.5, 1.0),
+        })
+    return projects
+
+
+def _python_percentile(ordered: Sequence[float], q: float) -> float:
+    position = (len(ordered) - 1) * q / 100.0
+    lower = math.floor(position)
+    upper = math.ceil(position)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def python_summary(projects: List[Dict[str, Any]]) -> Dict[Tuple[str, str], Dict[str, Any]]:
+    """Per-group summary with dict grouping, generator sums and sorted()."""
+    groups: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+    for p in projects:
+        groups.setdefault((p["reference_class"], p["region"]), []).append(p)
+
+    summaries = {}
+    for key, members in groups.items():
+        count = len(members)
+        summary: Dict[str, Any] = {"count": count}
+        for field in ("total_cost", "timeline_weeks", "team_size"):
+            ordered = sorted(p[field] for p in members)
+            summary[field] = {
+                "mean": sum(ordered) / count,
+                **{f"p{int(q)}": _python_percentile(ordered, q) for q in QS},
+            }
+        summary["cost_breakdown_mean"] = {
+            c: sum(p["cost_breakdown"].get(c, 0.0) for p in members) / count for c in CATEGORIES
+        }
+        summary["quality_score_mean"] = sum(p["quality_score"] for p in members) / count
+        summaries[key] = summary
+    return summaries
+
+
+def _best_of(func: Callable[[], Any], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def run_size(count: int, groups: int, repeat: int) -> Dict[str, float]:
+    """Time every variant for one input size; returns milliseconds."""
+    projects = make_projects(count, groups)
+    fields = FIELDS + [f"cost_breakdown.{c}" for c in CATEGORIES]
+    arrays = ProjectArrays.from_projects(projects, fields, group_by=("reference_class", "region"))
+    n_groups = len(arrays.group_keys)
+
+    def compute() -> None:
+        for field in ("total_cost", "timeline_weeks", "team_size"):
+            grouped_mean(arrays[field], arrays.group_codes, n_groups)
+            grouped_percentiles(arrays[field], arrays.group_codes, n_groups, QS)
+        for field in ["quality_score"] + [f"cost_breakdown.{c}" for c in CATEGORIES]:
+            grouped_mean(arrays[field], arrays.group_codes, n_groups)
+
+    # Sanity check: both paths agree before timing
+    expected = python_summary(projects)
+    actual = summarize_project_groups(projects)
+    for key, summary in expected.items():
+        assert np.isclose(actual[key]["total_cost"]["p95"], summary["total_cost"]["p95"])
+
+    python_s = _best_of(lambda: python_summary(projects), repeat)
+    load_s = _best_of(
+        lambda: ProjectArrays.from_projects(projects, fields, group_by=("reference_class", "region")),
+        repeat
+    )
+    compute_s = _best_of(compute, repeat)
+    end_to_end_s = _best_of(lambda: summarize_project_groups(projects), repeat)
+
+    return {
+        "projects": count,
+        "groups": n_groups,
+        "python_ms": round(python_s * 1000, 3),
+        "numpy_load_ms": round(load_s * 1000, 3),
+        "numpy_compute_ms": round(compute_s * 1000, 3),
+        "numpy_total_ms": round(end_to_end_s * 1000, 3),
+        "compute_speedup": round(python_s / compute_s, 1) if compute_s else 0.0,
+        "total_speedup": round(python_s / end_to_end_s, 1) if end_to_end_s else 0.0,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark reference aggregation")
+    parser.add_argument("--sizes", default="1000,100000,1000000", help="Comma-separated project counts")
+    parser.add_argument("--groups", type=int, default=40, help="Number of (class, region) groups")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per variant; best is reported")
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    results = []
+    for size in (int(s) for s in args.sizes.split(",")):
+        result = run_size(size, args.groups, args.repeat)
+        results.append(result)
+        print(
+            f"{result['projects']:>9} projects  python {result['python_ms']:>10.1f} ms  "
+            f"load {result['numpy_load_ms']:>9.1f} ms  compute {result['numpy_compute_ms']:>8.1f} ms  "
+            f"total {result['numpy_total_ms']:>9.1f} ms  ({result['total_speedup']}x end-to-end, "
+            f"{result['compute_speedup']}x compute)"
+        )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+BM25 text index search latency.
+
+Builds a synthetic catalog of overlapping keyword documents and reports the
+per-query search time, best of several runs.
+
+Usage:
+    python -m benchmarks.text_index_bench --documents 500 --queries 100
+"""
+
+import argparse
+import json
+import time
+from typing import Dict, List
+
+from app.utils.text_index import BM25Index, tokenize
+
+QUERY = "term10 term11 shared unknown"
+
+
+def make_documents(count: int) -> List[List[str]]:
+    """Documents that share one common term and overlap with their neighbours."""
+    return [[f"term{i}", f"term{i + 1}", "shared"] * 3 for i in range(count)]
+
+
+def run(documents: int, queries: int, repeat: int, k: int) -> Dict[str, float]:
+    """Time ``queries`` searches per run; returns microseconds per query."""
+    index = BM25Index(make_documents(documents))
+    query = tokenize(QUERY)
+    index.search(query, k)
+
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(queries):
+            index.search(query, k)
+        best = min(best, time.perf_counter() - started)
+
+    return {
+        "documents": documents,
+        "k": k,
+        "search_us": round(best * 1e6 / queries, 2),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark BM25 text index search")
+    parser.add_argument("--documents", type=int, default=500, help="Catalog size")
+    parser.add_argument("--queries", type=int, default=100, help="Searches per run")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs; best is reported")
+    parser.add_argument("--k", type=int, default=5, help="Results per search")
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    result = run(args.documents, args.queries, args.repeat, args.k)
+    print(f"{result['documents']:>7} documents  top-{result['k']}  {result['search_us']:>9.2f} us/search")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
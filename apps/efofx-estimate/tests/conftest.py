@@ -6,13 +6,97 @@ This module provides shared fixtures and configuration for all tests.
 
 import pytest
 import asyncio
-from typing import AsyncGenerator
+import operator
+from typing import Any, AsyncGenerator, Dict, List, Optional
 from fastapi.testclient import TestClient
 from motor.motor_asyncio import AsyncIOMotorClient
 
 from app.core.config import settings
 from app.db.mongodb import connect_to_mongo, close_mongo_connection
 
+_COMPARISONS = {"$lt": operator.lt, "$lte": operator.le, "$gt": operator.gt, "$gte": operator.ge, "$ne": operator.ne}
+
+
+def matches(document: Dict[str, Any], query: Dict[str, Any]) -> bool:
+    """Whether ``document`` satisfies a MongoDB filter (equality, comparisons, $ne, $and, $or)."""
+    for field, condition in query.items():
+        if field == "$and":
+            if not all(matches(document, clause) for clause in condition):
+                return False
+        elif field == "$or":
+            if not any(matches(document, clause) for clause in condition):
+                return False
+        elif isinstance(condition, dict) and all(op in _COMPARISONS for op in condition):
+            value = document.get(field)
+            if not all(_COMPARISONS[op](value, operand) for op, operand in condition.items()):
+                return False
+        elif document.get(field) != condition:
+            return False
+    return True
+
+
+def project(document: Dict[str, Any], projection: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Apply an inclusion or exclusion projection to a copy of ``document``."""
+    if not projection:
+        return dict(document)
+    included = {field for field, flag in projection.items() if flag}
+    if included:
+        if projection.get("_id", 1):
+            included.add("_id")
+        return {k: v for k, v in document.items() if k in included}
+    return {k: v for k, v in document.items() if k not in projection}
+
+
+class FakeCursor:
+    """In-memory stand-in for a Motor cursor."""
+
+    def __init__(self, documents: List[Dict[str, Any]], projection: Optional[Dict[str, Any]] = None, delay: float = 0.0):
+        self.documents = list(documents)
+        self.projection = projection
+        self.delay = delay
+
+    def sort(self, key, direction: int = 1) -> "FakeCursor":
+        keys = key if isinstance(key, list) else [(key, direction)]
+        for field, field_direction in reversed(keys):
+            self.documents.sort(key=lambda d: d[field], reverse=field_direction < 0)
+        return self
+
+    def limit(self, count: int) -> "FakeCursor":
+        self.documents = self.documents[:count]
+        return self
+
+    async def to_list(self, length: Optional[int] = None) -> List[Dict[str, Any]]:
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        documents = self.documents if length is None else self.documents[:length]
+        return [project(d, self.projection) for d in documents]
+
+    def __aiter__(self):
+        async def iterate():
+            for document in self.documents:
+                yield project(document, self.projection)
+        return iterate()
+
+
+class FakeCollection:
+    """
+    In-memory stand-in for a Motor collection's reads.
+
+    ``find`` filters ``documents`` with :func:`matches` and records each
+    query; ``delay`` makes every cursor's ``to_list`` yield to the loop
+    for that long first. Subclass to add the writes a test needs.
+    """
+
+    def __init__(self, documents: Optional[List[Dict[str, Any]]] = None, delay: float = 0.0):
+        self.documents = documents if documents is not None else []
+        self.delay = delay
+        self.queries: List[Dict[str, Any]] = []
+
+    def find(self, query: Optional[Dict[str, Any]] = None, projection: Optional[Dict[str, Any]] = None) -> FakeCursor:
+        query = query or {}
+        self.queries.append(query)
+        return FakeCursor([d for d in self.documents if matches(d, query)], projection, self.delay)
+
 
 @pytest.fixture(scope="session")
 def event_loop():
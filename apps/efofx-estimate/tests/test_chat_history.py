@@ -0,0 +1,184 @@
+"""Tests for chat message storage, history pagination, prompt context and streaming."""
+
+import asyncio
+
+from app.models.chat import ChatRequest
+from app.models.tenant import Tenant
+from app.services import chat_context as context_module
+from app.services import chat_service as chat_module
+from app.services.chat_service import ChatService
+from tests.conftest import FakeCollection
+
+
+class FakeLLM:
+    chunks = ["Tell me ", "more about ", "the pool."]
+    closed = False
+
+    async def generate_response(self, prompt, system_message=None, max_tokens=None):
+        return "".join(self.chunks)
+
+    async def stream_response(self, prompt, system_message=None, max_tokens=None):
+        try:
+            for chunk in self.chunks:
+                yield chunk
+        finally:
+            FakeLLM.closed = True
+
+
+class FakeSessions:
+    def __init__(self):
+        self.documents = {}
+        self.updates = []
+
+    async def insert_one(self, document):
+        self.documents[document["session_id"]] = dict(document)
+
+    async def find_one(self, query, projection=None):
+        document = self.documents.get(query["session_id"])
+        if document and document["tenant_id"] == query.get("tenant_id", document["tenant_id"]):
+            return dict(document)
+        return None
+
+    async def find_one_and_update(self, query, update, projection=None, return_document=None):
+        self.updates.append(update)
+        document = self.documents.get(query["session_id"])
+        if document is None:
+            return None
+        for field, amount in update["$inc"].items():
+            document[field] = document.get(field, 0) + amount
+        for field, push in update["$push"].items():
+            document[field] = (document.get(field, []) + push["$each"])[push["$slice"]:]
+        for field, value in update["$set"].items():
+            if field.startswith("context."):
+                document["context"][field.split(".", 1)[1]] = value
+            else:
+                document[field] = value
+        return dict(document)
+
+
+class FakeMessages(FakeCollection):
+    insert_calls = 0
+
+    async def insert_many(self, documents, ordered=True):
+        self.insert_calls += 1
+        self.documents.extend(dict(d) for d in documents)
+
+
+def make_service(monkeypatch):
+    sessions, messages = FakeSessions(), FakeMessages()
+    monkeypatch.setattr(chat_module, "LLMService", FakeLLM)
+    monkeypatch.setattr(chat_module, "get_chat_sessions_collection", lambda: sessions)
+    monkeypatch.setattr(chat_module, "get_chat_messages_collection", lambda: messages)
+    monkeypatch.setattr(context_module, "get_chat_sessions_collection", lambda: sessions)
+    monkeypatch.setattr(context_module, "get_chat_messages_collection", lambda: messages)
+    return ChatService(), sessions, messages
+
+
+def test_turns_are_stored_with_bounded_session_writes(monkeypatch):
+    monkeypatch.setitem(chat_module.ESTIMATION_CONFIG, "MAX_CHAT_MESSAGES", 4)
+    service, sessions, messages = make_service(monkeypatch)
+    tenant = Tenant(name="Test Construction Co", api_key="sk_test_123456789")
+
+    session_id = asyncio.run(service.send_message(ChatRequest(message="I want a pool"), tenant)).session_id
+    for i in range(4):
+        asyncio.run(service.send_message(ChatRequest(message=f"Turn {i}", session_id=session_id), tenant))
+
+    document = sessions.documents[session_id]
+    assert document["message_count"] == 10
+    assert len(document["messages"]) == 4
+    assert document["context"]["project_type"] == "residential_pool"
+    assert messages.insert_calls == 5
+    assert [d["seq"] for d in messages.documents] == list(range(1, 11))
+    # Each turn sets only the changed fields, never the full context or message list
+    assert all("context" not in update["$set"] and "messages" not in update["$set"] for update in sessions.updates)
+
+
+def test_history_pages_backwards_from_newest(monkeypatch):
+    service, sessions, messages = make_service(monkeypatch)
+    tenant = Tenant(name="Test Construction Co", api_key="sk_test_123456789")
+
+    session_id = asyncio.run(service.send_message(ChatRequest(message="I want a pool"), tenant)).session_id
+    for i in range(2):
+        asyncio.run(service.send_message(ChatRequest(message=f"Turn {i}", session_id=session_id), tenant))
+
+    page = asyncio.run(service.get_chat_history(session_id, tenant, limit=4))
+    assert [m["seq"] for m in page["messages"]] == [3, 4, 5, 6]
+    assert page["messages"][1]["content"] == "Tell me more about the pool."
+    assert page["next_before_seq"] == 3
+
+    page = asyncio.run(service.get_chat_history(session_id, tenant, before_seq=3, limit=4))
+    assert [m["seq"] for m in page["messages"]] == [1, 2]
+    assert page["messages"][0]["content"] == "I want a pool"
+    assert page["next_before_seq"] is None
+
+
+class UpdateResult:
+    def __init__(self, modified_count):
+        self.modified_count = modified_count
+
+
+class SummarizingSessions(FakeSessions):
+    async def update_one(self, query, update):
+        document = self.documents[query["session_id"]]
+        if document.get("summarized_seq") != query["summarized_seq"]:
+            return UpdateResult(0)
+        document.update(update["$set"])
+        return UpdateResult(1)
+
+
+def test_prompt_context_is_bounded_by_summary_and_budget(monkeypatch):
+    service, _, messages = make_service(monkeypatch)
+    sessions = SummarizingSessions()
+    monkeypatch.setattr(context_module, "get_chat_sessions_collection", lambda: sessions)
+    service.sessions_collection = sessions
+    tenant = Tenant(name="Test Construction Co", api_key="sk_test_123456789")
+    manager = context_module.ChatContextManager(token_budget=50, recent_messages=4, summary_trigger=6)
+
+    session_id = asyncio.run(service.send_message(ChatRequest(message="I want a pool"), tenant)).session_id
+    for i in range(5):
+        asyncio.run(service.send_message(ChatRequest(message=f"Turn {i}", session_id=session_id), tenant))
+
+    session = chat_module.ChatSession(**sessions.documents[session_id])
+    assert manager.needs_summary(session)
+    assert asyncio.run(manager.summarize(session_id, FakeLLM()))
+    assert sessions.documents[session_id]["summarized_seq"] == 8
+
+    session = chat_module.ChatSession(**sessions.documents[session_id])
+    context = asyncio.run(manager.build(session))
+    assert context.summary == "Tell me more about the pool."
+    assert context.facts == {"project_type": "residential_pool"}
+    # Four recent messages are candidates; only the newest ones fitting the budget remain
+    assert [m["seq"] for m in context.messages] == [11, 12]
+    assert context.tokens <= 50
+
+
+def test_stream_emits_tokens_then_stores_the_turn(monkeypatch):
+    service, sessions, messages = make_service(monkeypatch)
+    tenant = Tenant(name="Test Construction Co", api_key="sk_test_123456789")
+
+    async def collect():
+        return [event async for event in service.stream_message(ChatRequest(message="I want a pool"), tenant)]
+
+    events = asyncio.run(collect())
+    assert [e["event"] for e in events] == ["start", "token", "token", "token", "done"]
+    assert "".join(e["data"]["content"] for e in events if e["event"] == "token") == "Tell me more about the pool."
+    assert events[-1]["data"]["content"] == "Tell me more about the pool."
+    assert [d["role"] for d in messages.documents] == ["user", "assistant"]
+
+
+def test_stream_closed_early_stores_nothing(monkeypatch):
+    service, sessions, messages = make_service(monkeypatch)
+    tenant = Tenant(name="Test Construction Co", api_key="sk_test_123456789")
+    FakeLLM.closed = False
+
+    async def disconnect_after_first_token():
+        events = service.stream_message(ChatRequest(message="I want a pool"), tenant)
+        async for event in events:
+            if event["event"] == "token":
+                break
+        await events.aclose()
+        # Closed by aclose itself, not later by event loop shutdown
+        return FakeLLM.closed
+
+    assert asyncio.run(disconnect_after_first_token())
+    assert messages.documents == []
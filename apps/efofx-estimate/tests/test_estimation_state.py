@@ -0,0 +1,102 @@
+"""Tests for the estimation session state machine."""
+
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+
+from app.core.constants import EstimationStatus
+from app.services.estimation_state import EstimationStateMachine, StaleTransitionError
+
+NOW = datetime(2024, 6, 1, 12, 0)
+
+
+class FakeEstimates:
+    """Single-document collection honouring the filters the state machine issues."""
+
+    def __init__(self, document):
+        self.document = document
+        self.calls = 0
+
+    def with_options(self, **kwargs):
+        return self
+
+    def _matches(self, query):
+        document = self.document
+        if document["session_id"] != query["session_id"]:
+            return False
+        status = query["status"]
+        if isinstance(status, dict):
+            if document["status"] not in status["$in"]:
+                return False
+        elif document["status"] != status:
+            return False
+        if "expires_at" in query and document["expires_at"] <= query["expires_at"]["$not"]["$lte"]:
+            return False
+        if "version" in query:
+            version = query["version"]
+            allowed = version["$in"] if isinstance(version, dict) else [version]
+            if document.get("version") not in allowed:
+                return False
+        return True
+
+    async def find_one_and_update(self, query, update, projection=None, return_document=None):
+        self.calls += 1
+        if not self._matches(query):
+            return None
+        self.document.update(update["$set"])
+        self.document["version"] = self.document.get("version", 0) + update["$inc"]["version"]
+        return dict(self.document)
+
+
+def make_document(status=EstimationStatus.INITIATED, expires_at=NOW + timedelta(hours=1)):
+    return {
+        "tenant_id": ObjectId(),
+        "session_id": "sess_test",
+        "status": status,
+        "description": "Install a backyard pool with spa",
+        "region": "SoCal - Coastal",
+        "created_at": NOW,
+        "updated_at": NOW,
+        "expires_at": expires_at,
+    }
+
+
+def test_claim_then_complete_in_two_writes():
+    estimates = FakeEstimates(make_document())
+    state = EstimationStateMachine(estimates)
+
+    session = asyncio.run(state.claim("sess_test", NOW))
+    assert session.status == EstimationStatus.IN_PROGRESS
+    assert session.version == 1
+
+    asyncio.run(state.transition(session, EstimationStatus.COMPLETED, {"completed_at": NOW}))
+    assert estimates.document["status"] == EstimationStatus.COMPLETED
+    assert estimates.document["version"] == 2
+    assert session.version == 2
+    assert estimates.calls == 2
+
+
+def test_claim_skips_expired_and_finished_sessions():
+    expired = FakeEstimates(make_document(expires_at=NOW - timedelta(minutes=1)))
+    finished = FakeEstimates(make_document(status=EstimationStatus.COMPLETED))
+
+    assert asyncio.run(EstimationStateMachine(expired).claim("sess_test", NOW)) is None
+    assert asyncio.run(EstimationStateMachine(finished).claim("sess_test", NOW)) is None
+
+
+def test_stale_transition_is_rejected():
+    estimates = FakeEstimates(make_document())
+    state = EstimationStateMachine(estimates)
+    session = asyncio.run(state.claim("sess_test", NOW))
+
+    # Another worker (e.g. a retry after a lost lease) takes the session over
+    estimates.document["version"] += 1
+
+    with pytest.raises(StaleTransitionError):
+        asyncio.run(state.transition(session, EstimationStatus.COMPLETED, {"completed_at": NOW}))
+    assert estimates.document["status"] == EstimationStatus.IN_PROGRESS
+
+    with pytest.raises(ValueError):
+        asyncio.run(state.transition(session, EstimationStatus.INITIATED))
@@ -0,0 +1,69 @@
+"""Tests for weekly feedback rollups."""
+
+import asyncio
+from datetime import datetime
+
+from bson import ObjectId
+
+from app.models.feedback import FeedbackCreate
+from app.models.tenant import Tenant
+from app.services import feedback_rollups as rollups_module
+from app.services import feedback_service as feedback_module
+from app.services.feedback_rollups import iso_week_start, rollup_update
+from app.services.feedback_service import FeedbackService
+from tests.conftest import FakeCollection, matches
+
+
+def test_rollup_update_keys_by_iso_week():
+    tenant_id = ObjectId()
+    query, update = rollup_update({
+        "tenant_id": tenant_id, "feedback_type": "accuracy", "rating": 4,
+        "cost_accuracy": 0.9, "timeline_accuracy": None, "created_at": datetime(2024, 6, 2, 18, 30),
+    })
+
+    # 2024-06-02 is a Sunday; its ISO week starts on Monday 2024-05-27
+    assert query == {"tenant_id": tenant_id, "week_start": datetime(2024, 5, 27), "feedback_type": "accuracy"}
+    assert update["$inc"] == {"count": 1, "rating_sum": 4, "cost_accuracy_sum": 0.9, "cost_accuracy_count": 1}
+    assert update["$setOnInsert"] == {"week": "2024-W22"}
+    assert iso_week_start(datetime(2024, 5, 27)) == datetime(2024, 5, 27)
+
+
+class FakeRollups(FakeCollection):
+    async def update_one(self, query, update, upsert=False):
+        document = next((d for d in self.documents if matches(d, query)), None)
+        if document is None:
+            document = {**query, **update["$setOnInsert"]}
+            self.documents.append(document)
+        for field, amount in update["$inc"].items():
+            document[field] = document.get(field, 0) + amount
+
+
+class FakeFeedback:
+    async def insert_one(self, document):
+        class Result:
+            inserted_id = document["_id"]
+        return Result()
+
+
+def test_analytics_read_rollups_maintained_on_submit(monkeypatch):
+    rollups = FakeRollups()
+    monkeypatch.setattr(feedback_module, "get_feedback_collection", lambda: FakeFeedback())
+    monkeypatch.setattr(rollups_module, "get_feedback_collection", lambda: FakeFeedback())
+    monkeypatch.setattr(rollups_module, "get_feedback_rollups_collection", lambda: rollups)
+    service = FeedbackService()
+    tenant = Tenant(name="Test Construction Co", api_key="sk_test_123456789")
+
+    for feedback_type, rating, accuracy in [("accuracy", 4, 0.9), ("accuracy", 2, 0.7), ("cost", 5, None)]:
+        feedback = FeedbackCreate(
+            estimation_session_id="sess_1", feedback_type=feedback_type, rating=rating, cost_accuracy=accuracy
+        )
+        asyncio.run(service.submit_feedback(feedback, tenant))
+
+    analytics = asyncio.run(service.get_feedback_analytics(tenant, days=7))
+
+    week = rollups_module.iso_week_label(datetime.utcnow())
+    assert analytics["total_feedback"] == 3
+    assert analytics["average_rating"] == 11 / 3
+    assert analytics["feedback_distribution"] == {"accuracy": 2, "cost": 1}
+    assert abs(analytics["accuracy_trends"]["cost_accuracy"][week] - 0.8) < 1e-9
+    assert analytics["accuracy_trends"]["timeline_accuracy"] == {}
@@ -0,0 +1,81 @@
+"""Tests for the aggregated feedback summary."""
+
+import asyncio
+from datetime import datetime
+
+from bson import ObjectId
+
+from app.db.indexes import QueryShape
+from app.models.tenant import Tenant
+from app.services import feedback_rollups as rollups_module
+from app.services import feedback_service as feedback_module
+from app.services.feedback_service import FeedbackService, feedback_summary_pipeline
+from tests.conftest import FakeCollection, FakeCursor
+
+
+class FakeFeedback(FakeCollection):
+    def __init__(self, result):
+        super().__init__()
+        self.result = result
+        self.pipelines = []
+
+    def aggregate(self, pipeline):
+        self.pipelines.append(pipeline)
+        return FakeCursor(self.result)
+
+
+def make_service(monkeypatch, result):
+    collection = FakeFeedback(result)
+    monkeypatch.setattr(feedback_module, "get_feedback_collection", lambda: collection)
+    monkeypatch.setattr(rollups_module, "get_feedback_collection", lambda: collection)
+    monkeypatch.setattr(rollups_module, "get_feedback_rollups_collection", lambda: None)
+    return FeedbackService(), collection
+
+
+def test_pipeline_reads_newest_first_from_tenant_index():
+    tenant_id = ObjectId()
+    pipeline = feedback_summary_pipeline(tenant_id)
+
+    assert pipeline[0] == {"$match": {"tenant_id": tenant_id}}
+    assert pipeline[1] == {"$sort": {"created_at": -1}}
+    assert set(pipeline[2]["$facet"]) == {"totals", "by_type", "recent"}
+
+    shape = QueryShape("summary", "feedback", {"tenant_id": tenant_id}, sort=[("created_at", -1)])
+    assert shape.index_keys == (("tenant_id", 1), ("created_at", -1))
+
+
+def test_summary_is_built_from_facets(monkeypatch):
+    tenant = Tenant(name="Test Construction Co", api_key="sk_test_123456789")
+    recent = {
+        "_id": ObjectId(), "tenant_id": tenant.id, "estimation_session_id": "sess_1",
+        "feedback_type": "accuracy", "rating": 5, "created_at": datetime(2024, 6, 1),
+    }
+    service, collection = make_service(monkeypatch, [{
+        "totals": [{
+            "_id": None, "total_feedback": 3, "average_rating": 4.0,
+            "cost_accuracy_avg": 0.9, "timeline_accuracy_avg": None, "reference_class_accuracy_avg": 0.8,
+        }],
+        "by_type": [{"_id": "accuracy", "count": 2}, {"_id": "cost", "count": 1}],
+        "recent": [recent],
+    }])
+
+    summary = asyncio.run(service.get_feedback_summary(tenant))
+
+    assert summary.total_feedback == 3
+    assert summary.average_rating == 4.0
+    assert summary.cost_accuracy_avg == 0.9
+    assert summary.timeline_accuracy_avg is None
+    assert summary.feedback_by_type == {"accuracy": 2, "cost": 1}
+    assert [f.estimation_session_id for f in summary.recent_feedback] == ["sess_1"]
+    assert len(collection.pipelines) == 1
+
+
+def test_summary_for_tenant_without_feedback(monkeypatch):
+    tenant = Tenant(name="Test Construction Co", api_key="sk_test_123456789")
+    service, _ = make_service(monkeypatch, [{"totals": [], "by_type": [], "recent": []}])
+
+    summary = asyncio.run(service.get_feedback_summary(tenant))
+
+    assert summary.total_feedback == 0
+    assert summary.feedback_by_type == {}
+    assert summary.recent_feedback == []
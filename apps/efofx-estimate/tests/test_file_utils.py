@@ -0,0 +1,81 @@
+"""Tests for streaming, content-addressed uploads."""
+
+import asyncio
+import hashlib
+import os
+
+import pytest
+
+from app.core.config import settings
+from app.utils.file_utils import FileTooLargeError, save_uploaded_file
+
+
+class FakeUpload:
+    """UploadFile stand-in recording the size of every read."""
+
+    def __init__(self, content: bytes, content_type: str = "image/jpeg", filename: str = "photo.jpeg"):
+        self.content = content
+        self.content_type = content_type
+        self.filename = filename
+        self.position = 0
+        self.reads = []
+
+    async def read(self, size: int = -1) -> bytes:
+        self.reads.append(size)
+        end = len(self.content) if size < 0 else self.position + size
+        chunk = self.content[self.position:end]
+        self.position += len(chunk)
+        return chunk
+
+
+@pytest.fixture
+def upload_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "UPLOAD_DIR", str(tmp_path))
+    return tmp_path
+
+
+def _stored_files(root):
+    return sorted(
+        os.path.relpath(os.path.join(directory, name), root)
+        for directory, _, names in os.walk(root) for name in names
+    )
+
+
+def test_upload_is_read_in_chunks_and_named_by_content_hash(upload_dir):
+    content = os.urandom(10_000)
+    upload = FakeUpload(content)
+
+    stored = asyncio.run(save_uploaded_file(upload, "tenant1", chunk_size=1024))
+
+    digest = hashlib.sha256(content).hexdigest()
+    assert stored.sha256 == digest
+    assert stored.size == len(content)
+    assert not stored.deduplicated
+    assert stored.url == f"/uploads/tenant1/{digest[:2]}/{digest}.jpg"
+    assert set(upload.reads) == {1024}
+    assert (upload_dir / "tenant1" / digest[:2] / f"{digest}.jpg").read_bytes() == content
+    assert _stored_files(upload_dir) == [f"tenant1/{digest[:2]}/{digest}.jpg"]
+
+
+def test_identical_upload_is_stored_once_per_tenant(upload_dir):
+    content = b"same photo" * 100
+
+    first = asyncio.run(save_uploaded_file(FakeUpload(content), "tenant1"))
+    second = asyncio.run(save_uploaded_file(FakeUpload(content, filename="copy.jpg"), "tenant1"))
+    other = asyncio.run(save_uploaded_file(FakeUpload(content), "tenant2"))
+
+    assert second.url == first.url
+    assert second.deduplicated
+    assert not other.deduplicated
+    assert other.url != first.url
+    assert len(_stored_files(upload_dir)) == 2
+
+
+def test_oversized_upload_is_aborted_without_reading_the_rest(upload_dir):
+    upload = FakeUpload(b"x" * 10_000)
+
+    with pytest.raises(FileTooLargeError):
+        asyncio.run(save_uploaded_file(upload, "tenant1", max_size=4096, chunk_size=1024))
+
+    assert upload.position == 5 * 1024
+    assert _stored_files(upload_dir) == []
@@ -0,0 +1,79 @@
+"""Tests for declarative index management."""
+
+import asyncio
+import os
+import uuid
+
+import pytest
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import MongoClient
+from pymongo.errors import PyMongoError
+
+from app.db.indexes import QueryShape, collect_query_shapes, ensure_indexes, plan_indexes, verify_query_shapes
+
+TEST_MONGO_URI = os.environ.get("TEST_MONGO_URI", "mongodb://localhost:27017")
+
+
+def mongod_available() -> bool:
+    try:
+        MongoClient(TEST_MONGO_URI, serverSelectionTimeoutMS=500).admin.command("ping")
+        return True
+    except PyMongoError:
+        return False
+
+
+def test_index_keys_follow_equality_sort_range():
+    shape = QueryShape(
+        "sample", "projects",
+        {"region": "x", "created_at": {"$gte": 1}, "reference_class": "y"},
+        sort=[("quality_score", -1)]
+    )
+
+    assert shape.index_keys == (
+        ("region", 1), ("reference_class", 1), ("quality_score", -1), ("created_at", 1)
+    )
+
+
+def test_plan_drops_prefix_and_unique_covered_shapes():
+    shapes = [
+        QueryShape("by_tenant", "feedback", {"tenant_id": 1}),
+        QueryShape("by_tenant_type", "feedback", {"tenant_id": 1, "feedback_type": "a"}),
+        QueryShape("by_session", "sessions", {"session_id": "s"}, unique=True),
+        QueryShape("by_session_tenant", "sessions", {"session_id": "s", "tenant_id": 1}),
+    ]
+
+    plan = plan_indexes(shapes)
+
+    assert plan["feedback"] == [((("tenant_id", 1), ("feedback_type", 1)), False)]
+    assert plan["sessions"] == [((("session_id", 1),), True)]
+
+
+def test_plan_merges_shapes_differing_only_in_sort_direction():
+    shapes = [
+        QueryShape("since", "feedback", {"tenant_id": 1, "created_at": {"$gte": 1}}),
+        QueryShape("recent", "feedback", {"tenant_id": 1}, sort=[("created_at", -1)]),
+    ]
+
+    assert plan_indexes(shapes)["feedback"] == [((("tenant_id", 1), ("created_at", 1)), False)]
+
+
+@pytest.mark.skipif(not mongod_available(), reason="local mongod not reachable")
+def test_declared_shapes_use_indexes_on_local_mongod():
+    """Every declared query shape is served by an index after ensure_indexes."""
+
+    async def scenario():
+        client = AsyncIOMotorClient(TEST_MONGO_URI)
+        db = client[f"efofx_index_test_{uuid.uuid4().hex[:8]}"]
+        try:
+            shapes = collect_query_shapes()
+            for collection in {shape.collection for shape in shapes}:
+                await db[collection].insert_one({"_seed": True})
+            await ensure_indexes(db, shapes)
+            # Idempotent on a second run
+            await ensure_indexes(db, shapes)
+            return await verify_query_shapes(db, shapes)
+        finally:
+            await client.drop_database(db.name)
+            client.close()
+
+    assert asyncio.run(scenario()) == []
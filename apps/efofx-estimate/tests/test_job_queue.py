@@ -0,0 +1,131 @@
+"""Tests for the background job queue."""
+
+import asyncio
+
+import pytest
+
+from app.core.constants import JobStatus
+from app.services.job_queue import InMemoryJobBackend, JobBackend, JobQueue
+
+
+class SlowClaimBackend(InMemoryJobBackend):
+    """Counts claims in flight at once."""
+
+    def __init__(self):
+        super().__init__()
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def claim(self, tenant_id, worker_id, lease_seconds):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        return await super().claim(tenant_id, worker_id, lease_seconds)
+
+
+async def drain(queue, timeout=2.0):
+    """Run the workers until no job is queued or running."""
+    queue.start()
+    deadline = asyncio.get_running_loop().time() + timeout
+    while any(j.status in (JobStatus.QUEUED, JobStatus.RUNNING) for j in queue.backend.jobs.values()):
+        assert asyncio.get_running_loop().time() < deadline
+        await asyncio.sleep(0.01)
+    await queue.stop()
+
+
+def test_jobs_are_scheduled_round_robin_across_tenants():
+    processed = []
+
+    async def handler(job, report_progress):
+        processed.append(job.tenant_id)
+        await report_progress(0.5)
+
+    async def scenario():
+        queue = JobQueue(InMemoryJobBackend(), concurrency=1, poll_interval=0.01)
+        queue.register("estimation", handler)
+        for _ in range(3):
+            await queue.enqueue("estimation", "tenant_a", {})
+        await queue.enqueue("estimation", "tenant_b", {})
+        await queue.enqueue("estimation", "tenant_c", {})
+        await drain(queue)
+        return queue
+
+    queue = asyncio.run(scenario())
+
+    assert processed[:3] == ["tenant_a", "tenant_b", "tenant_c"]
+    assert processed.count("tenant_a") == 3
+    assert all(j.status == JobStatus.SUCCEEDED and j.progress == 1.0 for j in queue.backend.jobs.values())
+
+
+def test_failed_jobs_are_retried_then_failed():
+    calls = {"flaky": 0, "broken": 0}
+
+    async def handler(job, report_progress):
+        calls[job.payload["name"]] += 1
+        if job.payload["name"] == "broken" or calls["flaky"] == 1:
+            raise RuntimeError("LLM unavailable")
+
+    async def scenario():
+        queue = JobQueue(InMemoryJobBackend(), concurrency=2, max_attempts=3,
+                         retry_backoff_seconds=0.0, poll_interval=0.01)
+        queue.register("estimation", handler)
+        await queue.enqueue("estimation", "tenant_a", {"name": "flaky"}, job_id="flaky")
+        await queue.enqueue("estimation", "tenant_a", {"name": "broken"}, job_id="broken")
+        # Same ID again is a no-op
+        await queue.enqueue("estimation", "tenant_a", {"name": "flaky"}, job_id="flaky")
+        await drain(queue)
+        return queue
+
+    queue = asyncio.run(scenario())
+    jobs = queue.backend.jobs
+
+    assert calls == {"flaky": 2, "broken": 3}
+    assert jobs["flaky"].status == JobStatus.SUCCEEDED and jobs["flaky"].attempts == 2
+    assert jobs["broken"].status == JobStatus.FAILED and jobs["broken"].error == "LLM unavailable"
+
+
+def test_stopping_returns_running_job_to_queue():
+    async def scenario():
+        running = asyncio.Event()
+
+        async def handler(job, report_progress):
+            running.set()
+            await asyncio.sleep(10)
+
+        queue = JobQueue(InMemoryJobBackend(), concurrency=1, poll_interval=0.01)
+        queue.register("estimation", handler)
+        job = await queue.enqueue("estimation", "tenant_a", {})
+        queue.start()
+        await asyncio.wait_for(running.wait(), 1.0)
+        await queue.stop()
+        return await queue.get(job.id)
+
+    job = asyncio.run(scenario())
+
+    assert job.status == JobStatus.QUEUED
+    assert job.attempts == 0
+
+
+def test_claims_by_different_workers_run_concurrently():
+    async def scenario():
+        backend = SlowClaimBackend()
+        queue = JobQueue(backend, concurrency=2, poll_interval=0.01)
+        for tenant_id in ("tenant_a", "tenant_b"):
+            await queue.enqueue("estimation", tenant_id, {})
+        claims = await asyncio.gather(queue._claim_next("w1"), queue._claim_next("w2"))
+        return backend, claims
+
+    backend, claims = asyncio.run(scenario())
+
+    assert backend.max_in_flight == 2
+    assert sorted(job.tenant_id for job in claims) == ["tenant_a", "tenant_b"]
+
+
+def test_incomplete_backend_fails_at_construction():
+    class PartialBackend(JobBackend):
+        async def enqueue(self, job):
+            return True
+
+    with pytest.raises(TypeError):
+        PartialBackend()
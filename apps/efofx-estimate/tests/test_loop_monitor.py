@@ -0,0 +1,48 @@
+"""Tests for the event loop lag monitor."""
+
+import asyncio
+import logging
+import time
+
+from app.observability.loop_monitor import EventLoopMonitor
+from app.observability.metrics import event_loop_metrics
+
+
+def test_blocking_call_is_detected_and_stack_captured(caplog):
+    """A synchronous sleep on the loop is counted and its stack logged."""
+
+    def blocking_call():
+        time.sleep(0.3)
+
+    async def scenario():
+        monitor = EventLoopMonitor(interval=0.02, block_threshold=0.1)
+        monitor.start()
+        await asyncio.sleep(0.05)
+        blocking_call()
+        await asyncio.sleep(0.05)
+        await monitor.stop()
+
+    before = event_loop_metrics.blocked_total._value.get()
+    with caplog.at_level(logging.WARNING, logger="app.observability.loop_monitor"):
+        asyncio.run(scenario())
+
+    assert event_loop_metrics.blocked_total._value.get() == before + 1
+    assert any("blocking_call" in record.getMessage() for record in caplog.records)
+
+
+def test_stack_capture_is_rate_limited(caplog):
+    """Only one stack is captured within the minimum capture interval."""
+
+    async def scenario():
+        monitor = EventLoopMonitor(interval=0.02, block_threshold=0.05, stack_min_interval=60)
+        monitor.start()
+        for _ in range(2):
+            await asyncio.sleep(0.05)
+            time.sleep(0.15)
+        await asyncio.sleep(0.05)
+        await monitor.stop()
+
+    with caplog.at_level(logging.WARNING, logger="app.observability.loop_monitor"):
+        asyncio.run(scenario())
+
+    assert len([r for r in caplog.records if "Event loop blocked" in r.getMessage()]) == 1
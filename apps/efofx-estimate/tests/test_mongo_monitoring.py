@@ -0,0 +1,92 @@
+"""Tests for MongoDB driver options and monitoring listeners."""
+
+import logging
+from types import SimpleNamespace
+
+from prometheus_client import REGISTRY
+
+from app.core.config import settings
+from app.db.mongodb import client_options
+from app.db.monitoring import CommandMetricsListener, PoolMetricsListener, command_collection
+
+ADDRESS = ("db.example", 27017)
+
+
+def _sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def _command_events(name, command, request_id, duration_micros):
+    started = SimpleNamespace(
+        command_name=name, command=command, database_name="efofx_estimate",
+        request_id=request_id, connection_id=ADDRESS
+    )
+    finished = SimpleNamespace(
+        command_name=name, duration_micros=duration_micros, request_id=request_id, connection_id=ADDRESS
+    )
+    return started, finished
+
+
+def test_command_collection():
+    assert command_collection("find", {"find": "estimates", "filter": {}}) == "estimates"
+    assert command_collection("getMore", {"getMore": 12345, "collection": "estimates"}) == "estimates"
+    assert command_collection("ping", {"ping": 1}) == ""
+
+
+def test_commands_are_timed_per_collection_and_slow_ones_logged(caplog):
+    listener = CommandMetricsListener(slow_command_ms=50)
+    labels = {"collection": "tenant_usage", "command": "update", "status": "succeeded"}
+    before = _sample("mongo_command_duration_seconds_count", **labels)
+
+    fast_start, fast_done = _command_events("update", {"update": "tenant_usage"}, 1, 2_000)
+    slow_start, slow_done = _command_events("update", {"update": "tenant_usage"}, 2, 80_000)
+    with caplog.at_level(logging.WARNING, logger="app.db.monitoring"):
+        listener.started(fast_start)
+        listener.started(slow_start)
+        listener.succeeded(slow_done)
+        listener.succeeded(fast_done)
+
+    assert _sample("mongo_command_duration_seconds_count", **labels) == before + 2
+    assert [r.getMessage() for r in caplog.records] == [
+        "Slow MongoDB command update on efofx_estimate.tenant_usage: 80.0ms (succeeded)"
+    ]
+    assert listener._in_flight == {}
+
+
+def test_pool_checkouts_record_wait_and_checked_out_connections():
+    listener = PoolMetricsListener()
+    event = SimpleNamespace(address=ADDRESS)
+    address = "db.example:27017"
+    checkouts = _sample("mongo_pool_checkouts_total", address=address, result="ok")
+    timeouts = _sample("mongo_pool_checkouts_total", address=address, result="timeout")
+    waits = _sample("mongo_pool_wait_seconds_count", address=address)
+
+    listener.connection_created(event)
+    listener.connection_check_out_started(event)
+    listener.connection_checked_out(event)
+    assert _sample("mongo_pool_checked_out", address=address) == 1
+
+    listener.connection_check_out_started(event)
+    listener.connection_check_out_failed(SimpleNamespace(address=ADDRESS, reason="timeout"))
+    listener.connection_checked_in(event)
+
+    assert _sample("mongo_pool_checked_out", address=address) == 0
+    assert _sample("mongo_pool_connections", address=address) == 1
+    assert _sample("mongo_pool_checkouts_total", address=address, result="ok") == checkouts + 1
+    assert _sample("mongo_pool_checkouts_total", address=address, result="timeout") == timeouts + 1
+    assert _sample("mongo_pool_wait_seconds_count", address=address) == waits + 2
+
+
+def test_client_options_follow_settings(monkeypatch):
+    monkeypatch.setattr(settings, "MONGO_MAX_POOL_SIZE", 25)
+    monkeypatch.setattr(settings, "MONGO_WAIT_QUEUE_TIMEOUT_MS", 2000)
+    monkeypatch.setattr(settings, "MONGO_READ_PREFERENCE", "secondaryPreferred")
+    monkeypatch.setattr(settings, "MONGO_COMMAND_MONITORING", False)
+
+    options = client_options()
+
+    assert options["maxPoolSize"] == 25
+    assert options["waitQueueTimeoutMS"] == 2000
+    assert options["readPreference"] == "secondaryPreferred"
+    assert "maxIdleTimeMS" not in options
+    assert [type(listener) for listener in options["event_listeners"]] == [PoolMetricsListener]
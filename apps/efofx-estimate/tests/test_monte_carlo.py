@@ -0,0 +1,55 @@
+"""Tests for the Monte Carlo cost and timeline simulator."""
+
+import asyncio
+
+import pytest
+
+from app.services.estimation_service import EstimationService
+from app.utils.monte_carlo import COMPONENTS, SimulationInput, fit_log_sigma, simulate, simulate_batch
+
+REFERENCE_STATS = {
+    "count": 12,
+    "total_cost": {"mean": 52000.0, "p50": 50000.0, "p80": 60000.0, "p95": 72000.0},
+    "timeline_weeks": {"mean": 8.2, "p50": 8.0, "p80": 9.5, "p95": 11.0},
+    "team_size": {"mean": 4.0, "p50": 4.0, "p80": 5.0, "p95": 6.0},
+    "cost_breakdown_mean": {"materials": 20800.0, "labor": 13000.0},
+}
+
+
+def test_simulation_reproduces_reference_percentiles():
+    result = simulate(SimulationInput.from_reference_stats(REFERENCE_STATS), trials=50_000, seed=7)
+
+    total = result["total_cost"]
+    assert total["p50"] < total["p80"] < total["p95"]
+    assert total["p50"] == pytest.approx(50000.0, rel=0.05)
+    assert total["p80"] == pytest.approx(60000.0, rel=0.05)
+    assert result["timeline_weeks"]["p50"] == pytest.approx(8.0, rel=0.03)
+    assert set(result["cost_breakdown"]) == set(COMPONENTS)
+    assert result["cost_breakdown"]["materials"]["mean"] == pytest.approx(20800.0, rel=0.05)
+
+
+def test_simulation_is_seeded_and_batches_match_shape():
+    inputs = SimulationInput.from_point_estimate({"materials": 20000.0, "labor": 10000.0}, 6)
+    regional = SimulationInput.from_point_estimate({"materials": 20000.0, "labor": 10000.0}, 6, multiplier=1.25)
+
+    assert simulate(inputs, trials=10_000, seed=3) == simulate(inputs, trials=10_000, seed=3)
+
+    base, scaled = simulate_batch([inputs, regional], trials=20_000, seed=3)
+    assert scaled["total_cost"]["p50"] == pytest.approx(base["total_cost"]["p50"] * 1.25, rel=0.03)
+    assert base["cost_breakdown"]["permits"]["p95"] == 0.0
+
+
+def test_fit_log_sigma_ignores_degenerate_percentiles():
+    assert fit_log_sigma(100.0, 100.0, 100.0) is None
+    assert fit_log_sigma(0.0, 10.0, 20.0) is None
+    assert fit_log_sigma(100.0, 120.0, 140.0) > 0
+
+
+def test_fallback_ranges_bracket_the_regional_point_estimate():
+    service = EstimationService.__new__(EstimationService)
+    result = service._parse_estimation_response("", None, "NorCal - Bay Area")
+    asyncio.run(service._attach_simulation(result, "pool", "NorCal - Bay Area", "residential_pool", None))
+
+    assert result.total_cost == pytest.approx(62500.0)
+    assert result.cost_percentiles.p50 == pytest.approx(result.total_cost, rel=0.1)
+    assert result.cost_percentiles.p95 > result.total_cost
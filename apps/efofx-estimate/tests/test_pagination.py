@@ -0,0 +1,73 @@
+"""Tests for keyset pagination."""
+
+import asyncio
+import base64
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+
+from app.utils.pagination import InvalidCursorError, after_filter, decode_cursor, encode_cursor, paginate
+from tests.conftest import FakeCollection
+
+SORT = [("created_at", -1), ("_id", -1)]
+
+
+def test_pages_walk_every_document_once_in_order():
+    tenant_id = ObjectId()
+    start = datetime(2024, 6, 1)
+    # Pairs of documents share a timestamp, so the _id tie-breaker matters
+    documents = [
+        {"_id": ObjectId(), "tenant_id": tenant_id, "created_at": start + timedelta(minutes=i // 2), "secret": "x"}
+        for i in range(7)
+    ]
+    documents.append({"_id": ObjectId(), "tenant_id": ObjectId(), "created_at": start})
+    collection = FakeCollection(documents)
+
+    async def walk():
+        pages, cursor = [], None
+        while True:
+            page = await paginate(
+                collection, {"tenant_id": tenant_id}, SORT, 3, cursor, projection={"tenant_id": 1}
+            )
+            pages.append(page)
+            if not page["has_more"]:
+                return pages
+            cursor = page["next_cursor"]
+
+    pages = asyncio.run(walk())
+
+    seen = [item["_id"] for page in pages for item in page["items"]]
+    expected = [d["_id"] for d in sorted(documents[:7], key=lambda d: (d["created_at"], d["_id"]), reverse=True)]
+    assert seen == expected
+    assert [len(page["items"]) for page in pages] == [3, 3, 1]
+    assert pages[-1]["next_cursor"] is None
+    assert all("secret" not in item for page in pages for item in page["items"])
+    # Later pages stay bounded by the position instead of skipping
+    assert all(query["created_at"]["$lte"] for query in collection.queries[1:])
+
+
+def test_after_filter_and_cursor_round_trip():
+    position = {"created_at": datetime(2024, 6, 1), "_id": ObjectId()}
+
+    assert decode_cursor(encode_cursor(position), SORT) == position
+    assert after_filter([("_id", 1)], position) == {"_id": {"$gt": position["_id"]}}
+    assert after_filter(SORT, position)["$or"][1] == {
+        "created_at": position["created_at"], "_id": {"$lt": position["_id"]}
+    }
+
+
+def _raw_token(text):
+    return base64.urlsafe_b64encode(text.encode("utf-8")).decode("ascii")
+
+
+@pytest.mark.parametrize("token", [
+    "not base64!",
+    encode_cursor({"created_at": 1}),
+    # Extended JSON the BSON decoder rejects
+    _raw_token('{"created_at": 1, "_id": {"$oid": "zz"}}'),
+    _raw_token('{"created_at": {"$date": []}, "_id": 1}'),
+])
+def test_invalid_cursors_are_rejected(token):
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(token, SORT)
@@ -0,0 +1,70 @@
+"""Tests for the platform statistics snapshot and health probes."""
+
+import asyncio
+
+from fastapi.testclient import TestClient
+
+from app.services import platform_stats as stats_module
+from app.services.platform_stats import PlatformStats
+
+
+class FakeCollection:
+    def __init__(self, size, active=0):
+        self.size = size
+        self.active = active
+        self.calls = []
+
+    async def estimated_document_count(self):
+        self.calls.append("estimated_document_count")
+        return self.size
+
+    async def count_documents(self, query):
+        self.calls.append(("count_documents", query))
+        return self.active
+
+
+def test_snapshot_uses_estimated_counts_and_is_reused(monkeypatch):
+    tenants, estimates, feedback = FakeCollection(5, active=4), FakeCollection(100), FakeCollection(30)
+    monkeypatch.setattr(stats_module, "get_tenants_collection", lambda: tenants)
+    monkeypatch.setattr(stats_module, "get_estimates_collection", lambda: estimates)
+    monkeypatch.setattr(stats_module, "get_feedback_collection", lambda: feedback)
+
+    async def get_database_stats():
+        return {"collections": 3}
+
+    monkeypatch.setattr(stats_module, "get_database_stats", get_database_stats)
+    stats = PlatformStats()
+
+    async def scenario():
+        first = await stats.get_snapshot()
+        second = await stats.get_snapshot()
+        return first, second
+
+    first, second = asyncio.run(scenario())
+
+    assert first is second
+    assert first.tenants == {
+        "total_tenants": 5,
+        "active_tenants": 4,
+        "total_estimations": 100,
+        "total_feedback": 30,
+        "average_estimations_per_tenant": 25.0,
+    }
+    assert first.database == {"collections": 3}
+    # Only the indexed active count is exact; nothing counts a whole collection
+    assert tenants.calls == ["estimated_document_count", ("count_documents", {"is_active": True})]
+    assert estimates.calls == feedback.calls == ["estimated_document_count"]
+
+
+def test_liveness_skips_the_database_and_readiness_reports_it():
+    from app.main import app
+
+    client = TestClient(app)
+
+    health = client.get("/health")
+    ready = client.get("/ready")
+
+    assert health.status_code == 200
+    assert "database" not in health.json()
+    assert ready.status_code == 503
+    assert ready.json()["checks"]["database"] == "disconnected"
@@ -0,0 +1,60 @@
+"""
+Tests for the sampling profiler.
+"""
+
+import asyncio
+import time
+
+from app.observability.profiling import SamplingProfiler, profile_for
+
+
+def _busy_wait(seconds: float) -> None:
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def test_profiler_samples_calling_thread():
+    """Samples should attribute time to the function running on the profiled thread."""
+    profiler = SamplingProfiler(interval=0.001)
+    profiler.start()
+    _busy_wait(0.1)
+    profile = profiler.stop()
+
+    assert profile.sample_count > 10
+    top_label, share = profile.top_functions(1)[0]
+    assert top_label.startswith("_busy_wait@")
+    assert share > 0.5
+
+
+def test_profile_renderers():
+    """Collapsed and speedscope renderings should describe the same samples."""
+    profiler = SamplingProfiler(interval=0.001)
+    profiler.start()
+    _busy_wait(0.05)
+    profile = profiler.stop()
+
+    collapsed = profile.to_collapsed().strip().splitlines()
+    assert sum(int(line.rsplit(" ", 1)[1]) for line in collapsed) == profile.sample_count
+    assert any("_busy_wait" in line for line in collapsed)
+
+    document = profile.to_speedscope(name="test")
+    sampled = document["profiles"][0]
+    assert sampled["type"] == "sampled"
+    assert len(sampled["samples"]) == len(sampled["weights"])
+    frame_names = {frame["name"] for frame in document["shared"]["frames"]}
+    assert "_busy_wait" in frame_names
+
+
+def test_profile_for_samples_the_event_loop():
+    """A timed session should sample the loop while it keeps running."""
+    async def scenario():
+        task = asyncio.create_task(profile_for(0.05, 0.001))
+        await asyncio.sleep(0)
+        _busy_wait(0.03)
+        return await task
+
+    profile = asyncio.run(scenario())
+
+    assert profile.sample_count > 5
+    assert any(label.startswith("_busy_wait@") for label, _ in profile.top_functions(3))
@@ -0,0 +1,78 @@
+"""Tests for GCRA rate limiting."""
+
+import asyncio
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from app.core import security as security_module
+from app.core.rate_limit import InMemoryRateLimitBackend, RateLimiter, gcra
+from app.core.security import get_current_tenant, rate_limit
+from app.models.tenant import Tenant
+
+
+def test_gcra_admits_a_burst_then_the_steady_rate():
+    interval, window = 1.0, 3.0
+    tat = None
+    decisions = []
+    for _ in range(4):
+        allowed, tat = gcra(tat, 100.0, 1, interval, window)
+        decisions.append(allowed)
+
+    assert decisions == [True, True, True, False]
+    # One unit replenishes after one interval
+    assert gcra(tat, 101.0, 1, interval, window)[0]
+    assert not gcra(tat, 101.0, 2, interval, window)[0]
+
+
+def test_limiter_reports_remaining_and_retry_after():
+    limiter = RateLimiter(InMemoryRateLimitBackend(), limit=10, window_seconds=60.0)
+
+    async def scenario():
+        first = await limiter.check("tenant", cost=4)
+        second = await limiter.check("tenant", cost=4)
+        third = await limiter.check("tenant", cost=4)
+        return first, second, third
+
+    first, second, third = asyncio.run(scenario())
+
+    assert (first.allowed, first.remaining) == (True, 6)
+    assert (second.allowed, second.remaining) == (True, 2)
+    assert not third.allowed
+    assert third.retry_after == pytest.approx(12.0, abs=0.1)
+    assert third.headers()["Retry-After"] == "12"
+
+
+def test_memory_backend_prunes_refilled_keys():
+    backend = InMemoryRateLimitBackend(max_keys=10)
+
+    async def scenario():
+        for i in range(25):
+            await backend.update(f"k{i}", float(i), 1, 0.5, 1.0)
+
+    asyncio.run(scenario())
+
+    assert len(backend) <= 10
+
+
+def test_dependency_returns_429_with_headers(monkeypatch):
+    monkeypatch.setattr(security_module, "rate_limiter", RateLimiter(InMemoryRateLimitBackend(), limit=2))
+    monkeypatch.setattr(security_module.settings, "RATE_LIMIT_ENABLED", True)
+
+    app = FastAPI()
+
+    @app.post("/work")
+    async def work(_=Depends(rate_limit("DEFAULT"))):
+        return {"ok": True}
+
+    tenant = Tenant(name="Acme", api_key="sk_acme")
+    app.dependency_overrides[get_current_tenant] = lambda: tenant
+    client = TestClient(app)
+
+    responses = [client.post("/work") for _ in range(3)]
+
+    assert [r.status_code for r in responses] == [200, 200, 429]
+    assert responses[0].headers["RateLimit-Remaining"] == "1"
+    assert responses[0].headers["RateLimit-Policy"] == "2;w=60"
+    assert int(responses[2].headers["Retry-After"]) >= 1
@@ -0,0 +1,82 @@
+"""Tests for the in-memory reference class catalog."""
+
+import asyncio
+
+from app.services import reference_catalog as catalog_module
+from app.services.reference_catalog import ReferenceCatalog
+from tests.conftest import FakeCollection
+
+
+def make_class(name, category="residential", is_active=True):
+    return {
+        "name": name,
+        "category": category,
+        "description": f"{name} projects",
+        "keywords": [name],
+        "is_active": is_active,
+    }
+
+
+def test_concurrent_cold_loads_share_one_query(monkeypatch):
+    """Concurrent first reads trigger a single collection scan."""
+    collection = FakeCollection([
+        make_class("residential_pool"),
+        make_class("office_fitout", category="commercial"),
+        make_class("retired_class", is_active=False),
+    ], delay=0.01)
+    monkeypatch.setattr(catalog_module, "get_reference_classes_collection", lambda: collection)
+
+    async def scenario():
+        catalog = ReferenceCatalog(ttl_seconds=60)
+        return await asyncio.gather(*(catalog.get_snapshot() for _ in range(10)))
+
+    snapshots = asyncio.run(scenario())
+
+    assert len(collection.queries) == 1
+    assert all(snapshot is snapshots[0] for snapshot in snapshots)
+    snapshot = snapshots[0]
+    assert snapshot.names == ["residential_pool", "office_fitout"]
+    assert [rc.name for rc in snapshot.by_category["commercial"]] == ["office_fitout"]
+    assert "retired_class" not in snapshot.by_name
+
+
+def test_forced_refresh_publishes_new_version(monkeypatch):
+    """A write-triggered refresh replaces the snapshot immediately."""
+    collection = FakeCollection([make_class("residential_pool")], delay=0.01)
+    monkeypatch.setattr(catalog_module, "get_reference_classes_collection", lambda: collection)
+
+    async def scenario():
+        catalog = ReferenceCatalog(ttl_seconds=60)
+        first = await catalog.get_snapshot()
+        collection.documents.append(make_class("kitchen_remodel", category="renovation"))
+        await catalog.refresh()
+        return first, await catalog.get_snapshot()
+
+    first, second = asyncio.run(scenario())
+
+    assert second.version == first.version + 1
+    assert "kitchen_remodel" in second.by_name
+    assert "kitchen_remodel" not in first.by_name
+
+
+def test_stale_snapshot_reload_is_tracked_and_cancelled_on_stop(monkeypatch):
+    """Stale reads schedule one tracked reload, which stop() cancels."""
+    collection = FakeCollection([make_class("residential_pool")], delay=0.01)
+    monkeypatch.setattr(catalog_module, "get_reference_classes_collection", lambda: collection)
+
+    async def scenario():
+        catalog = ReferenceCatalog(ttl_seconds=0.001)
+        stale = await catalog.get_snapshot()
+        await asyncio.sleep(0.01)
+        results = await asyncio.gather(*(catalog.get_snapshot() for _ in range(5)))
+        pending = len(catalog._tasks)
+        await asyncio.sleep(0)
+        await catalog.stop()
+        return stale, results, pending, len(catalog._tasks)
+
+    stale, results, pending, remaining = asyncio.run(scenario())
+
+    assert all(snapshot is stale for snapshot in results)
+    assert pending == 1
+    assert remaining == 0
+    assert len(collection.queries) == 2
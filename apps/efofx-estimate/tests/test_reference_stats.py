@@ -0,0 +1,140 @@
+"""Tests for materialized reference statistics."""
+
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from app.services import reference_stats as stats_module
+from app.services.reference_service import ReferenceService
+from app.services.reference_stats import ReferenceStatsService, build_stats_document
+from tests.conftest import FakeCollection, matches
+
+
+def make_project(project_id, total_cost, timeline_weeks=8, team_size=4, quality_score=0.8):
+    return {
+        "project_id": project_id,
+        "reference_class": "residential_pool",
+        "region": "SoCal - Coastal",
+        "total_cost": total_cost,
+        "timeline_weeks": timeline_weeks,
+        "team_size": team_size,
+        "cost_breakdown": {"materials": total_cost * 0.4, "labor": total_cost * 0.6},
+        "quality_score": quality_score,
+        "is_active": True,
+    }
+
+
+def test_stats_document_summarizes_group():
+    projects = [
+        make_project("p1", 40000.0, timeline_weeks=6, quality_score=0.9),
+        make_project("p2", 50000.0, timeline_weeks=8, quality_score=0.5),
+        make_project("p3", 60000.0, timeline_weeks=10, quality_score=0.7),
+    ]
+
+    document = build_stats_document("residential_pool", "SoCal - Coastal", projects)
+
+    assert document["count"] == 3
+    assert document["total_cost"]["mean"] == pytest.approx(50000.0)
+    assert document["total_cost"]["p50"] == pytest.approx(50000.0)
+    assert document["total_cost"]["p80"] == pytest.approx(56000.0)
+    assert document["timeline_weeks"]["p95"] == pytest.approx(9.8)
+    assert document["cost_breakdown_mean"]["materials"] == pytest.approx(20000.0)
+    assert document["top_project_ids"] == ["p1", "p3", "p2"]
+
+
+class FakeStats:
+    def __init__(self):
+        self.documents = {}
+
+    async def replace_one(self, query, document, upsert=False):
+        self.documents[(query["reference_class"], query["region"])] = document
+
+    async def delete_one(self, query):
+        self.documents.pop((query["reference_class"], query["region"]), None)
+
+
+def test_recompute_group_upserts_and_removes_empty_groups(monkeypatch):
+    projects = FakeCollection([
+        make_project("p1", 40000.0),
+        {**make_project("p2", 80000.0), "is_active": False},
+    ])
+    stats = FakeStats()
+    monkeypatch.setattr(stats_module, "get_reference_projects_collection", lambda: projects)
+    monkeypatch.setattr(stats_module, "get_reference_stats_collection", lambda: stats)
+    service = ReferenceStatsService()
+    key = ("residential_pool", "SoCal - Coastal")
+
+    asyncio.run(service.recompute_group(*key))
+    assert stats.documents[key]["count"] == 1
+    assert stats.documents[key]["total_cost"]["mean"] == 40000.0
+
+    projects.documents[0]["is_active"] = False
+    asyncio.run(service.recompute_group(*key))
+    assert key not in stats.documents
+
+
+class FakeRebuildStats(FakeStats):
+    async def bulk_write(self, operations, ordered=True):
+        for operation in operations:
+            await self.replace_one(operation._filter, operation._doc)
+
+    async def delete_many(self, query):
+        cutoff = query["updated_at"]["$lt"]
+        self.documents = {k: v for k, v in self.documents.items() if v["updated_at"] >= cutoff}
+
+
+def test_rebuild_all_summarizes_groups_across_batches(monkeypatch):
+    documents = [
+        {**make_project("p1", 40000.0), "region": "NorCal"},
+        make_project("p2", 50000.0),
+        {**make_project("p3", 70000.0), "region": "NorCal"},
+        make_project("p4", 30000.0),
+    ]
+    projects = FakeCollection(documents)
+    stats = FakeRebuildStats()
+    stats.documents[("retired_class", "NorCal")] = {"updated_at": datetime(2020, 1, 1)}
+    monkeypatch.setattr(stats_module, "get_reference_projects_collection", lambda: projects)
+    monkeypatch.setattr(stats_module, "get_reference_stats_collection", lambda: stats)
+    monkeypatch.setattr(stats_module, "REBUILD_PROJECT_BATCH", 1)
+
+    groups = asyncio.run(ReferenceStatsService().rebuild_all())
+
+    assert groups == 2
+    assert set(stats.documents) == {("residential_pool", "NorCal"), ("residential_pool", "SoCal - Coastal")}
+    assert stats.documents[("residential_pool", "NorCal")]["total_cost"]["mean"] == pytest.approx(55000.0)
+    assert stats.documents[("residential_pool", "SoCal - Coastal")]["top_project_ids"] == ["p2", "p4"]
+
+
+class FakeProjectUpdates(FakeCollection):
+    async def find_one_and_update(self, query, update, projection=None, return_document=None):
+        for document in self.documents:
+            if matches(document, query):
+                previous = dict(document)
+                document.update(update["$set"])
+                return previous
+        return None
+
+
+class RecordingStats:
+    def __init__(self):
+        self.groups = []
+
+    async def recompute_group(self, reference_class, region):
+        self.groups.append((reference_class, region))
+
+
+def test_update_reports_and_recomputes_only_real_changes():
+    service = ReferenceService.__new__(ReferenceService)
+    service.projects_collection = FakeProjectUpdates([make_project("p1", 40000.0)])
+    service.stats_service = RecordingStats()
+
+    async def scenario():
+        return [
+            await service.update_reference_project("p1", {"total_cost": 40000.0}),
+            await service.update_reference_project("p1", {"total_cost": 45000.0}),
+            await service.update_reference_project("missing", {"total_cost": 45000.0}),
+        ]
+
+    assert asyncio.run(scenario()) == [False, True, False]
+    assert service.stats_service.groups == [("residential_pool", "SoCal - Coastal")]
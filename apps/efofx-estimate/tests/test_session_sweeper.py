@@ -0,0 +1,82 @@
+"""Tests for session expiry on read and in the sweeper."""
+
+import asyncio
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+
+from app.core.constants import EstimationStatus
+from app.models.estimation import EstimationSession
+from app.services import session_sweeper as sweeper_module
+from app.services.session_sweeper import SessionSweeper
+
+NOW = datetime(2024, 6, 1, 12, 0)
+
+
+def make_session(status, expires_at):
+    return EstimationSession(
+        tenant_id=ObjectId(),
+        session_id="sess_test",
+        status=status,
+        description="Install a backyard pool with spa",
+        region="SoCal - Coastal",
+        expires_at=expires_at,
+    )
+
+
+def test_current_status_expires_only_pending_sessions():
+    past = NOW - timedelta(minutes=1)
+
+    assert make_session(EstimationStatus.INITIATED, past).current_status(NOW) == EstimationStatus.EXPIRED
+    assert make_session(EstimationStatus.IN_PROGRESS, NOW + timedelta(minutes=5)).current_status(NOW) == (
+        EstimationStatus.IN_PROGRESS
+    )
+    assert make_session(EstimationStatus.COMPLETED, past).current_status(NOW) == EstimationStatus.COMPLETED
+
+
+class UpdateResult:
+    def __init__(self, modified_count):
+        self.modified_count = modified_count
+
+
+class FakeEstimates:
+    def __init__(self, documents):
+        self.documents = documents
+        self.update_calls = 0
+
+    @staticmethod
+    def _matches(document, query):
+        expires = query["expires_at"]
+        return (
+            document["status"] in query["status"]["$in"]
+            and expires.get("$gte", datetime.min) <= document["expires_at"] < expires["$lt"]
+        )
+
+    async def find_one(self, query, projection=None, sort=None):
+        matches = sorted((d for d in self.documents if self._matches(d, query)), key=lambda d: d["expires_at"])
+        return matches[0] if matches else None
+
+    async def update_many(self, query, update):
+        self.update_calls += 1
+        matches = [d for d in self.documents if self._matches(d, query)]
+        for document in matches:
+            document.update(update["$set"])
+        return UpdateResult(len(matches))
+
+
+def test_sweep_expires_pending_sessions_in_windows(monkeypatch):
+    documents = [
+        {"status": "initiated", "expires_at": NOW - timedelta(hours=5)},
+        {"status": "in_progress", "expires_at": NOW - timedelta(hours=2, minutes=30)},
+        {"status": "completed", "expires_at": NOW - timedelta(hours=1)},
+        {"status": "initiated", "expires_at": NOW + timedelta(minutes=10)},
+    ]
+    estimates = FakeEstimates(documents)
+    monkeypatch.setattr(sweeper_module, "get_estimates_collection", lambda: estimates)
+
+    sweeper = SessionSweeper(window_minutes=60, max_batches=2)
+    assert asyncio.run(sweeper.sweep(NOW)) == 1
+    assert asyncio.run(sweeper.sweep(NOW)) == 1
+
+    assert [d["status"] for d in documents] == ["expired", "expired", "completed", "initiated"]
+    assert asyncio.run(sweeper.sweep(NOW)) == 0
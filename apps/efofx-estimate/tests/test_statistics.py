@@ -0,0 +1,67 @@
+"""Tests for the vectorized statistics engine."""
+
+import numpy as np
+import pytest
+
+from app.utils.statistics import (
+    ProjectArrays,
+    bootstrap_interval,
+    grouped_mean,
+    grouped_percentiles,
+    mad_outlier_mask,
+    summarize_project_groups,
+)
+
+
+def test_grouped_statistics_match_per_group_numpy():
+    rng = np.random.default_rng(7)
+    values = rng.lognormal(10.0, 0.5, size=1000)
+    codes = rng.integers(0, 5, size=1000)
+
+    means = grouped_mean(values, codes, 6)
+    pcts = grouped_percentiles(values, codes, 6, (50.0, 80.0, 95.0))
+
+    for code in range(5):
+        group = values[codes == code]
+        assert means[code] == pytest.approx(group.mean())
+        assert pcts[code] == pytest.approx(np.percentile(group, [50.0, 80.0, 95.0]))
+    assert np.isnan(means[5]) and np.isnan(pcts[5]).all()
+
+
+def test_project_arrays_reads_nested_fields_and_groups():
+    projects = [
+        {"reference_class": "pool", "region": "a", "total_cost": 10.0, "cost_breakdown": {"labor": 4.0}},
+        {"reference_class": "pool", "region": "b", "total_cost": 20.0},
+        {"reference_class": "pool", "region": "a", "total_cost": 30.0, "cost_breakdown": {"labor": 8.0}},
+    ]
+
+    arrays = ProjectArrays.from_projects(
+        projects, ["total_cost", "cost_breakdown.labor"], group_by=("reference_class", "region")
+    )
+
+    assert arrays.group_keys == [("pool", "a"), ("pool", "b")]
+    assert arrays.group_codes.tolist() == [0, 1, 0]
+    assert arrays["cost_breakdown.labor"].tolist() == [4.0, 0.0, 8.0]
+
+    summaries = summarize_project_groups(projects)
+    assert summaries[("pool", "a")]["count"] == 2
+    assert summaries[("pool", "a")]["total_cost"]["mean"] == pytest.approx(20.0)
+
+
+def test_mad_outlier_mask_flags_extreme_values():
+    values = np.array([10.0, 11.0, 9.5, 10.5, 10.2, 95.0])
+
+    assert mad_outlier_mask(values).tolist() == [True, True, True, True, True, False]
+    assert mad_outlier_mask(np.full(4, 3.0)).all()
+
+
+def test_bootstrap_interval_is_seeded_and_brackets_mean():
+    values = np.random.default_rng(3).normal(100.0, 10.0, size=200)
+
+    first = bootstrap_interval(values, n_resamples=500, seed=42)
+    second = bootstrap_interval(values, n_resamples=500, seed=42)
+
+    assert first == second
+    assert first[0] < values.mean() < first[1]
+    with pytest.raises(ValueError):
+        bootstrap_interval(values, statistic="mode")
@@ -0,0 +1,103 @@
+"""Tests for the tenant lookup cache."""
+
+import asyncio
+
+from bson import ObjectId
+
+from app.core import tenant_cache as cache_module
+from app.core.tenant_cache import TenantCache
+
+
+class FakeTenants:
+    def __init__(self, documents):
+        self.documents = documents
+        self.queries = 0
+
+    async def find_one(self, query):
+        self.queries += 1
+        for document in self.documents:
+            if all(document.get(k) == v for k, v in query.items()):
+                return dict(document)
+        return None
+
+
+def _tenant(api_key):
+    return {"_id": ObjectId(), "name": "Acme", "api_key": api_key}
+
+
+def test_hot_and_unknown_keys_hit_the_database_once(monkeypatch):
+    document = _tenant("sk_live")
+    tenants = FakeTenants([document])
+    monkeypatch.setattr(cache_module, "get_tenants_collection", lambda: tenants)
+    cache = TenantCache()
+
+    async def scenario():
+        for _ in range(3):
+            assert (await cache.get_by_api_key("sk_live")).id == document["_id"]
+            assert await cache.get_by_api_key("sk_guess") is None
+            assert (await cache.get_by_id(str(document["_id"]))).name == "Acme"
+        assert await cache.get_by_id("not-an-object-id") is None
+
+    asyncio.run(scenario())
+
+    # One query each for the live key, the unknown key and the id; the invalid id never queries
+    assert tenants.queries == 3
+    assert "sk_live" not in "".join(cache._entries)
+
+
+def test_entries_expire_and_are_bounded(monkeypatch):
+    tenants = FakeTenants([_tenant(f"sk_{i}") for i in range(3)])
+    monkeypatch.setattr(cache_module, "get_tenants_collection", lambda: tenants)
+    cache = TenantCache(max_entries=2, ttl_seconds=0)
+
+    async def scenario():
+        for i in range(3):
+            await cache.get_by_api_key(f"sk_{i}")
+        await cache.get_by_api_key("sk_2")
+
+    asyncio.run(scenario())
+
+    assert len(cache) <= 2
+    assert tenants.queries == 4
+
+
+def test_invalidate_drops_key_and_id_entries(monkeypatch):
+    document = _tenant("sk_live")
+    tenants = FakeTenants([document])
+    monkeypatch.setattr(cache_module, "get_tenants_collection", lambda: tenants)
+    cache = TenantCache()
+
+    async def scenario():
+        await cache.get_by_api_key("sk_live")
+        await cache.get_by_id(str(document["_id"]))
+        await cache.get_by_api_key("sk_new")
+        cache.invalidate(str(document["_id"]))
+        cache.invalidate_api_key("sk_new")
+        tenants.documents.append(_tenant("sk_new"))
+        assert (await cache.get_by_api_key("sk_live")) is not None
+        assert (await cache.get_by_id(str(document["_id"]))) is not None
+        assert (await cache.get_by_api_key("sk_new")) is not None
+
+    asyncio.run(scenario())
+
+    assert tenants.queries == 6
+
+
+def test_unknown_keys_do_not_evict_known_tenants(monkeypatch):
+    document = _tenant("sk_live")
+    tenants = FakeTenants([document])
+    monkeypatch.setattr(cache_module, "get_tenants_collection", lambda: tenants)
+    cache = TenantCache(max_entries=2, negative_max_entries=3)
+
+    async def scenario():
+        await cache.get_by_api_key("sk_live")
+        for i in range(10):
+            assert await cache.get_by_api_key(f"sk_guess_{i}") is None
+        assert (await cache.get_by_api_key("sk_live")).id == document["_id"]
+        assert await cache.get_by_api_key("sk_guess_9") is None
+
+    asyncio.run(scenario())
+
+    # The live key and each guess are queried once; only the newest guesses are remembered
+    assert tenants.queries == 11
+    assert len(cache._negative_entries) == 3
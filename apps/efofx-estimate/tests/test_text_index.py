@@ -0,0 +1,68 @@
+"""Tests for the BM25 text index used for local classification."""
+
+from app.models.reference import ReferenceClass
+from app.services.reference_catalog import CatalogSnapshot
+from app.utils.text_index import BM25Index, margin_confidence, tokenize
+
+
+def make_class(name, category, description, keywords):
+    return ReferenceClass(
+        name=name, category=category, description=description, keywords=keywords
+    )
+
+
+def sample_snapshot():
+    return CatalogSnapshot(1, [
+        make_class("residential_pool", "residential", "Residential swimming pool installation",
+                   ["pool", "swimming", "backyard", "spa"]),
+        make_class("kitchen_remodel", "renovation", "Kitchen renovation and cabinet replacement",
+                   ["kitchen", "cabinets", "countertops"]),
+        make_class("bathroom_remodel", "renovation", "Bathroom renovation",
+                   ["bathroom", "shower", "tile"]),
+        make_class("office_fitout", "commercial", "Commercial office interior build-out",
+                   ["office", "tenant improvement", "commercial"]),
+    ])
+
+
+def test_tokenize_drops_stopwords_and_plurals():
+    assert tokenize("We want new Countertops for the kitchen") == ["new", "countertop", "kitchen"]
+
+
+def test_classifier_ranks_matching_class_first_with_confidence():
+    snapshot = sample_snapshot()
+
+    candidates, confidence = snapshot.classify(
+        "I want to install a 15x30 foot pool with spa in my backyard", k=3
+    )
+
+    assert candidates[0][0] == "residential_pool"
+    assert confidence > 0.9
+
+
+def test_ambiguous_description_has_low_confidence():
+    snapshot = sample_snapshot()
+
+    candidates, confidence = snapshot.classify("full remodel", k=3)
+
+    assert {name for name, _ in candidates[:2]} == {"kitchen_remodel", "bathroom_remodel"}
+    assert confidence < 0.35
+
+
+def test_no_match_returns_no_candidates():
+    candidates, confidence = sample_snapshot().classify("xyzzy", k=3)
+
+    assert candidates == []
+    assert confidence == 0.0
+    assert margin_confidence([]) == 0.0
+
+
+def test_search_ranks_best_overlap_first_in_large_catalog():
+    documents = [[f"term{i}", f"term{i + 1}", "shared"] * 3 for i in range(500)]
+    index = BM25Index(documents)
+
+    results = index.search(tokenize("term10 term11 shared unknown"), 5)
+
+    assert len(results) == 5
+    assert results[0][0] == 10
+    assert results[0][1] > results[1][1]
+    assert {doc for doc, _ in results[1:3]} == {9, 11}
@@ -0,0 +1,128 @@
+"""Tests for feedback-derived tuning factors."""
+
+import asyncio
+
+import numpy as np
+import pytest
+
+from app.core.constants import TUNING_CONFIG
+from app.models.estimation import EstimationResult
+from app.services import estimation_service as estimation_module
+from app.services import tuning_service as tuning_module
+from app.services.estimation_service import EstimationService
+from app.services.tuning_service import RatioAccumulator, TuningFactorTable, TuningService, robust_tuning_factors
+
+
+def test_robust_tuning_factors_ignore_outliers_and_shrink():
+    prior = TUNING_CONFIG["PRIOR_SAMPLES"]
+    # Group 0: actual costs 20% over estimate, plus one wild outlier
+    log_ratios = np.concatenate([np.log(1.2) + np.linspace(-0.02, 0.02, prior), [np.log(50.0)]])
+    codes = np.zeros(prior + 1, dtype=np.int32)
+
+    results = robust_tuning_factors(log_ratios, codes, 2)
+
+    assert results["sample_size"].tolist() == [prior, 0]
+    # Half-way to the observed ratio with as many samples as the prior
+    assert results["tuning_factor"][0] == pytest.approx(np.exp(0.5 * np.log(1.2)))
+    assert 0.45 < results["confidence"][0] < 0.5
+    assert results["tuning_factor"][1] == 1.0
+    assert results["confidence"][1] == 0.0
+
+
+def test_robust_tuning_factors_are_clipped():
+    log_ratios = np.full(10_000, np.log(10.0))
+    codes = np.zeros(10_000, dtype=np.int32)
+
+    results = robust_tuning_factors(log_ratios, codes, 1)
+
+    assert results["tuning_factor"][0] == TUNING_CONFIG["MAX_FACTOR"]
+
+
+def test_ratio_accumulator_chunks_rows_by_group():
+    accumulator = RatioAccumulator(chunk_size=2)
+    for i, (reference_class, ratio) in enumerate([("pool", 2.0), ("deck", 1.0), ("pool", 0.5)]):
+        accumulator.add({
+            "_id": f"fb{i}", "reference_class": reference_class, "region": "a",
+            "actual_cost": 100.0 * ratio, "estimated_cost": 100.0,
+        })
+
+    codes, log_ratios = accumulator.arrays()
+
+    assert accumulator.group_keys == [("pool", "a"), ("deck", "a")]
+    assert codes.tolist() == [0, 1, 0]
+    assert np.exp(log_ratios) == pytest.approx([2.0, 1.0, 0.5])
+    assert accumulator.feedback_ids(0) == ["fb0", "fb2"]
+
+
+def test_factor_table_publishes_only_qualifying_groups():
+    table = TuningFactorTable()
+    table.publish([
+        {"reference_class": "pool", "region": "a", "tuning_factor": 1.1,
+         "sample_size": TUNING_CONFIG["MIN_SAMPLES"]},
+        {"reference_class": "pool", "region": "b", "tuning_factor": 1.5,
+         "sample_size": TUNING_CONFIG["MIN_SAMPLES"] - 1},
+    ])
+
+    assert table.for_class("pool") == {"a": 1.1}
+    assert table.get("pool", "b") == 1.0
+    assert table.get("deck", "a") == 1.0
+
+
+class FakeFeedbackRows:
+    """Returns prepared feedback_ratio_pipeline rows."""
+
+    def __init__(self):
+        self.rows = []
+
+    def aggregate(self, pipeline, **kwargs):
+        async def iterate():
+            for row in self.rows:
+                yield row
+        return iterate()
+
+
+class FakeTuningData:
+    async def bulk_write(self, operations, ordered=True):
+        pass
+
+    async def delete_many(self, query):
+        pass
+
+
+def test_repeated_rebuilds_over_tuned_estimates_converge(monkeypatch):
+    table = TuningFactorTable()
+    monkeypatch.setattr(tuning_module, "tuning_factors", table)
+    monkeypatch.setattr(estimation_module, "tuning_factors", table)
+
+    tuning = TuningService.__new__(TuningService)
+    tuning.feedback_collection = FakeFeedbackRows()
+    tuning.tuning_collection = FakeTuningData()
+    estimation = EstimationService.__new__(EstimationService)
+    samples = TUNING_CONFIG["MIN_SAMPLES"] * 5
+
+    def feedback_rows():
+        # Actual costs run 30% over the untuned estimate; estimates use the published factor
+        rows = []
+        for i in range(samples):
+            result = EstimationResult(
+                total_cost=100.0, timeline_weeks=8, team_size=4,
+                cost_breakdown={"materials": 40.0, "labor": 60.0},
+                reference_class="pool", confidence_score=0.8
+            )
+            estimation._apply_tuning(result, "pool", "a")
+            rows.append({
+                "_id": f"fb{i}", "reference_class": "pool", "region": "a",
+                "actual_cost": 130.0 * (1 + 0.01 * (i % 5 - 2)),
+                "estimated_cost": result.total_cost, "tuning_factor": result.tuning_factor,
+            })
+        return rows
+
+    factors = []
+    for _ in range(3):
+        tuning.feedback_collection.rows = feedback_rows()
+        asyncio.run(tuning.rebuild())
+        factors.append(table.get("pool", "a"))
+
+    assert factors[0] > 1.1
+    assert factors[1] == pytest.approx(factors[0])
+    assert factors[2] == pytest.approx(factors[0])
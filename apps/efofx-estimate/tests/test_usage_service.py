@@ -0,0 +1,169 @@
+"""Tests for per-tenant usage counters and quota reservation."""
+
+import asyncio
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+from pymongo.errors import DuplicateKeyError, OperationFailure
+
+from app.models.estimation import EstimationRequest
+from app.models.tenant import Tenant
+from app.services import estimation_service as estimation_module
+from app.services import usage_service as usage_module
+from app.services.estimation_service import EstimationService
+from app.services.usage_service import QuotaExceededError, UsageCounters
+
+NOW = datetime(2024, 6, 2, 12, 0)
+
+KEY = ("tenant_id", "kind", "period")
+
+
+class FakeUsage:
+    """Usage documents with the unique (tenant_id, kind, period) index."""
+
+    def __init__(self, index_error=None):
+        self.documents = []
+        self.calls = 0
+        self.indexes = []
+        self.index_error = index_error
+
+    async def create_index(self, keys, unique=False):
+        if self.index_error:
+            raise self.index_error
+        self.indexes.append((keys, unique))
+
+    def _find(self, query):
+        for document in self.documents:
+            if all(document[k] == query[k] for k in KEY):
+                return document
+        return None
+
+    def _upsert(self, query, update, upsert):
+        document = self._find(query)
+        if document is not None and document["count"] >= query.get("count", {}).get("$lt", float("inf")):
+            if upsert:
+                raise DuplicateKeyError("E11000 duplicate key")
+            return None
+        if document is None:
+            if not upsert:
+                return None
+            document = {k: query[k] for k in KEY}
+            document["count"] = 0
+            self.documents.append(document)
+        document["count"] += update["$inc"]["count"]
+        return document
+
+    async def find_one_and_update(self, query, update, projection=None, upsert=False, return_document=None):
+        self.calls += 1
+        document = self._upsert(query, update, upsert)
+        return {"count": document["count"]} if document else None
+
+    async def update_one(self, query, update, upsert=False):
+        self.calls += 1
+        self._upsert(query, update, upsert)
+
+    async def find_one(self, query, projection=None):
+        self.calls += 1
+        return self._find(query)
+
+    def find(self, query, projection=None):
+        self.calls += 1
+        days = [
+            d for d in self.documents
+            if d["tenant_id"] == query["tenant_id"] and d["kind"] == query["kind"]
+            and d["period"] >= query["period"]["$gte"]
+        ]
+
+        async def iterate():
+            for day in days:
+                yield day
+        return iterate()
+
+
+def test_reserve_counts_month_and_day_until_the_limit(monkeypatch):
+    usage = FakeUsage()
+    monkeypatch.setattr(usage_module, "get_tenant_usage_collection", lambda: usage)
+    counters = UsageCounters()
+    tenant_id = ObjectId()
+
+    async def scenario():
+        counts = [await counters.reserve(tenant_id, 2, now=NOW) for _ in range(2)]
+        with pytest.raises(QuotaExceededError):
+            await counters.reserve(tenant_id, 2, now=NOW)
+        calls = usage.calls
+        # The cached count rejects further requests without a round-trip
+        with pytest.raises(QuotaExceededError):
+            await counters.reserve(tenant_id, 2, now=NOW)
+        assert usage.calls == calls
+        return counts, await counters.monthly_usage(tenant_id, now=NOW), await counters.usage_since(tenant_id, NOW)
+
+    counts, monthly, daily = asyncio.run(scenario())
+
+    assert counts == [1, 2]
+    assert monthly == 2
+    assert daily == 2
+    assert sorted(d["period"] for d in usage.documents) == ["2024-06", "2024-06-02"]
+
+
+def test_release_returns_the_reservation(monkeypatch):
+    usage = FakeUsage()
+    monkeypatch.setattr(usage_module, "get_tenant_usage_collection", lambda: usage)
+    counters = UsageCounters()
+    tenant_id = ObjectId()
+
+    async def scenario():
+        await counters.reserve(tenant_id, 1, now=NOW)
+        await counters.release(tenant_id, NOW)
+        return await counters.reserve(tenant_id, 1, now=NOW)
+
+    assert asyncio.run(scenario()) == 1
+
+
+def test_reservations_require_the_unique_period_index(monkeypatch):
+    usage = FakeUsage(index_error=OperationFailure("index build failed"))
+    monkeypatch.setattr(usage_module, "get_tenant_usage_collection", lambda: usage)
+    counters = UsageCounters()
+
+    with pytest.raises(OperationFailure):
+        asyncio.run(counters.reserve(ObjectId(), 5, now=NOW))
+    assert usage.documents == []
+
+    usage.index_error = None
+    assert asyncio.run(counters.reserve(ObjectId(), 5, now=NOW)) == 1
+    assert usage.indexes == [([("tenant_id", 1), ("kind", 1), ("period", 1)], True)]
+
+
+class FakeEstimates:
+    def __init__(self):
+        self.documents = []
+
+    async def insert_one(self, document):
+        self.documents.append(document)
+
+    async def delete_one(self, query):
+        self.documents = [d for d in self.documents if d["session_id"] != query["session_id"]]
+
+
+def test_failed_enqueue_withdraws_the_session_and_its_quota(monkeypatch):
+    usage = FakeUsage()
+    monkeypatch.setattr(usage_module, "get_tenant_usage_collection", lambda: usage)
+    counters = UsageCounters()
+    monkeypatch.setattr(estimation_module, "usage_counters", counters)
+
+    async def failing_enqueue(*args, **kwargs):
+        raise RuntimeError("queue unavailable")
+    monkeypatch.setattr(estimation_module.job_queue, "enqueue", failing_enqueue)
+
+    service = EstimationService.__new__(EstimationService)
+    service.collection = FakeEstimates()
+    tenant = Tenant(name="Test Construction Co", api_key="sk_test_123456789")
+    request = EstimationRequest(
+        description="Backyard pool with spa", region="SoCal - Coastal", reference_class="residential_pool"
+    )
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(service.start_estimation(request, tenant))
+
+    assert service.collection.documents == []
+    assert asyncio.run(counters.monthly_usage(tenant.id)) == 0
@@ -0,0 +1,56 @@
+"""Administrative endpoints for operating live instances."""
+
+from typing import Dict, Any, Literal
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import JSONResponse, PlainTextResponse
+
+import structlog
+from app.core.config import settings
+from app.core.security import require_permission
+from app.observability.profiling import profile_for
+
+logger = structlog.get_logger(__name__)
+
+router = APIRouter()
+
+
+@router.post("/admin/profile")
+async def profile_instance(
+    seconds: float = Query(10.0, gt=0, description="Sampling duration in seconds"),
+    format: Literal["collapsed", "speedscope"] = Query("speedscope"),
+    current_user: Dict[str, Any] = Depends(require_permission("admin:profile"))
+) -> Any:
+    """
+    Sample the event loop thread of this worker for N seconds.
+
+    Returns a collapsed-stack profile (flamegraph.pl input) or a
+    speedscope-compatible JSON document.
+    """
+    if not settings.profiling_enabled:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profiling is disabled"
+        )
+
+    if seconds > settings.profiling_max_seconds:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Profiling duration cannot exceed {settings.profiling_max_seconds}s"
+        )
+
+    logger.info(
+        "Starting on-demand profile",
+        user_id=current_user["user_id"],
+        seconds=seconds,
+        format=format
+    )
+
+    try:
+        profile = await profile_for(seconds, settings.profiling_interval_ms / 1000.0)
+    except RuntimeError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+
+    if format == "collapsed":
+        return PlainTextResponse(profile.to_collapsed())
+
+    return JSONResponse(profile.to_speedscope(name=f"estimator-{seconds:g}s"))
@@ -20,10 +20,22 @@ logger = structlog.get_logger(__name__)
 router = APIRouter()
 
 
+def get_mcp_client() -> MCPClient:
+    """Dependency provider for the MCP client."""
+    return MCPClient()
+
+
+def get_openai_client() -> OpenAIClient:
+    """Dependency provider for the OpenAI client."""
+    return OpenAIClient()
+
+
 @router.post("/chat", response_model=ChatResponse)
 async def create_estimate(
     request: ChatRequest,
-    current_user: Dict[str, Any] = Depends(get_current_user)
+    current_user: Dict[str, Any] = Depends(get_current_user),
+    mcp_client: MCPClient = Depends(get_mcp_client),
+    openai_client: OpenAIClient = Depends(get_openai_client)
 ) -> ChatResponse:
     """
     Create an estimate from a chat message.
@@ -51,10 +63,6 @@ async def create_estimate(
             message_length=len(request.message)
         )
         
-        # Initialize clients and storage
-        mcp_client = MCPClient()
-        openai_client = OpenAIClient()
-        
         # Initialize storage (optional)
         audit_storage = AuditStorage() if hasattr(AuditStorage, 'is_configured') else None
         estimate_storage = EstimateStorage() if hasattr(EstimateStorage, 'is_configured') else None
@@ -62,6 +62,19 @@ class Settings(BaseSettings):
     # Caching
     cache_ttl: int = Field(default=120, env="CACHE_TTL")
     
+    # Event loop monitoring
+    loop_monitor_enabled: bool = Field(default=True, env="LOOP_MONITOR_ENABLED")
+    loop_monitor_interval: float = Field(default=0.1, env="LOOP_MONITOR_INTERVAL")
+    loop_block_threshold: float = Field(default=0.25, env="LOOP_BLOCK_THRESHOLD")
+    loop_stack_sample_rate: float = Field(default=1.0, env="LOOP_STACK_SAMPLE_RATE")
+    loop_stack_min_interval: float = Field(default=60.0, env="LOOP_STACK_MIN_INTERVAL")
+    
+    # Profiling (disabled by default; zero overhead unless enabled)
+    profiling_enabled: bool = Field(default=False, env="PROFILING_ENABLED")
+    profiling_max_seconds: int = Field(default=60, env="PROFILING_MAX_SECONDS")
+    profiling_interval_ms: float = Field(default=5.0, env="PROFILING_INTERVAL_MS")
+    profiling_request_token: str = Field(default="", env="PROFILING_REQUEST_TOKEN")
+    
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
@@ -77,7 +77,7 @@ async def get_current_user(
     return jwt_verifier.extract_user_info(payload)
 
 
-async def require_permission(permission: str):
+def require_permission(permission: str):
     """Dependency to require specific permission."""
     async def permission_checker(user: Dict[str, Any] = Depends(get_current_user)):
         user_permissions = user.get("permissions", [])
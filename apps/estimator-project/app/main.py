@@ -13,9 +13,12 @@ from fastapi.responses import JSONResponse
 from prometheus_client import make_asgi_app
 from starlette.middleware.base import BaseHTTPMiddleware
 
+from app.api.admin import router as admin_router
 from app.api.chat import router as chat_router
 from app.core.config import settings
+from app.middleware.profiling import RequestProfilingMiddleware
 from app.observability.logging import setup_logging
+from app.observability.loop_monitor import EventLoopMonitor
 from app.observability.metrics import setup_metrics
 
 # Setup structured logging
@@ -84,9 +87,23 @@ async def lifespan(app: FastAPI) -> None:
     # Setup metrics
     setup_metrics()
     
+    # Start event loop lag monitoring
+    loop_monitor = None
+    if settings.loop_monitor_enabled:
+        loop_monitor = EventLoopMonitor(
+            interval=settings.loop_monitor_interval,
+            block_threshold=settings.loop_block_threshold,
+            stack_sample_rate=settings.loop_stack_sample_rate,
+            stack_min_interval=settings.loop_stack_min_interval,
+        )
+        loop_monitor.start()
+    
     yield
     
     logger.info("Shutting down EFOFX Estimate Service")
+    
+    if loop_monitor:
+        await loop_monitor.stop()
 
 
 def create_app() -> FastAPI:
@@ -104,6 +121,14 @@ def create_app() -> FastAPI:
     app.add_middleware(ErrorHandlingMiddleware)
     app.add_middleware(LoggingMiddleware)
     
+    # Per-request profiling is opt-in; nothing is installed unless enabled
+    if settings.profiling_enabled and settings.profiling_request_token:
+        app.add_middleware(
+            RequestProfilingMiddleware,
+            token=settings.profiling_request_token,
+            interval=settings.profiling_interval_ms / 1000.0,
+        )
+    
     # Security middleware
     app.add_middleware(
         TrustedHostMiddleware,
@@ -121,6 +146,7 @@ def create_app() -> FastAPI:
     
     # Add routes
     app.include_router(chat_router, prefix="/api/v1", tags=["chat"])
+    app.include_router(admin_router, prefix="/api/v1", tags=["admin"])
     
     # Add Prometheus metrics endpoint
     metrics_app = make_asgi_app()
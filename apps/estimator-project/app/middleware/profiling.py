@@ -0,0 +1,57 @@
+"""Per-request profiling middleware.
+
+The sampler sees the whole event loop thread, not just the profiled
+request: samples taken while other requests run on the loop are included.
+Profile on an otherwise idle worker for a clean per-request picture; the
+X-Profile-Scope response header records this.
+"""
+
+import asyncio
+from typing import Any
+
+from fastapi import Request
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.observability.profiling import SamplingProfiler, profiler_lock
+
+
+class RequestProfilingMiddleware(BaseHTTPMiddleware):
+    """Profile a single request when it carries a valid X-Profile-Token header.
+
+    Only installed when profiling is enabled, so it costs nothing otherwise.
+    """
+
+    header_name = "x-profile-token"
+
+    def __init__(self, app: Any, token: str, interval: float):
+        super().__init__(app)
+        self.token = token
+        self.interval = interval
+
+    async def dispatch(self, request: Request, call_next: Any) -> Any:
+        if request.headers.get(self.header_name) != self.token:
+            return await call_next(request)
+
+        if not profiler_lock.acquire(blocking=False):
+            response = await call_next(request)
+            response.headers["X-Profile-Status"] = "busy"
+            return response
+
+        try:
+            profiler = SamplingProfiler(interval=self.interval)
+            profiler.start()
+            try:
+                response = await call_next(request)
+            finally:
+                profile = await asyncio.to_thread(profiler.stop)
+        finally:
+            profiler_lock.release()
+
+        top = ", ".join(
+            f"{label} {share:.0%}" for label, share in profile.top_functions()
+        )
+        response.headers["X-Profile-Status"] = "ok"
+        response.headers["X-Profile-Scope"] = "event-loop"
+        response.headers["X-Profile-Samples"] = str(profile.sample_count)
+        response.headers["X-Profile-Top"] = top
+        return response
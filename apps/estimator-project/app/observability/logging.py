@@ -33,7 +33,11 @@ def setup_logging() -> None:
             
             # Add caller info
             structlog.processors.CallsiteParameterAdder(
-                parameters=["func_name", "lineno", "module"]
+                parameters=[
+                    structlog.processors.CallsiteParameter.FUNC_NAME,
+                    structlog.processors.CallsiteParameter.LINENO,
+                    structlog.processors.CallsiteParameter.MODULE,
+                ]
             ),
             
             # Render as JSON
@@ -0,0 +1,125 @@
+"""Event loop lag monitoring and blocking-call detection."""
+
+import asyncio
+import random
+import sys
+import threading
+import time
+import traceback
+from typing import Optional
+
+import structlog
+from app.observability.metrics import event_loop_metrics
+
+logger = structlog.get_logger(__name__)
+
+
+class EventLoopMonitor:
+    """
+    Measure event loop scheduling lag and report callbacks that block the loop.
+
+    A coroutine sleeps for a fixed interval and records how late it wakes up;
+    the difference is the time the loop spent running other callbacks. A
+    watchdog thread watches the coroutine's heartbeat and, when the loop has
+    been stuck longer than the threshold, captures the loop thread's stack so
+    the offending code can be found. Stack captures are sampled and
+    rate-limited to keep log volume bounded.
+    """
+
+    def __init__(
+        self,
+        interval: float = 0.1,
+        block_threshold: float = 0.25,
+        stack_sample_rate: float = 1.0,
+        stack_min_interval: float = 60.0
+    ):
+        self.interval = interval
+        self.block_threshold = block_threshold
+        self.stack_sample_rate = stack_sample_rate
+        self.stack_min_interval = stack_min_interval
+
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        self._loop_thread_id: Optional[int] = None
+        self._heartbeat = 0.0
+        self._reported_heartbeat = 0.0
+        self._last_capture = float("-inf")
+
+    def start(self) -> None:
+        """Start monitoring the running event loop."""
+        if self._task is not None:
+            return
+
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stop_event.clear()
+        self._task = asyncio.get_running_loop().create_task(self._measure_lag())
+        self._watchdog = threading.Thread(
+            target=self._watch, name="event-loop-watchdog", daemon=True
+        )
+        self._watchdog.start()
+
+        logger.info(
+            "Event loop monitor started",
+            interval=self.interval,
+            block_threshold=self.block_threshold
+        )
+
+    async def stop(self) -> None:
+        """Stop the lag probe and the watchdog thread."""
+        self._stop_event.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._watchdog is not None:
+            self._watchdog.join(timeout=self.interval * 2)
+            self._watchdog = None
+
+    async def _measure_lag(self) -> None:
+        """Record how late each fixed-interval sleep wakes up."""
+        loop = asyncio.get_running_loop()
+        while True:
+            scheduled = loop.time()
+            await asyncio.sleep(self.interval)
+            lag = loop.time() - scheduled - self.interval
+            event_loop_metrics.record_lag(max(lag, 0.0))
+            self._heartbeat = time.monotonic()
+
+    def _watch(self) -> None:
+        """Watchdog loop executed on a background thread."""
+        poll_interval = min(self.interval, self.block_threshold) / 2
+        while not self._stop_event.wait(poll_interval):
+            heartbeat = self._heartbeat
+            stalled_for = time.monotonic() - heartbeat - self.interval
+            if stalled_for < self.block_threshold or heartbeat == self._reported_heartbeat:
+                continue
+
+            # Report each stall once, however long it lasts
+            self._reported_heartbeat = heartbeat
+            event_loop_metrics.record_block()
+            self._maybe_capture_stack(stalled_for)
+
+    def _maybe_capture_stack(self, stalled_for: float) -> None:
+        """Log the loop thread's stack, subject to sampling and rate limiting."""
+        now = time.monotonic()
+        if now - self._last_capture < self.stack_min_interval:
+            return
+        if random.random() >= self.stack_sample_rate:
+            return
+
+        frame = sys._current_frames().get(self._loop_thread_id)
+        if frame is None:
+            return
+
+        self._last_capture = now
+        logger.warning(
+            "Event loop blocked",
+            blocked_ms=int(stalled_for * 1000),
+            threshold_ms=int(self.block_threshold * 1000),
+            stack="".join(traceback.format_stack(frame))
+        )
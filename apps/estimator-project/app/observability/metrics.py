@@ -297,12 +297,37 @@ class CacheMetrics:
         ).set(size)
 
 
+class EventLoopMetrics:
+    """Event loop health metrics."""
+    
+    def __init__(self):
+        self.lag_seconds = Histogram(
+            "event_loop_lag_seconds",
+            "Event loop scheduling lag in seconds",
+            buckets=[0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0]
+        )
+        
+        self.blocked_total = Counter(
+            "event_loop_blocked_total",
+            "Times the event loop was blocked longer than the threshold"
+        )
+    
+    def record_lag(self, lag_seconds: float) -> None:
+        """Record observed scheduling lag."""
+        self.lag_seconds.observe(lag_seconds)
+    
+    def record_block(self) -> None:
+        """Record a blocking-call detection."""
+        self.blocked_total.inc()
+
+
 # Global metric instances
 http_metrics = HTTPMetrics()
 mcp_metrics = MCPMetrics()
 llm_metrics = LLMMetrics()
 estimate_metrics = EstimateMetrics()
 cache_metrics = CacheMetrics()
+event_loop_metrics = EventLoopMetrics()
 
 
 def setup_metrics() -> None:
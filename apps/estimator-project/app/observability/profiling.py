@@ -0,0 +1,179 @@
+"""On-demand statistical profiling for live instances."""
+
+import asyncio
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+from types import CodeType, FrameType
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+# Only one profiler may sample at a time; a second concurrent profile would
+# double the overhead and interleave samples from both.
+profiler_lock = threading.Lock()
+
+Stack = Tuple[CodeType, ...]
+
+
+def frame_stack(frame: Optional[FrameType], max_depth: int = 128) -> Stack:
+    """Return the code objects of a frame chain ordered root to leaf."""
+    codes: List[CodeType] = []
+    while frame is not None and len(codes) < max_depth:
+        codes.append(frame.f_code)
+        frame = frame.f_back
+    codes.reverse()
+    return tuple(codes)
+
+
+def frame_label(code: CodeType) -> str:
+    """Human-readable label for a code object."""
+    return f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})"
+
+
+class Profile:
+    """Aggregated samples collected by a SamplingProfiler."""
+
+    def __init__(self, samples: Counter, interval: float, duration: float):
+        self.samples = samples
+        self.interval = interval
+        self.duration = duration
+
+    @property
+    def sample_count(self) -> int:
+        """Total number of samples taken."""
+        return sum(self.samples.values())
+
+    def to_collapsed(self) -> str:
+        """Render in Brendan Gregg's collapsed-stack format (flamegraph.pl input)."""
+        lines = [
+            ";".join(frame_label(code) for code in stack) + f" {count}"
+            for stack, count in self.samples.most_common()
+            if stack
+        ]
+        return "\n".join(lines) + "\n"
+
+    def to_speedscope(self, name: str = "profile") -> Dict[str, Any]:
+        """Render as a speedscope sampled profile."""
+        frame_index: Dict[CodeType, int] = {}
+        frames: List[Dict[str, Any]] = []
+        samples: List[List[int]] = []
+        weights: List[float] = []
+
+        for stack, count in self.samples.items():
+            indexes = []
+            for code in stack:
+                if code not in frame_index:
+                    frame_index[code] = len(frames)
+                    frames.append({
+                        "name": code.co_name,
+                        "file": code.co_filename,
+                        "line": code.co_firstlineno,
+                    })
+                indexes.append(frame_index[code])
+            samples.append(indexes)
+            weights.append(count * self.interval)
+
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": "estimator-project",
+            "shared": {"frames": frames},
+            "profiles": [{
+                "type": "sampled",
+                "name": name,
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": self.duration,
+                "samples": samples,
+                "weights": weights,
+            }],
+        }
+
+    def top_functions(self, limit: int = 5) -> List[Tuple[str, float]]:
+        """Return the functions with the most self time as (label, share) pairs."""
+        total = self.sample_count
+        if not total:
+            return []
+
+        self_time: Counter = Counter()
+        for stack, count in self.samples.items():
+            if stack:
+                self_time[stack[-1]] += count
+
+        return [
+            (f"{code.co_name}@{code.co_filename.rsplit('/', 1)[-1]}:{code.co_firstlineno}", count / total)
+            for code, count in self_time.most_common(limit)
+        ]
+
+
+class SamplingProfiler:
+    """Low-overhead profiler that samples one thread's stack from a background thread."""
+
+    def __init__(
+        self,
+        interval: float = 0.005,
+        thread_id: Optional[int] = None,
+        max_depth: int = 128
+    ):
+        self.interval = interval
+        self.thread_id = thread_id
+        self.max_depth = max_depth
+        self._samples: Counter = Counter()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._started_at = 0.0
+
+    def start(self) -> None:
+        """Start sampling; defaults to the calling thread (the event loop)."""
+        if self.thread_id is None:
+            self.thread_id = threading.get_ident()
+
+        self._started_at = time.perf_counter()
+        self._thread = threading.Thread(
+            target=self._run, name="sampling-profiler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> Profile:
+        """Stop sampling and return the aggregated profile."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+        duration = time.perf_counter() - self._started_at
+        return Profile(self._samples, self.interval, duration)
+
+    def _run(self) -> None:
+        """Sampling loop executed on the profiler thread."""
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self._samples[frame_stack(frame, self.max_depth)] += 1
+
+
+async def profile_for(seconds: float, interval: float) -> Profile:
+    """Profile the event loop thread for a fixed duration."""
+    if not profiler_lock.acquire(blocking=False):
+        raise RuntimeError("A profiling session is already running")
+
+    try:
+        profiler = SamplingProfiler(interval=interval)
+        profiler.start()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            # Joining the sampler thread blocks, so keep it off the event loop
+            profile = await asyncio.to_thread(profiler.stop)
+    finally:
+        profiler_lock.release()
+
+    logger.info(
+        "Profiling session completed",
+        duration=profile.duration,
+        samples=profile.sample_count
+    )
+    return profile
+
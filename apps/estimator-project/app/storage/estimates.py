@@ -2,7 +2,7 @@
 
 import asyncio
 from datetime import datetime
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional
 import structlog
 
 from app.core.config import settings
@@ -10,6 +10,10 @@ from app.rcf.schemas import Estimate, EstimateJSON
 
 logger = structlog.get_logger(__name__)
 
+def _empty_page() -> Dict[str, Any]:
+    """Listing envelope with no results: items, next_cursor and has_more."""
+    return {"items": [], "next_cursor": None, "has_more": False}
+
 
 class EstimateStorage:
     """Storage for estimate records."""
@@ -90,23 +94,27 @@ class EstimateStorage:
         self,
         tenant_id: str,
         limit: int = 100,
-        offset: int = 0
-    ) -> List[Dict[str, Any]]:
-        """Retrieve estimates for a tenant."""
+        cursor: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Retrieve a page of estimates for a tenant, newest first.
+        
+        ``cursor`` is the ``next_cursor`` of the previous page; pages start
+        strictly after its (created_at, estimate_id) position.
+        """
         if not self.is_configured:
-            return []
+            return _empty_page()
         
         try:
             # This would be implemented based on the actual database backend
-            # For now, return empty list
+            # For now, return an empty page
             logger.info(
                 "Retrieving estimates by tenant",
                 tenant_id=tenant_id,
                 limit=limit,
-                offset=offset
+                has_cursor=cursor is not None
             )
             
-            return []
+            return _empty_page()
             
         except Exception as e:
             logger.error(
@@ -115,29 +123,34 @@ class EstimateStorage:
                 error=str(e),
                 exc_info=True
             )
-            return []
+            return _empty_page()
     
     async def get_estimates_by_reference_class(
         self,
         tenant_id: str,
         rc_id: str,
-        limit: int = 100
-    ) -> List[Dict[str, Any]]:
-        """Retrieve estimates by reference class."""
+        limit: int = 100,
+        cursor: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Retrieve a page of a tenant's estimates for one reference class, newest first.
+        
+        ``cursor`` works as in get_estimates_by_tenant.
+        """
         if not self.is_configured:
-            return []
+            return _empty_page()
         
         try:
             # This would be implemented based on the actual database backend
-            # For now, return empty list
+            # For now, return an empty page
             logger.info(
                 "Retrieving estimates by reference class",
                 tenant_id=tenant_id,
                 rc_id=rc_id,
-                limit=limit
+                limit=limit,
+                has_cursor=cursor is not None
             )
             
-            return []
+            return _empty_page()
             
         except Exception as e:
             logger.error(
@@ -147,7 +160,7 @@ class EstimateStorage:
                 error=str(e),
                 exc_info=True
             )
-            return []
+            return _empty_page()
     
     async def update_estimate(
         self,
@@ -0,0 +1,11 @@
+"""
+Benchmark suite for the EFOFX Estimate Service.
+
+Runs the real FastAPI application in-process with fake MCP and OpenAI
+transports, plus microbenchmarks for the hot pure-Python paths. Results are
+written as JSON so runs can be compared against a stored baseline.
+
+Usage:
+    python -m benchmarks --output results.json
+    python -m benchmarks --baseline results.json --threshold 0.10
+"""
@@ -0,0 +1,104 @@
+"""Command-line entry point: ``python -m benchmarks``."""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import sys
+from datetime import datetime, timezone
+
+from benchmarks.fakes import configure_environment, create_user_token
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the /chat pipeline")
+    parser.add_argument("--output", default="benchmark-results.json", help="Where to write results JSON")
+    parser.add_argument("--concurrency", default="1,8,32,64", help="Comma-separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=400, help="Requests per concurrency level")
+    parser.add_argument("--mcp-latency-ms", type=float, default=0.0, help="Simulated MCP latency")
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0, help="Simulated LLM latency")
+    parser.add_argument("--repeat", type=int, default=5, help="Microbenchmark repeats")
+    parser.add_argument("--skip-chat", action="store_true", help="Only run microbenchmarks")
+    parser.add_argument("--skip-micro", action="store_true", help="Only run the chat load test")
+    parser.add_argument("--baseline", help="Compare against a previous results file")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Allowed relative slowdown")
+    return parser.parse_args()
+
+
+def silence_logs() -> None:
+    """Keep log formatting cost in the measurement but drop the output."""
+    devnull = open(os.devnull, "w")
+    for handler in logging.getLogger().handlers:
+        if isinstance(handler, logging.StreamHandler):
+            handler.setStream(devnull)
+
+
+def main() -> int:
+    args = parse_args()
+    private_key = configure_environment()
+
+    # Import after the environment is populated; settings load at import time
+    from app.main import app
+    from benchmarks.chat_load import run_chat_benchmark
+    from benchmarks.compare import find_regressions
+    from benchmarks.micro import run_microbenchmarks
+
+    silence_logs()
+
+    results = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "requests_per_level": args.requests,
+            "mcp_latency_ms": args.mcp_latency_ms,
+            "llm_latency_ms": args.llm_latency_ms,
+        },
+        "chat": {},
+        "micro": {},
+    }
+
+    if not args.skip_chat:
+        levels = [int(level) for level in args.concurrency.split(",") if level]
+        results["chat"] = asyncio.run(run_chat_benchmark(
+            app,
+            token=create_user_token(private_key),
+            concurrency_levels=levels,
+            requests_per_level=args.requests,
+            mcp_latency=args.mcp_latency_ms / 1000.0,
+            llm_latency=args.llm_latency_ms / 1000.0,
+        ))
+        for name, level in results["chat"].items():
+            print(
+                f"chat {name:>4}: {level['throughput_rps']:>9.1f} rps  "
+                f"p50 {level['p50_ms']:>8.2f}ms  p95 {level['p95_ms']:>8.2f}ms  "
+                f"p99 {level['p99_ms']:>8.2f}ms  errors {level['errors']}"
+            )
+
+    if not args.skip_micro:
+        results["micro"] = run_microbenchmarks(private_key, repeat=args.repeat)
+        for name, timing in results["micro"].items():
+            print(f"micro {name:<36} {timing['best_us']:>10.2f}us")
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = find_regressions(results, baseline, args.threshold)
+        if regressions:
+            print(f"Regressions beyond {args.threshold:.0%}:")
+            for regression in regressions:
+                print(f"  {regression}")
+            return 1
+        print(f"No regressions beyond {args.threshold:.0%}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,95 @@
+"""End-to-end load benchmark for POST /api/v1/chat."""
+
+import asyncio
+import statistics
+import time
+from typing import Any, Dict, List, Sequence
+
+import httpx
+
+from benchmarks.fakes import SAMPLE_MESSAGE, make_fake_mcp_client, make_fake_openai_client
+
+
+def latency_summary(latencies: Sequence[float]) -> Dict[str, float]:
+    """Summarize request latencies (seconds) as millisecond percentiles."""
+    cuts = statistics.quantiles(latencies, n=100, method="inclusive")
+    return {
+        "p50_ms": round(cuts[49] * 1000, 3),
+        "p95_ms": round(cuts[94] * 1000, 3),
+        "p99_ms": round(cuts[98] * 1000, 3),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 3),
+        "max_ms": round(max(latencies) * 1000, 3),
+    }
+
+
+async def _run_level(
+    client: httpx.AsyncClient,
+    headers: Dict[str, str],
+    concurrency: int,
+    requests: int
+) -> Dict[str, Any]:
+    """Issue ``requests`` chat calls with ``concurrency`` in flight."""
+    latencies: List[float] = []
+    errors = 0
+    remaining = iter(range(requests))
+
+    async def worker() -> None:
+        nonlocal errors
+        for _ in remaining:
+            started = time.perf_counter()
+            response = await client.post(
+                "/api/v1/chat",
+                json={"message": SAMPLE_MESSAGE, "session_id": "sess-bench"},
+                headers=headers,
+            )
+            latencies.append(time.perf_counter() - started)
+            if response.status_code != 200:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "concurrency": concurrency,
+        "requests": requests,
+        "errors": errors,
+        "throughput_rps": round(requests / elapsed, 2),
+        **latency_summary(latencies),
+    }
+
+
+async def run_chat_benchmark(
+    app: Any,
+    token: str,
+    concurrency_levels: Sequence[int],
+    requests_per_level: int,
+    mcp_latency: float = 0.0,
+    llm_latency: float = 0.0,
+    warmup: int = 20
+) -> Dict[str, Any]:
+    """
+    Drive the real application through httpx's ASGI transport.
+
+    The MCP and OpenAI clients are swapped in via dependency overrides, so
+    everything between the HTTP layer and those transports is measured.
+    """
+    from app.api.chat import get_mcp_client, get_openai_client
+
+    app.dependency_overrides[get_mcp_client] = lambda: make_fake_mcp_client(mcp_latency)
+    app.dependency_overrides[get_openai_client] = lambda: make_fake_openai_client(llm_latency)
+
+    headers = {"Authorization": f"Bearer {token}"}
+    transport = httpx.ASGITransport(app=app)
+    results: Dict[str, Any] = {}
+
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            await _run_level(client, headers, concurrency=1, requests=warmup)
+            for concurrency in concurrency_levels:
+                level = await _run_level(client, headers, concurrency, requests_per_level)
+                results[f"c{concurrency}"] = level
+    finally:
+        app.dependency_overrides.clear()
+
+    return results
@@ -0,0 +1,40 @@
+"""Regression checks between two benchmark result files."""
+
+from typing import Any, Dict, List
+
+
+def find_regressions(
+    current: Dict[str, Any],
+    baseline: Dict[str, Any],
+    threshold: float
+) -> List[str]:
+    """
+    Compare a run against a baseline.
+
+    A regression is a relative slowdown larger than ``threshold`` (0.10 is
+    10%) in chat p95 latency, chat throughput or microbenchmark time.
+    Entries missing from either side are ignored.
+    """
+    regressions: List[str] = []
+
+    for level, base in baseline.get("chat", {}).items():
+        run = current.get("chat", {}).get(level)
+        if not run:
+            continue
+        if run["p95_ms"] > base["p95_ms"] * (1 + threshold):
+            regressions.append(
+                f"chat {level} p95 {base['p95_ms']:.2f}ms -> {run['p95_ms']:.2f}ms"
+            )
+        if run["throughput_rps"] < base["throughput_rps"] * (1 - threshold):
+            regressions.append(
+                f"chat {level} throughput {base['throughput_rps']:.1f} -> {run['throughput_rps']:.1f} rps"
+            )
+
+    for name, base in baseline.get("micro", {}).items():
+        run = current.get("micro", {}).get(name)
+        if run and run["best_us"] > base["best_us"] * (1 + threshold):
+            regressions.append(
+                f"micro {name} {base['best_us']:.2f}us -> {run['best_us']:.2f}us"
+            )
+
+    return regressions
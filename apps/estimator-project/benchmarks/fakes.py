@@ -0,0 +1,140 @@
+"""In-process fakes for the external dependencies of the /chat pipeline."""
+
+import asyncio
+import base64
+import json
+import os
+import time
+from types import SimpleNamespace
+from typing import Any, Dict, Optional, Tuple
+
+import jwt
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+BENCH_TENANT_ID = "tenant-bench"
+BENCH_USER_ID = "user-bench"
+BENCH_EMAIL = "bench@efofx.com"
+
+SAMPLE_FACTS: Dict[str, Any] = {
+    "reference_class_id": "pool-construction-medium-socal@v1",
+    "distribution_version": 3,
+    "cost_distribution": {"P50": 72000, "P80": 86000, "P95": 104000},
+    "time_distribution": {"P50": 6, "P80": 8, "P95": 12},
+    "cost_breakdown": {
+        "labor": 0.55,
+        "materials": 0.32,
+        "permits": 0.05,
+        "overhead": 0.08,
+    },
+}
+
+SAMPLE_ESTIMATE: Dict[str, Any] = {
+    "summary": "For a medium SoCal pool install, expect roughly $79k at P50.",
+    "estimate": {
+        "totals": {"P50": 79200, "P80": 94800, "P95": 117000},
+        "breakdown": [
+            {"bucket": "labor", "amountP50": 43560},
+            {"bucket": "materials", "amountP50": 25344},
+            {"bucket": "permits", "amountP50": 3960},
+            {"bucket": "overhead", "amountP50": 6336},
+        ],
+        "time_weeks": {"P50": 6, "P80": 8, "P95": 12},
+    },
+}
+
+SAMPLE_MESSAGE = "We want a standard swimming pool built in southern california, no rush."
+
+
+def generate_rsa_keypair() -> Tuple[str, str]:
+    """Generate a throwaway RSA key pair as (private_pem, public_pem)."""
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    private_pem = key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    ).decode()
+    public_pem = key.public_key().public_bytes(
+        serialization.Encoding.PEM,
+        serialization.PublicFormat.SubjectPublicKeyInfo,
+    ).decode()
+    return private_pem, public_pem
+
+
+def configure_environment() -> str:
+    """
+    Populate the settings environment with throwaway credentials.
+
+    Must run before any ``app`` module is imported. Returns the private key
+    used to sign user tokens.
+    """
+    private_pem, public_pem = generate_rsa_keypair()
+    env = {
+        "JWT_PUBLIC_KEY": public_pem,
+        "MCP_BASE_URL": "http://mcp.bench.invalid",
+        "MCP_HMAC_KEY_ID": "bench-key",
+        "MCP_HMAC_SECRET": base64.b64encode(b"bench-secret").decode(),
+        "MCP_JWT_PRIVATE_KEY": private_pem,
+        "OPENAI_API_KEY": "sk-bench",
+        "LOOP_MONITOR_ENABLED": "false",
+    }
+    for name, value in env.items():
+        os.environ.setdefault(name, value)
+    return os.environ["MCP_JWT_PRIVATE_KEY"]
+
+
+def create_user_token(private_key: str, permissions: Optional[list] = None) -> str:
+    """Create a user JWT accepted by the service's RS256 verifier."""
+    now = int(time.time())
+    payload = {
+        "sub": BENCH_USER_ID,
+        "tenant_id": BENCH_TENANT_ID,
+        "email": BENCH_EMAIL,
+        "permissions": permissions or [],
+        "iat": now,
+        "exp": now + 3600,
+    }
+    return jwt.encode(payload, private_key, algorithm="RS256")
+
+
+def make_fake_mcp_client(latency: float = 0.0) -> Any:
+    """
+    Build an MCPClient whose transport returns canned facts.
+
+    JWT creation, HMAC signing and metrics recording still run; only the
+    HTTP round trip is replaced.
+    """
+    from app.clients.mcp import MCPClient
+
+    class FakeMCPClient(MCPClient):
+        async def _make_request_with_retries(self, method, url, headers=None, json=None, **kwargs):
+            if latency:
+                await asyncio.sleep(latency)
+            return dict(SAMPLE_FACTS)
+
+    return FakeMCPClient()
+
+
+class _FakeCompletions:
+    """Stand-in for ``AsyncOpenAI().chat.completions``."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.content = json.dumps(SAMPLE_ESTIMATE)
+
+    async def create(self, **kwargs: Any) -> Any:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=self.content))],
+            usage=SimpleNamespace(total_tokens=850),
+        )
+
+
+def make_fake_openai_client(latency: float = 0.0) -> Any:
+    """Build an OpenAIClient whose SDK client returns a canned completion."""
+    from app.clients.openai_client import OpenAIClient
+
+    client = OpenAIClient()
+    client.client = SimpleNamespace(chat=SimpleNamespace(completions=_FakeCompletions(latency)))
+    return client
@@ -0,0 +1,50 @@
+"""Microbenchmarks for the CPU-bound pieces of the /chat pipeline."""
+
+import timeit
+from typing import Any, Callable, Dict
+
+from benchmarks.fakes import (
+    BENCH_TENANT_ID, SAMPLE_ESTIMATE, SAMPLE_FACTS, SAMPLE_MESSAGE, create_user_token
+)
+
+
+def time_call(func: Callable[[], Any], repeat: int = 5) -> Dict[str, float]:
+    """Time a callable, reporting the best of ``repeat`` runs per call."""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    best = min(timer.repeat(repeat=repeat, number=number)) / number
+    return {
+        "best_us": round(best * 1_000_000, 3),
+        "ops_per_sec": round(1 / best, 1),
+    }
+
+
+def run_microbenchmarks(private_key: str, repeat: int = 5) -> Dict[str, Dict[str, float]]:
+    """Run every microbenchmark and return results keyed by name."""
+    from app.clients.mcp import MCPClient
+    from app.core.security import create_mcp_jwt, jwt_verifier
+    from app.core.signing import hmac_signer
+    from app.rcf.normalize import attribute_normalizer
+    from app.rcf.orchestrator import RCFOrchestrator
+    from app.rcf.schemas import EstimateJSON, FactsBlock
+
+    attrs = attribute_normalizer.extract_attributes(SAMPLE_MESSAGE)
+    facts_block = FactsBlock(**SAMPLE_FACTS)
+    facts_block.modifiers_applied = attribute_normalizer.apply_policy_modifiers(attrs)["modifiers"]
+    orchestrator = RCFOrchestrator(mcp_client=MCPClient(), openai_client=None)
+    user_token = create_user_token(private_key)
+    url = f"{MCPClient().base_url}/reference_classes/{SAMPLE_FACTS['reference_class_id']}"
+
+    cases: Dict[str, Callable[[], Any]] = {
+        "normalize.extract_attributes": lambda: attribute_normalizer.extract_attributes(SAMPLE_MESSAGE),
+        "normalize.reference_class_id": lambda: attribute_normalizer.get_reference_class_id(attrs),
+        "normalize.policy_modifiers": lambda: attribute_normalizer.apply_policy_modifiers(attrs),
+        "orchestrator.create_llm_prompt": lambda: orchestrator._create_llm_prompt(facts_block, SAMPLE_MESSAGE),
+        "schemas.facts_block_validate": lambda: FactsBlock(**SAMPLE_FACTS),
+        "schemas.estimate_json_validate": lambda: EstimateJSON(**SAMPLE_ESTIMATE["estimate"]),
+        "signing.hmac_sign_request": lambda: hmac_signer.sign_request("GET", url),
+        "security.create_mcp_jwt": lambda: create_mcp_jwt(BENCH_TENANT_ID),
+        "security.verify_user_jwt": lambda: jwt_verifier.verify_token(user_token),
+    }
+
+    return {name: time_call(func, repeat=repeat) for name, func in cases.items()}